@@ -0,0 +1,426 @@
+"""initial schema
+
+Schema inicial, equivalente ao Base.metadata.create_all dos modelos.
+Bancos criados antes das migrações são marcados nesta revisão pelo
+`python -m app.bootstrap` (sem recriar tabelas).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 19:28:29.309392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('products',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('cost_price', sa.Float(), nullable=True),
+    sa.Column('stock_quantity', sa.Integer(), nullable=True),
+    sa.Column('min_stock', sa.Integer(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_products_id'), 'products', ['id'], unique=False)
+    op.create_index(op.f('ix_products_name'), 'products', ['name'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('username', sa.String(length=100), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('verification_token', sa.String(length=255), nullable=True),
+    sa.Column('reset_token', sa.String(length=255), nullable=True),
+    sa.Column('reset_token_expires', sa.DateTime(), nullable=True),
+    sa.Column('google_id', sa.String(length=255), nullable=True),
+    sa.Column('picture_url', sa.String(length=500), nullable=True),
+    sa.Column('full_name', sa.String(length=255), nullable=False),
+    sa.Column('avatar_url', sa.String(length=500), nullable=True),
+    sa.Column('bio', sa.String(length=500), nullable=True),
+    sa.Column('role', sa.Enum('ADMIN', 'MANAGER', 'BARBER', 'CLIENT', 'RECEPTIONIST', name='userrole'), nullable=False),
+    sa.Column('status', sa.Enum('ACTIVE', 'INACTIVE', 'SUSPENDED', 'PENDING', name='userstatus'), nullable=False),
+    sa.Column('language', sa.String(length=10), nullable=True),
+    sa.Column('timezone', sa.String(length=50), nullable=True),
+    sa.Column('notification_email', sa.Boolean(), nullable=True),
+    sa.Column('notification_sms', sa.Boolean(), nullable=True),
+    sa.Column('notification_whatsapp', sa.Boolean(), nullable=True),
+    sa.Column('last_login', sa.DateTime(), nullable=True),
+    sa.Column('login_count', sa.Integer(), nullable=True),
+    sa.Column('failed_login_attempts', sa.Integer(), nullable=True),
+    sa.Column('locked_until', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_google_id'), 'users', ['google_id'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_phone'), 'users', ['phone'], unique=False)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+
+    op.create_table('barbershops',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('slug', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('whatsapp', sa.String(length=20), nullable=True),
+    sa.Column('website', sa.String(length=500), nullable=True),
+    sa.Column('address_street', sa.String(length=255), nullable=True),
+    sa.Column('address_number', sa.String(length=20), nullable=True),
+    sa.Column('address_complement', sa.String(length=100), nullable=True),
+    sa.Column('address_neighborhood', sa.String(length=100), nullable=True),
+    sa.Column('address_city', sa.String(length=100), nullable=True),
+    sa.Column('address_state', sa.String(length=2), nullable=True),
+    sa.Column('address_zipcode', sa.String(length=20), nullable=True),
+    sa.Column('address_country', sa.String(length=2), nullable=True),
+    sa.Column('latitude', sa.Numeric(precision=10, scale=8), nullable=True),
+    sa.Column('longitude', sa.Numeric(precision=11, scale=8), nullable=True),
+    sa.Column('logo_url', sa.String(length=500), nullable=True),
+    sa.Column('cover_url', sa.String(length=500), nullable=True),
+    sa.Column('gallery_urls', sa.JSON(), nullable=True),
+    sa.Column('opening_hours', sa.JSON(), nullable=True),
+    sa.Column('default_appointment_duration', sa.Integer(), nullable=True),
+    sa.Column('max_appointments_per_day', sa.Integer(), nullable=True),
+    sa.Column('advance_booking_days', sa.Integer(), nullable=True),
+    sa.Column('cancellation_deadline_hours', sa.Integer(), nullable=True),
+    sa.Column('default_commission_rate', sa.Numeric(precision=5, scale=4), nullable=True),
+    sa.Column('accepts_cash', sa.Boolean(), nullable=True),
+    sa.Column('accepts_card', sa.Boolean(), nullable=True),
+    sa.Column('accepts_pix', sa.Boolean(), nullable=True),
+    sa.Column('instagram_url', sa.String(length=500), nullable=True),
+    sa.Column('facebook_url', sa.String(length=500), nullable=True),
+    sa.Column('google_my_business_url', sa.String(length=500), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_featured', sa.Boolean(), nullable=True),
+    sa.Column('accepts_online_booking', sa.Boolean(), nullable=True),
+    sa.Column('requires_deposit', sa.Boolean(), nullable=True),
+    sa.Column('deposit_amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('notification_settings', sa.JSON(), nullable=True),
+    sa.Column('timezone', sa.String(length=50), nullable=True),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_barbershops_id'), 'barbershops', ['id'], unique=False)
+    op.create_index(op.f('ix_barbershops_name'), 'barbershops', ['name'], unique=False)
+    op.create_index(op.f('ix_barbershops_slug'), 'barbershops', ['slug'], unique=True)
+
+    op.create_table('barbers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('barbershop_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('professional_name', sa.String(length=255), nullable=False),
+    sa.Column('bio', sa.Text(), nullable=True),
+    sa.Column('experience_years', sa.Integer(), nullable=True),
+    sa.Column('specialties', sa.JSON(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('accepts_appointments', sa.Boolean(), nullable=True),
+    sa.Column('max_appointments_per_day', sa.Integer(), nullable=True),
+    sa.Column('working_hours', sa.JSON(), nullable=True),
+    sa.Column('commission_rate', sa.Numeric(precision=5, scale=4), nullable=True),
+    sa.Column('fixed_salary', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('whatsapp', sa.String(length=20), nullable=True),
+    sa.Column('instagram', sa.String(length=100), nullable=True),
+    sa.Column('avatar_url', sa.String(length=500), nullable=True),
+    sa.Column('portfolio_urls', sa.JSON(), nullable=True),
+    sa.Column('total_appointments', sa.Integer(), nullable=True),
+    sa.Column('total_earnings', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('average_rating', sa.Numeric(precision=3, scale=2), nullable=True),
+    sa.Column('total_reviews', sa.Integer(), nullable=True),
+    sa.Column('notification_settings', sa.JSON(), nullable=True),
+    sa.Column('auto_accept_appointments', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['barbershop_id'], ['barbershops.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_barbers_id'), 'barbers', ['id'], unique=False)
+    op.create_index(op.f('ix_barbers_professional_name'), 'barbers', ['professional_name'], unique=False)
+
+    op.create_table('barber_blocks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('barber_id', sa.Integer(), nullable=False),
+    sa.Column('block_date', sa.Date(), nullable=False),
+    sa.Column('start_time', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('end_time', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('all_day', sa.Boolean(), nullable=True),
+    sa.Column('reason', sa.String(length=255), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['barber_id'], ['barbers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_barber_blocks_barber_id'), 'barber_blocks', ['barber_id'], unique=False)
+    op.create_index(op.f('ix_barber_blocks_block_date'), 'barber_blocks', ['block_date'], unique=False)
+    op.create_index(op.f('ix_barber_blocks_id'), 'barber_blocks', ['id'], unique=False)
+
+    op.create_table('clients',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('barbershop_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('whatsapp', sa.String(length=20), nullable=True),
+    sa.Column('cpf', sa.String(length=14), nullable=True),
+    sa.Column('birth_date', sa.Date(), nullable=True),
+    sa.Column('gender', sa.Enum('MALE', 'FEMALE', 'OTHER', 'NOT_INFORMED', name='gender'), nullable=True),
+    sa.Column('address_street', sa.String(length=255), nullable=True),
+    sa.Column('address_number', sa.String(length=20), nullable=True),
+    sa.Column('address_complement', sa.String(length=100), nullable=True),
+    sa.Column('address_neighborhood', sa.String(length=100), nullable=True),
+    sa.Column('address_city', sa.String(length=100), nullable=True),
+    sa.Column('address_state', sa.String(length=2), nullable=True),
+    sa.Column('address_zipcode', sa.String(length=20), nullable=True),
+    sa.Column('avatar_url', sa.String(length=500), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('preferences', sa.JSON(), nullable=True),
+    sa.Column('status', sa.Enum('ACTIVE', 'INACTIVE', 'BLOCKED', 'VIP', name='clientstatus'), nullable=True),
+    sa.Column('is_vip', sa.Boolean(), nullable=True),
+    sa.Column('loyalty_points', sa.Integer(), nullable=True),
+    sa.Column('total_visits', sa.Integer(), nullable=True),
+    sa.Column('total_spent', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('prefers_whatsapp', sa.Boolean(), nullable=True),
+    sa.Column('prefers_sms', sa.Boolean(), nullable=True),
+    sa.Column('prefers_email', sa.Boolean(), nullable=True),
+    sa.Column('prefers_call', sa.Boolean(), nullable=True),
+    sa.Column('first_visit', sa.DateTime(), nullable=True),
+    sa.Column('last_visit', sa.DateTime(), nullable=True),
+    sa.Column('average_ticket', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('favorite_barber_id', sa.Integer(), nullable=True),
+    sa.Column('referral_source', sa.String(length=100), nullable=True),
+    sa.Column('accepts_marketing', sa.Boolean(), nullable=True),
+    sa.Column('marketing_tags', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['barbershop_id'], ['barbershops.id'], ),
+    sa.ForeignKeyConstraint(['favorite_barber_id'], ['barbers.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_clients_cpf'), 'clients', ['cpf'], unique=False)
+    op.create_index(op.f('ix_clients_email'), 'clients', ['email'], unique=False)
+    op.create_index(op.f('ix_clients_id'), 'clients', ['id'], unique=False)
+    op.create_index(op.f('ix_clients_name'), 'clients', ['name'], unique=False)
+    op.create_index(op.f('ix_clients_phone'), 'clients', ['phone'], unique=False)
+
+    op.create_table('services',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('barbershop_id', sa.Integer(), nullable=False),
+    sa.Column('barber_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('promotional_price', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('is_promotional', sa.Boolean(), nullable=True),
+    sa.Column('duration_minutes', sa.Integer(), nullable=False),
+    sa.Column('preparation_time', sa.Integer(), nullable=True),
+    sa.Column('cleanup_time', sa.Integer(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_featured', sa.Boolean(), nullable=True),
+    sa.Column('requires_appointment', sa.Boolean(), nullable=True),
+    sa.Column('max_per_day', sa.Integer(), nullable=True),
+    sa.Column('image_url', sa.String(length=500), nullable=True),
+    sa.Column('gallery_urls', sa.JSON(), nullable=True),
+    sa.Column('age_restriction', sa.Integer(), nullable=True),
+    sa.Column('gender_restriction', sa.String(length=20), nullable=True),
+    sa.Column('special_requirements', sa.Text(), nullable=True),
+    sa.Column('commission_rate', sa.Numeric(precision=5, scale=4), nullable=True),
+    sa.Column('total_bookings', sa.Integer(), nullable=True),
+    sa.Column('total_revenue', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('average_rating', sa.Numeric(precision=3, scale=2), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['barber_id'], ['barbers.id'], ),
+    sa.ForeignKeyConstraint(['barbershop_id'], ['barbershops.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_services_category'), 'services', ['category'], unique=False)
+    op.create_index(op.f('ix_services_id'), 'services', ['id'], unique=False)
+    op.create_index(op.f('ix_services_name'), 'services', ['name'], unique=False)
+
+    op.create_table('appointments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('appointment_number', sa.String(length=50), nullable=False),
+    sa.Column('barbershop_id', sa.Integer(), nullable=False),
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('barber_id', sa.Integer(), nullable=False),
+    sa.Column('appointment_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('start_time', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('end_time', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('duration_minutes', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'CONFIRMED', 'IN_PROGRESS', 'PAUSED', 'COMPLETED', 'CANCELLED', 'NO_SHOW', 'RESCHEDULED', name='appointmentstatus'), nullable=False),
+    sa.Column('appointment_type', sa.Enum('REGULAR', 'WALK_IN', 'EMERGENCY', 'FOLLOW_UP', name='appointmenttype'), nullable=False),
+    sa.Column('total_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('discount_amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('final_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('client_notes', sa.Text(), nullable=True),
+    sa.Column('barber_notes', sa.Text(), nullable=True),
+    sa.Column('internal_notes', sa.Text(), nullable=True),
+    sa.Column('is_recurring', sa.Boolean(), nullable=True),
+    sa.Column('recurring_pattern', sa.String(length=50), nullable=True),
+    sa.Column('send_reminders', sa.Boolean(), nullable=True),
+    sa.Column('requires_confirmation', sa.Boolean(), nullable=True),
+    sa.Column('client_name', sa.String(length=255), nullable=False),
+    sa.Column('client_phone', sa.String(length=20), nullable=True),
+    sa.Column('client_email', sa.String(length=255), nullable=True),
+    sa.Column('booking_source', sa.String(length=50), nullable=True),
+    sa.Column('booking_user_agent', sa.Text(), nullable=True),
+    sa.Column('booking_ip', sa.String(length=45), nullable=True),
+    sa.Column('deposit_required', sa.Boolean(), nullable=True),
+    sa.Column('deposit_amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('deposit_paid', sa.Boolean(), nullable=True),
+    sa.Column('payment_method', sa.String(length=50), nullable=True),
+    sa.Column('cancelled_at', sa.DateTime(), nullable=True),
+    sa.Column('cancelled_by', sa.String(length=50), nullable=True),
+    sa.Column('cancellation_reason', sa.Text(), nullable=True),
+    sa.Column('rescheduled_from_id', sa.Integer(), nullable=True),
+    sa.Column('rescheduled_to_id', sa.Integer(), nullable=True),
+    sa.Column('paused_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('resumed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('pause_duration_minutes', sa.Integer(), nullable=True),
+    sa.Column('pause_reason', sa.Text(), nullable=True),
+    sa.Column('rating', sa.Integer(), nullable=True),
+    sa.Column('review', sa.Text(), nullable=True),
+    sa.Column('review_date', sa.DateTime(), nullable=True),
+    sa.Column('reminder_sent_24h', sa.Boolean(), nullable=True),
+    sa.Column('reminder_sent_2h', sa.Boolean(), nullable=True),
+    sa.Column('confirmation_sent', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['barber_id'], ['barbers.id'], ),
+    sa.ForeignKeyConstraint(['barbershop_id'], ['barbershops.id'], ),
+    sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ),
+    sa.ForeignKeyConstraint(['rescheduled_from_id'], ['appointments.id'], ),
+    sa.ForeignKeyConstraint(['rescheduled_to_id'], ['appointments.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_appointments_appointment_date'), 'appointments', ['appointment_date'], unique=False)
+    op.create_index(op.f('ix_appointments_appointment_number'), 'appointments', ['appointment_number'], unique=True)
+    op.create_index(op.f('ix_appointments_id'), 'appointments', ['id'], unique=False)
+
+    op.create_table('appointment_services',
+    sa.Column('appointment_id', sa.Integer(), nullable=False),
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=True),
+    sa.Column('custom_price', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['appointment_id'], ['appointments.id'], ),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ),
+    sa.PrimaryKeyConstraint('appointment_id', 'service_id')
+    )
+    op.create_table('commissions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('barber_id', sa.Integer(), nullable=False),
+    sa.Column('appointment_id', sa.Integer(), nullable=True),
+    sa.Column('product_id', sa.Integer(), nullable=True),
+    sa.Column('commission_type', sa.Enum('SERVICE', 'PRODUCT', name='commissiontype'), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('percentage', sa.Float(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['appointment_id'], ['appointments.id'], ),
+    sa.ForeignKeyConstraint(['barber_id'], ['barbers.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_commissions_appointment_id'), 'commissions', ['appointment_id'], unique=False)
+    op.create_index(op.f('ix_commissions_barber_id'), 'commissions', ['barber_id'], unique=False)
+    op.create_index(op.f('ix_commissions_date'), 'commissions', ['date'], unique=False)
+    op.create_index(op.f('ix_commissions_id'), 'commissions', ['id'], unique=False)
+    op.create_index(op.f('ix_commissions_product_id'), 'commissions', ['product_id'], unique=False)
+
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_commissions_product_id'), table_name='commissions')
+    op.drop_index(op.f('ix_commissions_id'), table_name='commissions')
+    op.drop_index(op.f('ix_commissions_date'), table_name='commissions')
+    op.drop_index(op.f('ix_commissions_barber_id'), table_name='commissions')
+    op.drop_index(op.f('ix_commissions_appointment_id'), table_name='commissions')
+    op.drop_table('commissions')
+
+    op.drop_table('appointment_services')
+    op.drop_index(op.f('ix_appointments_id'), table_name='appointments')
+    op.drop_index(op.f('ix_appointments_appointment_number'), table_name='appointments')
+    op.drop_index(op.f('ix_appointments_appointment_date'), table_name='appointments')
+    op.drop_table('appointments')
+
+    op.drop_index(op.f('ix_services_name'), table_name='services')
+    op.drop_index(op.f('ix_services_id'), table_name='services')
+    op.drop_index(op.f('ix_services_category'), table_name='services')
+    op.drop_table('services')
+
+    op.drop_index(op.f('ix_clients_phone'), table_name='clients')
+    op.drop_index(op.f('ix_clients_name'), table_name='clients')
+    op.drop_index(op.f('ix_clients_id'), table_name='clients')
+    op.drop_index(op.f('ix_clients_email'), table_name='clients')
+    op.drop_index(op.f('ix_clients_cpf'), table_name='clients')
+    op.drop_table('clients')
+
+    op.drop_index(op.f('ix_barber_blocks_id'), table_name='barber_blocks')
+    op.drop_index(op.f('ix_barber_blocks_block_date'), table_name='barber_blocks')
+    op.drop_index(op.f('ix_barber_blocks_barber_id'), table_name='barber_blocks')
+    op.drop_table('barber_blocks')
+
+    op.drop_index(op.f('ix_barbers_professional_name'), table_name='barbers')
+    op.drop_index(op.f('ix_barbers_id'), table_name='barbers')
+    op.drop_table('barbers')
+
+    op.drop_index(op.f('ix_barbershops_slug'), table_name='barbershops')
+    op.drop_index(op.f('ix_barbershops_name'), table_name='barbershops')
+    op.drop_index(op.f('ix_barbershops_id'), table_name='barbershops')
+    op.drop_table('barbershops')
+
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_phone'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_google_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+
+    op.drop_index(op.f('ix_products_name'), table_name='products')
+    op.drop_index(op.f('ix_products_id'), table_name='products')
+    op.drop_table('products')
+
+    # PostgreSQL cria um tipo para cada Enum; drop_table não os remove
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for enum_name in ("appointmentstatus", "appointmenttype", "clientstatus", "commissiontype",
+                          "gender", "userrole", "userstatus"):
+            sa.Enum(name=enum_name).drop(bind, checkfirst=True)
@@ -0,0 +1,127 @@
+"""scheduling indexes
+
+Índices compostos/parciais dos caminhos quentes de agenda (ver
+benchmarks/query_plans.py):
+
+    - ix_appointments_barber_active_end: conflito de horário na reserva,
+      só agendamentos que ocupam a agenda
+    - ix_appointments_barber_date: agenda do barbeiro por dia/período
+    - ix_appointments_client_date: histórico do cliente. Índice completo, não
+      parcial (status='completed'): o histórico do cliente (GET /appointments/,
+      /my-appointments) lista todos os status; as métricas de retorno (só
+      concluídos) filtram entre as poucas linhas do cliente. Sem DESC: a
+      B-tree é lida de trás para frente no ORDER BY appointment_date DESC
+    - ix_appointments_status_date: analytics por status e período
+    - ix_barber_blocks_barber_active_date: bloqueios ativos do barbeiro no dia
+    - uq_commissions_appointment_id: uma comissão por agendamento (substitui
+      ix_commissions_appointment_id)
+
+No PostgreSQL os índices são criados com CREATE INDEX CONCURRENTLY, fora de
+transação (autocommit_block), para não bloquear escrita nas tabelas durante o
+deploy. Um CONCURRENTLY interrompido deixa um índice inválido: apague-o
+(DROP INDEX CONCURRENTLY) antes de rodar de novo.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 21:04:12.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Mesmo predicado de app.models.appointment.ACTIVE_STATUSES (nomes do Enum)
+ACTIVE_STATUSES = ('PENDING', 'CONFIRMED', 'IN_PROGRESS')
+
+appointments = sa.table('appointments', sa.column('status'), sa.column('deleted_at'))
+barber_blocks = sa.table('barber_blocks', sa.column('is_active', sa.Boolean()), sa.column('deleted_at'))
+commissions = sa.table('commissions', sa.column('appointment_id'))
+
+
+def _active_appointments():
+    return sa.and_(appointments.c.status.in_(ACTIVE_STATUSES), appointments.c.deleted_at.is_(None))
+
+
+def _active_blocks():
+    return sa.and_(barber_blocks.c.is_active == sa.true(), barber_blocks.c.deleted_at.is_(None))
+
+
+def _check_duplicate_commissions() -> None:
+    """O índice único falha (e no PostgreSQL fica inválido) se houver duplicatas"""
+    if op.get_context().as_sql:
+        return  # --sql: sem conexão para consultar
+    duplicates = op.get_bind().execute(
+        sa.select(commissions.c.appointment_id, sa.func.count())
+        .where(commissions.c.appointment_id.is_not(None))
+        .group_by(commissions.c.appointment_id)
+        .having(sa.func.count() > 1)
+        .limit(10)
+    ).fetchall()
+    if duplicates:
+        listed = ', '.join(f'{appointment_id} ({count}x)' for appointment_id, count in duplicates)
+        raise RuntimeError(
+            f'Comissões duplicadas para os agendamentos {listed}. '
+            'Remova as duplicatas antes de criar uq_commissions_appointment_id.'
+        )
+
+
+def upgrade() -> None:
+    _check_duplicate_commissions()
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_appointments_barber_active_end', 'appointments', ['barber_id', 'end_time'], unique=False,
+            postgresql_where=_active_appointments(), sqlite_where=_active_appointments(),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_appointments_barber_date', 'appointments', ['barber_id', 'appointment_date'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_appointments_client_date', 'appointments', ['client_id', 'appointment_date'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_appointments_status_date', 'appointments', ['status', 'appointment_date'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_barber_blocks_barber_active_date', 'barber_blocks', ['barber_id', 'block_date'], unique=False,
+            postgresql_where=_active_blocks(), sqlite_where=_active_blocks(),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'uq_commissions_appointment_id', 'commissions', ['appointment_id'], unique=True,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        # Coberto pelo índice único
+        op.drop_index(
+            'ix_commissions_appointment_id', table_name='commissions',
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_commissions_appointment_id', 'commissions', ['appointment_id'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        for name, table in (
+            ('uq_commissions_appointment_id', 'commissions'),
+            ('ix_barber_blocks_barber_active_date', 'barber_blocks'),
+            ('ix_appointments_status_date', 'appointments'),
+            ('ix_appointments_client_date', 'appointments'),
+            ('ix_appointments_barber_date', 'appointments'),
+            ('ix_appointments_barber_active_end', 'appointments'),
+        ):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
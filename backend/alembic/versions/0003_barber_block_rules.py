@@ -0,0 +1,69 @@
+"""barber block rules
+
+Regras de bloqueio recorrentes (semanal/diária, com exceções), expandidas
+sob demanda para o período consultado em vez de uma linha de barber_blocks
+por data.
+
+Idempotente (if_not_exists): bancos criados pelo create_all já têm a tabela
+quando o app.bootstrap os marca e aplica as migrações.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 23:41:07.215904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+barber_block_rules = sa.table('barber_block_rules', sa.column('is_active', sa.Boolean()), sa.column('deleted_at'))
+
+
+def _active_rules():
+    return sa.and_(barber_block_rules.c.is_active == sa.true(), barber_block_rules.c.deleted_at.is_(None))
+
+
+def upgrade() -> None:
+    op.create_table('barber_block_rules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('barber_id', sa.Integer(), nullable=False),
+    sa.Column('frequency', sa.String(length=10), nullable=False),
+    sa.Column('interval', sa.Integer(), nullable=False),
+    sa.Column('weekdays', sa.JSON(), nullable=True),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('until_date', sa.Date(), nullable=True),
+    sa.Column('exception_dates', sa.JSON(), nullable=True),
+    sa.Column('all_day', sa.Boolean(), nullable=True),
+    sa.Column('start_time', sa.Time(), nullable=True),
+    sa.Column('end_time', sa.Time(), nullable=True),
+    sa.Column('reason', sa.String(length=255), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['barber_id'], ['barbers.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True,
+    )
+    op.create_index(op.f('ix_barber_block_rules_barber_id'), 'barber_block_rules', ['barber_id'], unique=False, if_not_exists=True)
+    op.create_index(op.f('ix_barber_block_rules_id'), 'barber_block_rules', ['id'], unique=False, if_not_exists=True)
+    op.create_index(
+        'ix_barber_block_rules_barber_active', 'barber_block_rules', ['barber_id'], unique=False,
+        postgresql_where=_active_rules(), sqlite_where=_active_rules(), if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_barber_block_rules_barber_active', table_name='barber_block_rules')
+    op.drop_index(op.f('ix_barber_block_rules_id'), table_name='barber_block_rules')
+    op.drop_index(op.f('ix_barber_block_rules_barber_id'), table_name='barber_block_rules')
+    op.drop_table('barber_block_rules')
@@ -0,0 +1,63 @@
+"""shop closures
+
+Calendário de fechamentos da barbearia (feriados e fechamentos avulsos),
+uma linha por período para todos os barbeiros.
+
+Idempotente (if_not_exists): bancos criados pelo create_all já têm a tabela
+quando o app.bootstrap os marca e aplica as migrações.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-20 00:37:52.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+shop_closures = sa.table('shop_closures', sa.column('is_active', sa.Boolean()), sa.column('deleted_at'))
+
+
+def _active_closures():
+    return sa.and_(shop_closures.c.is_active == sa.true(), shop_closures.c.deleted_at.is_(None))
+
+
+def upgrade() -> None:
+    op.create_table('shop_closures',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('barbershop_id', sa.Integer(), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=False),
+    sa.Column('recurs_yearly', sa.Boolean(), nullable=True),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['barbershop_id'], ['barbershops.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True,
+    )
+    op.create_index(op.f('ix_shop_closures_barbershop_id'), 'shop_closures', ['barbershop_id'], unique=False, if_not_exists=True)
+    op.create_index(op.f('ix_shop_closures_id'), 'shop_closures', ['id'], unique=False, if_not_exists=True)
+    op.create_index(
+        'ix_shop_closures_shop_active_dates', 'shop_closures', ['barbershop_id', 'start_date', 'end_date'],
+        unique=False, postgresql_where=_active_closures(), sqlite_where=_active_closures(), if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_shop_closures_shop_active_dates', table_name='shop_closures')
+    op.drop_index(op.f('ix_shop_closures_id'), table_name='shop_closures')
+    op.drop_index(op.f('ix_shop_closures_barbershop_id'), table_name='shop_closures')
+    op.drop_table('shop_closures')
@@ -6,12 +6,22 @@ from typing import Optional, List
 from collections import defaultdict
 
 from app.core.database import get_db
+from app.core.cache import cached, shared_tenant
 from app.api.auth import get_current_active_user
 from app.models.user import User
 from app.models.appointment import Appointment, AppointmentStatus
 from app.models.barber import Barber
 from app.models.client import Client
 from app.models.service import Service
+from app.services.closures import closures_between, default_barbershop_id
+from app.utils.timezones import (
+    date_range_clause,
+    day_bounds,
+    get_shop_timezone,
+    local_midnight_utc,
+    local_today,
+    to_local,
+)
 
 router = APIRouter()
 
@@ -21,6 +31,7 @@ async def test_analytics():
 
 # ===== ENDPOINT: RECEITA AO LONGO DO TEMPO =====
 @router.get("/revenue")
+@cached("analytics:revenue", tags=["appointments"], tenant=shared_tenant)
 async def get_revenue_over_time(
     period: str = Query("daily", regex="^(daily|weekly|monthly)$"),
     start_date: Optional[date] = None,
@@ -37,9 +48,10 @@ async def get_revenue_over_time(
     - monthly: Últimos 12 meses
     """
     
-    # Definir período padrão se não especificado
+    # Definir período padrão se não especificado (datas no fuso da barbearia)
+    tz = get_shop_timezone(db)
     if not end_date:
-        end_date = date.today()
+        end_date = local_today(tz)
     
     if not start_date:
         if period == "daily":
@@ -53,8 +65,7 @@ async def get_revenue_over_time(
     appointments = db.query(Appointment).filter(
         and_(
             Appointment.status == AppointmentStatus.COMPLETED,
-            func.date(Appointment.appointment_date) >= start_date,
-            func.date(Appointment.appointment_date) <= end_date
+            date_range_clause(Appointment.appointment_date, start_date, end_date, tz)
         )
     ).all()
     
@@ -62,7 +73,7 @@ async def get_revenue_over_time(
     revenue_data = defaultdict(float)
     
     for apt in appointments:
-        apt_date = apt.appointment_date.date()
+        apt_date = to_local(apt.appointment_date, tz).date()
         
         if period == "daily":
             key = apt_date.strftime("%Y-%m-%d")
@@ -90,8 +101,8 @@ async def get_revenue_over_time(
     previous_appointments = db.query(Appointment).filter(
         and_(
             Appointment.status == AppointmentStatus.COMPLETED,
-            func.date(Appointment.appointment_date) >= previous_period_start,
-            func.date(Appointment.appointment_date) < start_date
+            date_range_clause(Appointment.appointment_date, previous_period_start,
+                              start_date - timedelta(days=1), tz)
         )
     ).all()
     
@@ -113,6 +124,7 @@ async def get_revenue_over_time(
 
 # ===== ENDPOINT: AGENDAMENTOS POR DIA DA SEMANA =====
 @router.get("/appointments-by-weekday")
+@cached("analytics:appointments-by-weekday", tags=["appointments"], tenant=shared_tenant)
 async def get_appointments_by_weekday(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
@@ -123,8 +135,9 @@ async def get_appointments_by_weekday(
     Retorna distribuição de agendamentos por dia da semana
     """
     
+    tz = get_shop_timezone(db)
     if not end_date:
-        end_date = date.today()
+        end_date = local_today(tz)
     if not start_date:
         start_date = end_date - timedelta(days=90)  # Últimos 3 meses
     
@@ -132,8 +145,7 @@ async def get_appointments_by_weekday(
     appointments = db.query(Appointment).filter(
         and_(
             Appointment.status.in_([AppointmentStatus.COMPLETED, AppointmentStatus.CONFIRMED]),
-            func.date(Appointment.appointment_date) >= start_date,
-            func.date(Appointment.appointment_date) <= end_date
+            date_range_clause(Appointment.appointment_date, start_date, end_date, tz)
         )
     ).all()
     
@@ -142,7 +154,7 @@ async def get_appointments_by_weekday(
     weekday_names = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado", "Domingo"]
     
     for apt in appointments:
-        weekday = apt.appointment_date.weekday()  # 0 = Monday
+        weekday = to_local(apt.appointment_date, tz).weekday()  # 0 = Monday
         weekday_counts[weekday]["count"] += 1
         weekday_counts[weekday]["revenue"] += float(apt.final_amount or apt.total_amount)
     
@@ -164,6 +176,7 @@ async def get_appointments_by_weekday(
 
 # ===== ENDPOINT: PERFORMANCE DE BARBEIROS =====
 @router.get("/barbers-performance")
+@cached("analytics:barbers-performance", tags=["appointments"], tenant=shared_tenant)
 async def get_barbers_performance(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
@@ -174,8 +187,9 @@ async def get_barbers_performance(
     Retorna performance de cada barbeiro
     """
     
+    tz = get_shop_timezone(db)
     if not end_date:
-        end_date = date.today()
+        end_date = local_today(tz)
     if not start_date:
         start_date = end_date - timedelta(days=30)  # Último mês
     
@@ -189,8 +203,7 @@ async def get_barbers_performance(
             and_(
                 Appointment.barber_id == barber.id,
                 Appointment.status == AppointmentStatus.COMPLETED,
-                func.date(Appointment.appointment_date) >= start_date,
-                func.date(Appointment.appointment_date) <= end_date
+                date_range_clause(Appointment.appointment_date, start_date, end_date, tz)
             )
         ).all()
         
@@ -203,7 +216,7 @@ async def get_barbers_performance(
         
         result.append({
             "barber_id": barber.id,
-            "barber_name": barber.name,
+            "barber_name": barber.professional_name,
             "total_appointments": total_appointments,
             "total_revenue": total_revenue,
             "average_rating": round(avg_rating, 2),
@@ -221,6 +234,7 @@ async def get_barbers_performance(
 
 # ===== ENDPOINT: SERVIÇOS MAIS VENDIDOS =====
 @router.get("/services-ranking")
+@cached("analytics:services-ranking", tags=["appointments"], tenant=shared_tenant)
 async def get_services_ranking(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
@@ -231,8 +245,9 @@ async def get_services_ranking(
     Retorna ranking dos serviços mais vendidos
     """
     
+    tz = get_shop_timezone(db)
     if not end_date:
-        end_date = date.today()
+        end_date = local_today(tz)
     if not start_date:
         start_date = end_date - timedelta(days=30)
     
@@ -265,6 +280,7 @@ async def get_services_ranking(
 
 # ===== ENDPOINT: TAXA DE OCUPAÇÃO (HEATMAP) =====
 @router.get("/occupancy-heatmap")
+@cached("analytics:occupancy-heatmap", tags=["appointments", "closures"], tenant=shared_tenant)
 async def get_occupancy_heatmap(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
@@ -272,11 +288,13 @@ async def get_occupancy_heatmap(
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Retorna taxa de ocupação por dia e hora (para heatmap)
+    Retorna taxa de ocupação por dia e hora (para heatmap).
+    A média por dia aberto desconta feriados e fechamentos da barbearia.
     """
     
+    tz = get_shop_timezone(db)
     if not end_date:
-        end_date = date.today()
+        end_date = local_today(tz)
     if not start_date:
         start_date = end_date - timedelta(days=30)
     
@@ -284,8 +302,7 @@ async def get_occupancy_heatmap(
     appointments = db.query(Appointment).filter(
         and_(
             Appointment.status.in_([AppointmentStatus.COMPLETED, AppointmentStatus.CONFIRMED, AppointmentStatus.IN_PROGRESS]),
-            func.date(Appointment.appointment_date) >= start_date,
-            func.date(Appointment.appointment_date) <= end_date
+            date_range_clause(Appointment.appointment_date, start_date, end_date, tz)
         )
     ).all()
     
@@ -294,10 +311,19 @@ async def get_occupancy_heatmap(
     weekday_names = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado", "Domingo"]
     
     for apt in appointments:
-        weekday = apt.appointment_date.weekday()
-        hour = apt.appointment_date.hour
+        local_start = to_local(apt.appointment_date, tz)
+        weekday = local_start.weekday()
+        hour = local_start.hour
         occupancy[weekday][hour] += 1
     
+    # Dias em que a barbearia abriu, por dia da semana
+    closed = closures_between(db, default_barbershop_id(db), start_date, end_date)
+    open_days = [0] * 7
+    for offset in range((end_date - start_date).days + 1):
+        day = start_date + timedelta(days=offset)
+        if day not in closed:
+            open_days[day.weekday()] += 1
+    
     # Formatar para heatmap
     heatmap_data = []
     for day in range(7):
@@ -307,17 +333,21 @@ async def get_occupancy_heatmap(
                 "weekday": weekday_names[day],
                 "hour": f"{hour:02d}:00",
                 "appointments": count,
+                "open_days": open_days[day],
+                "average_per_open_day": round(count / open_days[day], 2) if open_days[day] else 0,
                 "occupancy_level": "high" if count >= 3 else "medium" if count >= 2 else "low"
             })
     
     return {
         "start_date": start_date.isoformat(),
         "end_date": end_date.isoformat(),
+        "closed_days": len(closed),
         "data": heatmap_data
     }
 
 # ===== ENDPOINT: RETENÇÃO DE CLIENTES =====
 @router.get("/retention-metrics")
+@cached("analytics:retention-metrics", tags=["appointments", "clients"], tenant=shared_tenant)
 async def get_retention_metrics(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -326,9 +356,11 @@ async def get_retention_metrics(
     Retorna métricas de retenção de clientes
     """
     
-    today = date.today()
+    tz = get_shop_timezone(db)
+    today = local_today(tz)
     thirty_days_ago = today - timedelta(days=30)
     sixty_days_ago = today - timedelta(days=60)
+    since = local_midnight_utc(thirty_days_ago, tz)
     
     # Total de clientes
     total_clients = db.query(Client).filter(Client.is_active == True).count()
@@ -338,7 +370,7 @@ async def get_retention_metrics(
         and_(
             Client.is_active == True,
             Appointment.status == AppointmentStatus.COMPLETED,
-            func.date(Appointment.appointment_date) >= thirty_days_ago
+            Appointment.appointment_date >= since
         )
     ).distinct().count()
     
@@ -347,10 +379,10 @@ async def get_retention_metrics(
         and_(
             Client.is_active == True,
             Appointment.status == AppointmentStatus.COMPLETED,
-            func.date(Appointment.appointment_date) >= thirty_days_ago
+            Appointment.appointment_date >= since
         )
     ).group_by(Client.id).having(
-        func.min(func.date(Appointment.appointment_date)) >= thirty_days_ago
+        func.min(Appointment.appointment_date) >= since
     ).count()
     
     # Taxa de retenção
@@ -366,6 +398,7 @@ async def get_retention_metrics(
 
 # ===== ENDPOINT: DASHBOARD COMPLETO =====
 @router.get("/dashboard")
+@cached("analytics:dashboard", ttl=30, tags=["appointments", "clients"], tenant=shared_tenant)
 async def get_dashboard(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -374,12 +407,15 @@ async def get_dashboard(
     Retorna resumo completo para o dashboard
     """
     
-    today = date.today()
+    tz = get_shop_timezone(db)
+    today = local_today(tz)
     thirty_days_ago = today - timedelta(days=30)
     
     # Agendamentos hoje
+    today_start, today_end = day_bounds(today, tz)
     today_appointments = db.query(Appointment).filter(
-        func.date(Appointment.appointment_date) == today
+        Appointment.appointment_date >= today_start,
+        Appointment.appointment_date < today_end
     ).count()
     
     # Receita do mês
@@ -388,7 +424,7 @@ async def get_dashboard(
     ).filter(
         and_(
             Appointment.status == AppointmentStatus.COMPLETED,
-            func.date(Appointment.appointment_date) >= thirty_days_ago
+            Appointment.appointment_date >= local_midnight_utc(thirty_days_ago, tz)
         )
     ).scalar() or 0
     
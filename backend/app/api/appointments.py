@@ -1,20 +1,61 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
 from datetime import datetime, timedelta, time
 from typing import List, Optional
 from pydantic import BaseModel, Field
 
 from app.core.database import get_db
+from app.core.cache import cached
+from app.core.invalidation import InvalidationKind, publish_invalidation
 from app.api.auth import get_current_active_user
 from app.models.user import User, UserRole
-from app.models.appointment import Appointment, AppointmentStatus
+from app.models.appointment import Appointment, AppointmentStatus, appointment_services
 from app.models.barber import Barber
 from app.models.service import Service
 from app.models.client import Client, ClientStatus
+from app.services.availability import (
+    MAX_HORIZON_DAYS,
+    ServiceFootprint,
+    appointment_footprint,
+    bookable_barbers,
+    day_availability,
+    find_next_available,
+)
+from app.services.booking import (
+    BookingConflict,
+    ScheduleConflict,
+    book_appointment,
+    change_status,
+    find_conflict,
+    move_appointment,
+    reclaim_slot,
+)
+from app.utils.appointment_codes import lookup_key
+from app.utils.timezones import get_shop_timezone, to_local
 
 router = APIRouter()
 
+
+def slot_unavailable(conflict: ScheduleConflict) -> HTTPException:
+    """409 com o agendamento ou bloqueio que ocupa o horário"""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={"message": "Time slot not available", "conflict": conflict.to_dict()}
+    )
+
+
+def services_footprint(db: Session, service_ids: Optional[List[int]]) -> ServiceFootprint:
+    """Pegada dos serviços pedidos (duração padrão se nenhum for informado)"""
+    if not service_ids:
+        return ServiceFootprint.default()
+    services = db.query(Service).filter(Service.id.in_(service_ids)).all()
+    if len(services) != len(set(service_ids)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="One or more services not found"
+        )
+    return ServiceFootprint.from_services(services)
+
 # === SCHEMAS ===
 
 class AppointmentCreate(BaseModel):
@@ -67,6 +108,7 @@ async def test_appointments():
             "PUT /{id} - Atualizar agendamento",
             "DELETE /{id} - Cancelar agendamento",
             "GET /availability - Verificar disponibilidade",
+            "GET /next-available - Primeiros horários livres para os serviços",
             "GET /my-appointments - Meus agendamentos"
         ]
     }
@@ -99,35 +141,16 @@ async def create_appointment(
         # Calcular duração e preço total
         total_duration = sum(service.duration_minutes for service in services)
         total_price = sum(service.price for service in services)
+        footprint = ServiceFootprint.from_services(services)
         
-        # Verificar disponibilidade (verificar conflitos com agendamentos ativos)
+        # Verificar disponibilidade: agendamentos e bloqueios do barbeiro, com
+        # preparação e limpeza como na busca de horários
+        # (checagem rápida; a definitiva roda com lock em book_appointment)
         end_time = appointment_data.appointment_date + timedelta(minutes=total_duration)
-        conflicts = db.query(Appointment).filter(
-            and_(
-                Appointment.barber_id == appointment_data.barber_id,
-                Appointment.status.in_([
-                    AppointmentStatus.PENDING,
-                    AppointmentStatus.CONFIRMED,
-                    AppointmentStatus.IN_PROGRESS
-                ]),
-                or_(
-                    and_(
-                        Appointment.appointment_date <= appointment_data.appointment_date,
-                        Appointment.end_time > appointment_data.appointment_date
-                    ),
-                    and_(
-                        Appointment.appointment_date < end_time,
-                        Appointment.end_time >= end_time
-                    )
-                )
-            )
-        ).first()
-        
-        if conflicts:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Time slot not available"
-            )
+        window_start, window_end = footprint.window(appointment_data.appointment_date)
+        conflict = find_conflict(db, appointment_data.barber_id, window_start, window_end)
+        if conflict:
+            raise slot_unavailable(conflict)
         
         # Obter cliente
         client = None
@@ -156,18 +179,8 @@ async def create_appointment(
                 detail="Only clients can create appointments"
             )
         
-        # Gerar código único de agendamento
-        import random
-        import string
-        appointment_code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-        
-        # Verificar se o código já existe (improvável mas garantir unicidade)
-        while db.query(Appointment).filter(Appointment.appointment_number == appointment_code).first():
-            appointment_code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-        
-        # Criar agendamento
+        # Criar agendamento (código gerado em book_appointment, sem consulta ao banco)
         db_appointment = Appointment(
-            appointment_number=appointment_code,
             barbershop_id=1,  # TODO: Implementar seleção de barbearia
             client_id=client.id,
             barber_id=appointment_data.barber_id,
@@ -185,12 +198,18 @@ async def create_appointment(
             booking_source="website"
         )
         
-        db.add(db_appointment)
+        try:
+            book_appointment(db, db_appointment, footprint.buffers)
+        except BookingConflict as exc:
+            raise slot_unavailable(exc.conflict)
+        
+        # Serviços do agendamento: remarcar e retomar usam os buffers deles
+        db.execute(appointment_services.insert(), [
+            {"appointment_id": db_appointment.id, "service_id": service.id} for service in services
+        ])
         db.commit()
         db.refresh(db_appointment)
-        
-        # Adicionar serviços ao relacionamento (implementar many-to-many se necessário)
-        # Por enquanto, os serviços estão sendo retornados separadamente
+        publish_invalidation(InvalidationKind.APPOINTMENTS, barber_id=db_appointment.barber_id)
         
         # Construir response com código de agendamento
         response_data = {
@@ -280,22 +299,34 @@ async def list_appointments(
             services=[],  # TODO: Implementar relacionamento
             appointment_date=appointment.appointment_date,
             status=appointment.status.value,
-            total_price=appointment.total_price,
-            total_duration=appointment.total_duration,
-            notes=appointment.notes,
-            created_at=appointment.created_at
+            total_price=float(appointment.total_amount or appointment.final_amount or 0),
+            total_duration=appointment.duration_minutes or 0,
+            notes=appointment.client_notes or "",
+            created_at=appointment.created_at or appointment.appointment_date
         ))
     
     return result
 
 @router.get("/availability")
+@cached(
+    "appointments:availability",
+    ttl=15,
+    stale_ttl=15,
+    tags=lambda args: ["availability", f"availability:barber:{args['barber_id']}"],
+    tenant=lambda args: f"barber:{args['barber_id']}",
+)
 async def get_availability(
     barber_id: int,
     date: str,  # YYYY-MM-DD format
+    service_ids: Optional[List[int]] = Query(None, description="Serviços do atendimento (padrão: duração padrão)"),
+    granularity: Optional[int] = Query(None, ge=5, le=120, description="Minutos entre os horários oferecidos"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Verificar disponibilidade de horários para um barbeiro em uma data"""
+    """
+    Horários do expediente do barbeiro em uma data. `available` indica se o
+    atendimento inteiro (serviços + preparação + limpeza) cabe a partir dali.
+    """
     
     try:
         appointment_date = datetime.strptime(date, "%Y-%m-%d").date()
@@ -305,55 +336,61 @@ async def get_availability(
             detail="Invalid date format. Use YYYY-MM-DD"
         )
     
-    # Gerar slots de 30 minutos (8h às 18h)
-    time_slots = []
-    current_time = datetime.combine(appointment_date, time(8, 0))
-    end_time = datetime.combine(appointment_date, time(18, 0))
-    
-    # Buscar agendamentos do barbeiro para esta data (excluindo pausados)
-    appointments_on_date = db.query(Appointment).filter(
-        and_(
-            Appointment.barber_id == barber_id,
-            func.date(Appointment.appointment_date) == appointment_date,
-            Appointment.status != AppointmentStatus.PAUSED,  # Ignorar agendamentos pausados
-            Appointment.status != AppointmentStatus.CANCELLED,
-            Appointment.status != AppointmentStatus.COMPLETED,
-            Appointment.deleted_at.is_(None)
+    barber = db.query(Barber).filter(Barber.id == barber_id).first()
+    if not barber:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Barber not found"
         )
-    ).all()
-    
-    while current_time < end_time:
-        slot_end = current_time + timedelta(minutes=30)
-        
-        # Verificar se há conflito com algum agendamento
-        is_available = True
-        conflicting_appointment = None
-        
-        for apt in appointments_on_date:
-            apt_start = apt.start_time
-            apt_end = apt.end_time
-            
-            # Verificar sobreposição de horários
-            if not (slot_end <= apt_start or current_time >= apt_end):
-                is_available = False
-                conflicting_appointment = apt
-                break
-        
-        time_slots.append(TimeSlot(
-            time=current_time.strftime("%H:%M"),
-            available=is_available,
-            appointment_id=conflicting_appointment.id if conflicting_appointment else None
-        ))
-        
-        current_time = slot_end
+    footprint = services_footprint(db, service_ids)
+    
+    # Grade no dia da barbearia; ocupação = agendamentos ativos e bloqueios
+    tz = get_shop_timezone(db)
+    time_slots = [
+        TimeSlot(
+            time=to_local(slot_start, tz).strftime("%H:%M"),
+            available=available,
+            appointment_id=appointment_id
+        )
+        for slot_start, available, appointment_id in day_availability(
+            db, barber, appointment_date, footprint, tz, granularity
+        )
+    ]
     
     return {
         "barber_id": barber_id,
-        "barber_name": f"Barbeiro {barber_id}",
+        "barber_name": barber.professional_name,
         "date": date,
+        "duration_minutes": int(footprint.duration.total_seconds() // 60),
         "slots": time_slots
     }
 
+@router.get("/next-available")
+async def get_next_available(
+    service_ids: List[int] = Query(..., description="Serviços do atendimento (duração somada)"),
+    barber_ids: Optional[List[int]] = Query(None, description="Restringir a estes barbeiros (padrão: todos)"),
+    days: int = Query(14, ge=1, le=MAX_HORIZON_DAYS, description="Horizonte da busca em dias"),
+    limit: int = Query(5, ge=1, le=50),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Primeiros horários livres para a combinação de serviços, com qualquer
+    barbeiro (ou só os informados), em ordem cronológica.
+    """
+    footprint = services_footprint(db, service_ids)
+    
+    tz = get_shop_timezone(db)
+    barbers = bookable_barbers(db, barber_ids)
+    slots = find_next_available(db, barbers, footprint, tz, limit=limit, horizon_days=days)
+    
+    return {
+        "service_ids": service_ids,
+        "duration_minutes": int(footprint.duration.total_seconds() // 60),
+        "timezone": str(tz),
+        "slots": [slot.to_dict(tz) for slot in slots]
+    }
+
 @router.get("/my-appointments", response_model=List[AppointmentResponse])
 async def get_my_appointments(
     current_user: User = Depends(get_current_active_user),
@@ -443,15 +480,23 @@ async def update_appointment(
         )
     
     # Atualizar campos
+    buffers = appointment_footprint(db, appointment).buffers
     if appointment_data.appointment_date:
-        appointment.appointment_date = appointment_data.appointment_date
+        try:
+            move_appointment(db, appointment, appointment_data.appointment_date, buffers)
+        except BookingConflict as exc:
+            raise slot_unavailable(exc.conflict)
     if appointment_data.status:
-        appointment.status = appointment_data.status
+        try:
+            change_status(db, appointment, appointment_data.status, buffers)
+        except BookingConflict as exc:
+            raise slot_unavailable(exc.conflict)
     if appointment_data.notes is not None:
-        appointment.notes = appointment_data.notes
+        appointment.client_notes = appointment_data.notes
     
     db.commit()
     db.refresh(appointment)
+    publish_invalidation(InvalidationKind.APPOINTMENTS, barber_id=appointment.barber_id)
     
     # Montar response
     barber = db.query(Barber).filter(Barber.id == appointment.barber_id).first()
@@ -466,10 +511,10 @@ async def update_appointment(
         services=[],
         appointment_date=appointment.appointment_date,
         status=appointment.status.value,
-        total_price=appointment.total_price,
-        total_duration=appointment.total_duration,
-        notes=appointment.notes,
-        created_at=appointment.created_at
+        total_price=float(appointment.total_amount or appointment.final_amount or 0),
+        total_duration=appointment.duration_minutes or 0,
+        notes=appointment.client_notes or "",
+        created_at=appointment.created_at or appointment.appointment_date
     )
 
 @router.get("/by-code/{appointment_code}")
@@ -482,8 +527,9 @@ async def get_appointment_by_code(
     Não requer autenticação - qualquer pessoa com o código pode consultar.
     """
     
+    # Uma busca no índice único (código normalizado ou legado)
     appointment = db.query(Appointment).filter(
-        Appointment.appointment_number == appointment_code.upper()
+        Appointment.appointment_number == lookup_key(appointment_code)
     ).first()
     
     if not appointment:
@@ -549,6 +595,7 @@ async def cancel_appointment(
     # Cancelar (não deletar, apenas alterar status)
     appointment.status = AppointmentStatus.CANCELLED
     db.commit()
+    publish_invalidation(InvalidationKind.APPOINTMENTS, barber_id=appointment.barber_id)
     
     return {"message": "Appointment cancelled successfully"} 
 
@@ -636,121 +683,12 @@ async def get_availability_public(
 # Lista em memória para armazenar agendamentos (temporário)
 appointments_storage = []
 
-# Dados mock de barbeiros (copiado do barbers.py)
-MOCK_BARBERS = [
-    {
-        "id": 1,
-        "name": "Carlos Santos",
-        "specialties": ["Corte Masculino", "Barba Completa", "Degradê"],
-        "rating": 4.8,
-        "experience_years": 8,
-        "bio": "Especialista em cortes masculinos clássicos e modernos",
-        "avatar_url": None,
-        "is_active": True
-    },
-    {
-        "id": 2,
-        "name": "André Lima",
-        "specialties": ["Corte Feminino", "Luzes", "Escova Progressiva"],
-        "rating": 4.9,
-        "experience_years": 12,
-        "bio": "Expert em cortes femininos e técnicas de coloração",
-        "avatar_url": None,
-        "is_active": True
-    },
-    {
-        "id": 3,
-        "name": "Roberto Costa",
-        "specialties": ["Corte + Barba", "Relaxamento", "Tratamentos"],
-        "rating": 4.7,
-        "experience_years": 15,
-        "bio": "Veterano com experiência em todos os tipos de serviços",
-        "avatar_url": None,
-        "is_active": True
-    }
-]
-
-# Dados mock de serviços (copiado do services.py)
-MOCK_SERVICES = [
-    {
-        "id": 1,
-        "name": "Corte Masculino",
-        "description": "Corte clássico masculino com máquina e tesoura",
-        "price": 45.00,
-        "duration_minutes": 30,
-        "category": "corte",
-        "is_active": True
-    },
-    {
-        "id": 2,
-        "name": "Corte Feminino",
-        "description": "Corte feminino personalizado com técnicas modernas",
-        "price": 60.00,
-        "duration_minutes": 45,
-        "category": "corte",
-        "is_active": True
-    },
-    {
-        "id": 3,
-        "name": "Barba Completa",
-        "description": "Aparar, modelar e finalizar a barba",
-        "price": 25.00,
-        "duration_minutes": 20,
-        "category": "barba",
-        "is_active": True
-    },
-    {
-        "id": 4,
-        "name": "Corte + Barba",
-        "description": "Pacote completo: corte de cabelo + barba",
-        "price": 65.00,
-        "duration_minutes": 50,
-        "category": "combo",
-        "is_active": True
-    },
-    {
-        "id": 5,
-        "name": "Degradê",
-        "description": "Corte degradê com transições suaves",
-        "price": 50.00,
-        "duration_minutes": 35,
-        "category": "corte",
-        "is_active": True
-    },
-    {
-        "id": 6,
-        "name": "Luzes",
-        "description": "Aplicação de luzes e mechas",
-        "price": 120.00,
-        "duration_minutes": 90,
-        "category": "coloracao",
-        "is_active": True
-    },
-    {
-        "id": 7,
-        "name": "Escova Progressiva",
-        "description": "Tratamento alisante com escova progressiva",
-        "price": 150.00,
-        "duration_minutes": 120,
-        "category": "tratamento",
-        "is_active": True
-    },
-    {
-        "id": 8,
-        "name": "Relaxamento",
-        "description": "Tratamento relaxante para cabelo e couro cabeludo",
-        "price": 80.00,
-        "duration_minutes": 60,
-        "category": "tratamento",
-        "is_active": True
-    }
-]
-
 @router.post("/create-simple")
 async def create_appointment_simple(
     appointment_data: dict
 ):
     """Criar agendamento simples (salvando em memória)"""
+    from app.utils.mock_data import MOCK_BARBERS, MOCK_SERVICES
     
     try:
         # Validar dados básicos
@@ -1017,9 +955,13 @@ async def update_appointment_status_simple(
             detail=f"Status inválido: {new_status_str}. Status válidos: {[s.value for s in AppointmentStatus]}"
         )
     
-    appointment.status = new_status
+    try:
+        change_status(db, appointment, new_status, appointment_footprint(db, appointment).buffers)
+    except BookingConflict as exc:
+        raise slot_unavailable(exc.conflict)
     db.commit()
     db.refresh(appointment)
+    publish_invalidation(InvalidationKind.APPOINTMENTS, barber_id=appointment.barber_id)
     
     # Buscar dados relacionados para resposta
     barber = db.query(Barber).filter(Barber.id == appointment.barber_id).first()
@@ -1071,6 +1013,7 @@ async def pause_appointment(
         appointment.pause(reason)
         db.commit()
         db.refresh(appointment)
+        publish_invalidation(InvalidationKind.APPOINTMENTS, barber_id=appointment.barber_id)
         
         return {
             "success": True,
@@ -1118,9 +1061,13 @@ async def resume_appointment(
         )
     
     try:
+        # Enquanto pausado o horário ficou livre: conferir antes de retomar
+        if appointment.can_be_resumed:
+            reclaim_slot(db, appointment, appointment_footprint(db, appointment).buffers)
         appointment.resume()
         db.commit()
         db.refresh(appointment)
+        publish_invalidation(InvalidationKind.APPOINTMENTS, barber_id=appointment.barber_id)
         
         return {
             "success": True,
@@ -1132,6 +1079,8 @@ async def resume_appointment(
                 "pause_duration_minutes": appointment.pause_duration_minutes
             }
         }
+    except BookingConflict as exc:
+        raise slot_unavailable(exc.conflict)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
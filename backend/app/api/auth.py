@@ -4,20 +4,22 @@ from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional
 import jwt
-from passlib.context import CryptContext
 import json
 import base64
-import requests
+import httpx
 
 from app.core.database import get_db
 from app.core.config import settings
+from app.core.http_client import get_http_client
+from app.core.invalidation import InvalidationKind, publish_invalidation
 from app.models.user import User, UserRole, UserStatus
 from app.models.client import Client, ClientStatus
 
 router = APIRouter()
 
 # === CONFIGURAÇÕES DE SEGURANÇA ===
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib/bcrypt só são carregados no primeiro login ou cadastro
+_pwd_context = None
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
 # === SCHEMAS BÁSICOS ===
@@ -59,13 +61,21 @@ class GoogleOAuthRequest(BaseModel):
 
 # === FUNÇÕES DE AUTENTICAÇÃO ===
 
+def get_pwd_context():
+    """Contexto de hash de senhas (criado no primeiro uso)"""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verificar senha"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Gerar hash da senha"""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Criar token JWT"""
@@ -140,13 +150,13 @@ def decode_google_jwt(token: str) -> dict:
             detail=f"Token Google inválido: {str(e)}"
         )
 
-def verify_google_token(token: str) -> dict:
+async def verify_google_token(token: str) -> dict:
     """Verificar token Google usando API do Google"""
     try:
         # Verificar token com Google
-        response = requests.get(
-            f"https://oauth2.googleapis.com/tokeninfo?id_token={token}",
-            timeout=10
+        response = await get_http_client().get(
+            settings.google_tokeninfo_url,
+            params={"id_token": token}
         )
         
         if response.status_code != 200:
@@ -165,7 +175,7 @@ def verify_google_token(token: str) -> dict:
             )
         
         return user_info
-    except requests.RequestException:
+    except httpx.HTTPError:
         # Fallback: decodificar localmente
         return decode_google_jwt(token)
 
@@ -233,6 +243,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
             )
             db.add(db_client)
             db.commit()
+            publish_invalidation(InvalidationKind.CLIENTS, entity_id=db_client.id)
     
     return UserResponse(
         id=db_user.id,
@@ -306,7 +317,7 @@ async def google_login(google_data: GoogleLoginRequest, db: Session = Depends(ge
     """
     
     # Verificar e decodificar token do Google
-    user_info = verify_google_token(google_data.credential)
+    user_info = await verify_google_token(google_data.credential)
     
     # Extrair informações do usuário
     email = user_info.get('email')
@@ -367,6 +378,7 @@ async def google_login(google_data: GoogleLoginRequest, db: Session = Depends(ge
                 )
                 db.add(db_client)
                 db.commit()
+                publish_invalidation(InvalidationKind.CLIENTS, entity_id=db_client.id)
         
         user = existing_user
     else:
@@ -405,6 +417,7 @@ async def google_login(google_data: GoogleLoginRequest, db: Session = Depends(ge
                 )
                 db.add(db_client)
                 db.commit()
+                publish_invalidation(InvalidationKind.CLIENTS, entity_id=db_client.id)
         except Exception as e:
             # Se falhar por UNIQUE constraint, buscar o usuário existente
             db.rollback()
@@ -498,9 +511,10 @@ async def google_oauth(google_data: GoogleOAuthRequest, db: Session = Depends(ge
         print(f"[Google OAuth] Redirect URI: {redirect_uri}")
         print(f"[Google OAuth] Frontend URL: {settings.frontend_url}")
         
-        # Trocar authorization code por access token
-        token_response = requests.post(
-            "https://oauth2.googleapis.com/token",
+        # Trocar authorization code por access token (cliente HTTP compartilhado, com keep-alive)
+        http_client = get_http_client()
+        token_response = await http_client.post(
+            settings.google_token_url,
             data={
                 "client_id": settings.google_client_id,
                 "client_secret": settings.google_client_secret,
@@ -550,8 +564,9 @@ async def google_oauth(google_data: GoogleOAuthRequest, db: Session = Depends(ge
             )
         
         # Obter informações do usuário
-        user_response = requests.get(
-            f"https://www.googleapis.com/oauth2/v1/userinfo?access_token={access_token}"
+        user_response = await http_client.get(
+            settings.google_userinfo_url,
+            headers={"Authorization": f"Bearer {access_token}"}
         )
         
         if user_response.status_code != 200:
@@ -605,6 +620,7 @@ async def google_oauth(google_data: GoogleOAuthRequest, db: Session = Depends(ge
                     )
                     db.add(db_client)
                     db.commit()
+                    publish_invalidation(InvalidationKind.CLIENTS, entity_id=db_client.id)
             
             user = existing_user
         else:
@@ -642,6 +658,7 @@ async def google_oauth(google_data: GoogleOAuthRequest, db: Session = Depends(ge
                 )
                 db.add(db_client)
                 db.commit()
+                publish_invalidation(InvalidationKind.CLIENTS, entity_id=db_client.id)
         
         if not user.is_active:
             raise HTTPException(
@@ -654,7 +671,7 @@ async def google_oauth(google_data: GoogleOAuthRequest, db: Session = Depends(ge
         user.login_count += 1
         user.failed_login_attempts = 0
         db.commit()
-        
+            
         # Criar token JWT
         access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
         jwt_token = create_access_token(
@@ -679,7 +696,7 @@ async def google_oauth(google_data: GoogleOAuthRequest, db: Session = Depends(ge
     except HTTPException:
         # Re-raise HTTPExceptions (já tratadas)
         raise
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Erro na comunicação com Google: {str(e)}"
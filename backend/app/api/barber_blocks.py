@@ -1,16 +1,38 @@
 from fastapi import APIRouter, HTTPException, Depends, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime, date, time, timedelta
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.core.database import get_db
+from app.core.invalidation import InvalidationKind, publish_invalidation
 from app.api.auth import get_current_active_user
 from app.models.user import User
 from app.models.barber import Barber
 from app.models.barber_block import BarberBlock
+from app.models.barber_block_rule import BarberBlockRule
 from app.models.appointment import Appointment, AppointmentStatus
+from app.services.block_rules import (
+    LIST_DEFAULT_DAYS,
+    MAX_EXPANSION_DAYS,
+    BlockOccurrence,
+    rule_barber_ids,
+    rule_occurrences,
+)
+from app.services.block_impact import (
+    AffectedAppointment,
+    assess_block_impact,
+    block_window,
+    cancel_affected,
+    colleagues_of,
+    lock_schedules,
+    reassign_affected,
+    touched_barber_ids,
+)
+from app.services.booking import lock_barber_schedule
+from app.services.closures import barber_shop_id, closure_on
+from app.utils.timezones import from_local, get_shop_timezone, local_today, to_local
 
 router = APIRouter()
 
@@ -23,6 +45,10 @@ class BarberBlockCreate(BaseModel):
     all_day: bool = True
     reason: Optional[str] = None
     notes: Optional[str] = None
+    # Agendamentos já marcados no período: manter, remarcar (colega no mesmo
+    # horário ou próximo horário livre) ou cancelar, na mesma transação
+    on_conflict: Literal["keep", "reassign", "cancel"] = "keep"
+    allow_other_barbers: bool = True
 
 class BarberBlockUpdate(BaseModel):
     start_time: Optional[datetime] = None
@@ -33,7 +59,8 @@ class BarberBlockUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 class BarberBlockResponse(BaseModel):
-    id: int
+    id: Optional[int] = None  # vazio nas ocorrências de regras recorrentes
+    rule_id: Optional[int] = None
     barber_id: int
     block_date: date
     start_time: Optional[datetime]
@@ -48,47 +75,235 @@ class BarberBlockResponse(BaseModel):
     class Config:
         from_attributes = True
 
-# === ENDPOINTS ===
+class BlockImpactResponse(BaseModel):
+    affected_count: int
+    resolution: str
+    reassigned: int = 0
+    cancelled: int = 0
+    unresolved: int = 0
+    appointments: List[dict]
 
-@router.post("/", response_model=BarberBlockResponse, status_code=status.HTTP_201_CREATED)
-async def create_barber_block(
-    block_data: BarberBlockCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """
-    Criar bloqueio de agenda para barbeiro.
-    Apenas o próprio barbeiro ou admin pode criar bloqueios.
-    """
-    
-    # Verificar se é barbeiro
+class BarberBlockCreateResponse(BarberBlockResponse):
+    impact: BlockImpactResponse
+
+class BarberBlockRuleCreate(BaseModel):
+    frequency: Literal["daily", "weekly"] = "weekly"
+    interval: int = Field(1, ge=1, le=52)
+    weekdays: Optional[List[int]] = None  # 0=segunda; semanal sem dias = dia de start_date
+    start_date: date
+    until_date: Optional[date] = None
+    exception_dates: List[date] = []
+    all_day: bool = True
+    start_time: Optional[time] = None  # Horário local da barbearia
+    end_time: Optional[time] = None
+    reason: Optional[str] = None
+    notes: Optional[str] = None
+
+class BarberBlockRuleUpdate(BaseModel):
+    weekdays: Optional[List[int]] = None
+    until_date: Optional[date] = None
+    exception_dates: Optional[List[date]] = None
+    all_day: Optional[bool] = None
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+    reason: Optional[str] = None
+    notes: Optional[str] = None
+    is_active: Optional[bool] = None
+
+class BarberBlockRuleResponse(BaseModel):
+    id: int
+    barber_id: int
+    frequency: str
+    interval: int
+    weekdays: Optional[List[int]]
+    start_date: date
+    until_date: Optional[date]
+    exception_dates: List[date]
+    all_day: bool
+    start_time: Optional[time]
+    end_time: Optional[time]
+    reason: Optional[str]
+    notes: Optional[str]
+    is_active: bool
+    formatted_period: str
+    created_at: datetime
+
+def rule_response(rule: BarberBlockRule) -> BarberBlockRuleResponse:
+    return BarberBlockRuleResponse(
+        id=rule.id,
+        barber_id=rule.barber_id,
+        frequency=rule.frequency,
+        interval=rule.interval,
+        weekdays=rule.weekdays,
+        start_date=rule.start_date,
+        until_date=rule.until_date,
+        exception_dates=rule.exception_dates or [],
+        all_day=rule.all_day,
+        start_time=rule.start_time,
+        end_time=rule.end_time,
+        reason=rule.reason,
+        notes=rule.notes,
+        is_active=rule.is_active,
+        formatted_period=rule.formatted_period,
+        created_at=rule.created_at
+    )
+
+def occurrence_response(occurrence: BlockOccurrence, created_at: datetime, tz) -> BarberBlockResponse:
+    if occurrence.all_day:
+        formatted_period = "Dia inteiro"
+    else:
+        formatted_period = f"{to_local(occurrence.start_time, tz).strftime('%H:%M')} - " \
+                           f"{to_local(occurrence.end_time, tz).strftime('%H:%M')}"
+    return BarberBlockResponse(
+        rule_id=occurrence.rule_id,
+        barber_id=occurrence.barber_id,
+        block_date=occurrence.block_date,
+        start_time=occurrence.start_time,
+        end_time=occurrence.end_time,
+        all_day=occurrence.all_day,
+        reason=occurrence.reason,
+        notes=occurrence.notes,
+        is_active=True,
+        formatted_period=formatted_period,
+        created_at=created_at
+    )
+
+def validate_block_times(block_data: BarberBlockCreate) -> None:
+    if not block_data.all_day:
+        if not block_data.start_time or not block_data.end_time:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Start and end time required for partial day blocks"
+            )
+        
+        if block_data.start_time >= block_data.end_time:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Start time must be before end time"
+            )
+
+def get_own_barber(db: Session, current_user: User) -> Barber:
+    """Perfil de barbeiro de quem cria o bloqueio"""
     if not current_user.is_barber and not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only barbers can create blocks"
         )
     
-    # Obter barber_id do usuário
     barber = db.query(Barber).filter(Barber.user_id == current_user.id).first()
     if not barber:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Barber profile not found"
         )
-    
-    # Validar horários
-    if not block_data.all_day:
-        if not block_data.start_time or not block_data.end_time:
+    return barber
+
+def impact_response(items: List[AffectedAppointment], resolution: str, tz) -> BlockImpactResponse:
+    outcomes = [item.outcome for item in items]
+    return BlockImpactResponse(
+        affected_count=len(items),
+        resolution=resolution,
+        reassigned=outcomes.count("reassigned"),
+        cancelled=outcomes.count("cancelled"),
+        unresolved=outcomes.count("unresolved"),
+        appointments=[item.to_dict(tz) for item in items]
+    )
+
+def validate_rule(rule: BarberBlockRule) -> None:
+    """Mesmas regras de horário dos bloqueios avulsos, mais as da recorrência"""
+    if rule.weekdays and any(day < 0 or day > 6 for day in rule.weekdays):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Weekdays must be between 0 (Monday) and 6 (Sunday)"
+        )
+    if rule.until_date and rule.until_date < rule.start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="until_date must not be before start_date"
+        )
+    if not rule.all_day:
+        if not rule.start_time or not rule.end_time:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Start and end time required for partial day blocks"
             )
-        
-        if block_data.start_time >= block_data.end_time:
+        if rule.start_time >= rule.end_time:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Start time must be before end time"
             )
+
+def get_owned_rule(db: Session, rule_id: int, current_user: User) -> BarberBlockRule:
+    rule = db.query(BarberBlockRule).filter(
+        BarberBlockRule.id == rule_id,
+        BarberBlockRule.deleted_at.is_(None)
+    ).first()
+    if not rule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Block rule not found"
+        )
+    if current_user.is_barber:
+        barber = db.query(Barber).filter(Barber.user_id == current_user.id).first()
+        if not barber or rule.barber_id != barber.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied"
+            )
+    return rule
+
+# === ENDPOINTS ===
+
+@router.post("/impact", response_model=BlockImpactResponse)
+async def preview_barber_block_impact(
+    block_data: BarberBlockCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Prévia do bloqueio, sem gravar nada: agendamentos atingidos e
+    alternativas de cada um (colega no mesmo horário, próximos horários)
+    """
+    
+    barber = get_own_barber(db, current_user)
+    validate_block_times(block_data)
+    
+    tz = get_shop_timezone(db)
+    start, end = block_window(block_data.block_date, block_data.all_day,
+                              block_data.start_time, block_data.end_time, tz)
+    items = assess_block_impact(db, barber, start, end, tz, block_data.allow_other_barbers)
+    
+    return impact_response(items, "preview", tz)
+
+@router.post("/", response_model=BarberBlockCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_barber_block(
+    block_data: BarberBlockCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Criar bloqueio de agenda para barbeiro.
+    Apenas o próprio barbeiro ou admin pode criar bloqueios.
+    
+    A resposta traz os agendamentos já marcados no período, com alternativas;
+    com on_conflict="reassign" ou "cancel" eles são remarcados ou cancelados
+    na mesma transação do bloqueio.
+    """
+    
+    barber = get_own_barber(db, current_user)
+    validate_block_times(block_data)
+    
+    tz = get_shop_timezone(db)
+    start, end = block_window(block_data.block_date, block_data.all_day,
+                              block_data.start_time, block_data.end_time, tz)
+    
+    # Reservas do barbeiro (e dos colegas que podem receber remarcações)
+    # esperam até o commit: a lista de afetados não muda no meio do caminho
+    colleagues = colleagues_of(db, barber) if block_data.allow_other_barbers else []
+    if block_data.on_conflict == "reassign":
+        lock_schedules(db, [barber.id] + [colleague.id for colleague in colleagues])
+    else:
+        lock_barber_schedule(db, barber.id)
     
     # Criar bloqueio
     new_block = BarberBlock(
@@ -103,10 +318,22 @@ async def create_barber_block(
     )
     
     db.add(new_block)
+    db.flush()
+    
+    items = assess_block_impact(db, barber, start, end, tz, bool(colleagues))
+    if block_data.on_conflict == "reassign":
+        reassign_affected(db, items)
+    elif block_data.on_conflict == "cancel":
+        cancel_affected(db, items, "barber" if current_user.is_barber else "admin",
+                        block_data.reason or "Agenda bloqueada")
+    
     db.commit()
     db.refresh(new_block)
+    publish_invalidation(InvalidationKind.BARBER_BLOCKS, barber_id=new_block.barber_id)
+    for barber_id in touched_barber_ids(items):
+        publish_invalidation(InvalidationKind.APPOINTMENTS, barber_id=barber_id)
     
-    return BarberBlockResponse(
+    return BarberBlockCreateResponse(
         id=new_block.id,
         barber_id=new_block.barber_id,
         block_date=new_block.block_date,
@@ -117,7 +344,8 @@ async def create_barber_block(
         notes=new_block.notes,
         is_active=new_block.is_active,
         formatted_period=new_block.formatted_period,
-        created_at=new_block.created_at
+        created_at=new_block.created_at,
+        impact=impact_response(items, block_data.on_conflict, tz)
     )
 
 @router.get("/", response_model=List[BarberBlockResponse])
@@ -136,15 +364,18 @@ async def list_barber_blocks(
     
     # Query base
     query = db.query(BarberBlock)
+    rule_barbers: Optional[List[int]] = None
     
     # Se for barbeiro, filtrar apenas seus bloqueios
     if current_user.is_barber:
         barber = db.query(Barber).filter(Barber.user_id == current_user.id).first()
         if barber:
             query = query.filter(BarberBlock.barber_id == barber.id)
+            rule_barbers = [barber.id]
     elif barber_id:
         # Admin pode filtrar por barbeiro específico
         query = query.filter(BarberBlock.barber_id == barber_id)
+        rule_barbers = [barber_id]
     
     # Filtros
     if is_active is not None:
@@ -159,7 +390,7 @@ async def list_barber_blocks(
     # Ordenar por data
     blocks = query.order_by(BarberBlock.block_date.desc()).all()
     
-    return [
+    response = [
         BarberBlockResponse(
             id=block.id,
             barber_id=block.barber_id,
@@ -175,6 +406,165 @@ async def list_barber_blocks(
         )
         for block in blocks
     ]
+    
+    # Ocorrências das regras recorrentes (só das ativas), expandidas apenas
+    # para o período pedido (padrão: próximos LIST_DEFAULT_DAYS dias)
+    if is_active is not False:
+        tz = get_shop_timezone(db)
+        first_day = start_date or local_today(tz)
+        last_day = min(end_date or first_day + timedelta(days=LIST_DEFAULT_DAYS - 1),
+                       first_day + timedelta(days=MAX_EXPANSION_DAYS - 1))
+        if rule_barbers is None and not current_user.is_barber:
+            rule_barbers = rule_barber_ids(db)
+        occurrences = [
+            occurrence
+            for rule_barber in rule_barbers or []
+            for occurrence in rule_occurrences(db, rule_barber, first_day, last_day, tz)
+        ]
+        if occurrences:
+            created = dict(db.query(BarberBlockRule.id, BarberBlockRule.created_at).filter(
+                BarberBlockRule.id.in_({occurrence.rule_id for occurrence in occurrences})
+            ).all())
+            response.extend(
+                occurrence_response(occurrence, created.get(occurrence.rule_id), tz) for occurrence in occurrences
+            )
+            response.sort(key=lambda item: item.block_date, reverse=True)
+    
+    return response
+
+# === REGRAS RECORRENTES ===
+
+@router.post("/rules", response_model=BarberBlockRuleResponse, status_code=status.HTTP_201_CREATED)
+async def create_barber_block_rule(
+    rule_data: BarberBlockRuleCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Criar bloqueio recorrente (ex.: folga toda segunda, almoço todo dia).
+    Uma linha vale para todas as datas; horários no fuso da barbearia.
+    """
+    
+    if not current_user.is_barber and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only barbers can create blocks"
+        )
+    
+    barber = db.query(Barber).filter(Barber.user_id == current_user.id).first()
+    if not barber:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Barber profile not found"
+        )
+    
+    rule = BarberBlockRule(
+        barber_id=barber.id,
+        frequency=rule_data.frequency,
+        interval=rule_data.interval,
+        weekdays=sorted(set(rule_data.weekdays)) if rule_data.weekdays else None,
+        start_date=rule_data.start_date,
+        until_date=rule_data.until_date,
+        exception_dates=sorted({day.isoformat() for day in rule_data.exception_dates}),
+        all_day=rule_data.all_day,
+        start_time=None if rule_data.all_day else rule_data.start_time,
+        end_time=None if rule_data.all_day else rule_data.end_time,
+        reason=rule_data.reason,
+        notes=rule_data.notes,
+        is_active=True
+    )
+    validate_rule(rule)
+    
+    db.add(rule)
+    db.commit()
+    db.refresh(rule)
+    publish_invalidation(InvalidationKind.BARBER_BLOCKS, barber_id=rule.barber_id)
+    
+    return rule_response(rule)
+
+@router.get("/rules", response_model=List[BarberBlockRuleResponse])
+async def list_barber_block_rules(
+    barber_id: Optional[int] = None,
+    is_active: Optional[bool] = True,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Listar regras de bloqueio recorrente (barbeiros veem só as suas)"""
+    
+    query = db.query(BarberBlockRule).filter(BarberBlockRule.deleted_at.is_(None))
+    
+    if current_user.is_barber:
+        barber = db.query(Barber).filter(Barber.user_id == current_user.id).first()
+        if barber:
+            query = query.filter(BarberBlockRule.barber_id == barber.id)
+    elif barber_id:
+        query = query.filter(BarberBlockRule.barber_id == barber_id)
+    
+    if is_active is not None:
+        query = query.filter(BarberBlockRule.is_active == is_active)
+    
+    return [rule_response(rule) for rule in query.order_by(BarberBlockRule.start_date.desc()).all()]
+
+@router.put("/rules/{rule_id}", response_model=BarberBlockRuleResponse)
+async def update_barber_block_rule(
+    rule_id: int,
+    rule_data: BarberBlockRuleUpdate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Atualizar regra (ex.: adicionar exceções ou encerrar com until_date)"""
+    
+    rule = get_owned_rule(db, rule_id, current_user)
+    
+    if rule_data.weekdays is not None:
+        rule.weekdays = sorted(set(rule_data.weekdays)) or None
+    if rule_data.until_date is not None:
+        rule.until_date = rule_data.until_date
+    if rule_data.exception_dates is not None:
+        rule.exception_dates = sorted({day.isoformat() for day in rule_data.exception_dates})
+    if rule_data.all_day is not None:
+        rule.all_day = rule_data.all_day
+    if rule_data.start_time is not None:
+        rule.start_time = rule_data.start_time
+    if rule_data.end_time is not None:
+        rule.end_time = rule_data.end_time
+    if rule_data.reason is not None:
+        rule.reason = rule_data.reason
+    if rule_data.notes is not None:
+        rule.notes = rule_data.notes
+    if rule_data.is_active is not None:
+        rule.is_active = rule_data.is_active
+    
+    try:
+        validate_rule(rule)
+    except HTTPException:
+        db.rollback()
+        raise
+    
+    db.commit()
+    db.refresh(rule)
+    publish_invalidation(InvalidationKind.BARBER_BLOCKS, barber_id=rule.barber_id)
+    
+    return rule_response(rule)
+
+@router.delete("/rules/{rule_id}")
+async def delete_barber_block_rule(
+    rule_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Remover regra de bloqueio recorrente"""
+    
+    rule = get_owned_rule(db, rule_id, current_user)
+    
+    # Soft delete
+    rule.deleted_at = datetime.now()
+    rule.is_active = False
+    
+    db.commit()
+    publish_invalidation(InvalidationKind.BARBER_BLOCKS, barber_id=rule.barber_id)
+    
+    return {"message": "Block rule deleted successfully"}
 
 @router.get("/{block_id}", response_model=BarberBlockResponse)
 async def get_barber_block(
@@ -257,6 +647,7 @@ async def update_barber_block(
     
     db.commit()
     db.refresh(block)
+    publish_invalidation(InvalidationKind.BARBER_BLOCKS, barber_id=block.barber_id)
     
     return BarberBlockResponse(
         id=block.id,
@@ -302,6 +693,7 @@ async def delete_barber_block(
     block.is_active = False
     
     db.commit()
+    publish_invalidation(InvalidationKind.BARBER_BLOCKS, barber_id=block.barber_id)
     
     return {"message": "Block deleted successfully"}
 
@@ -318,7 +710,19 @@ async def check_barber_availability(
     Endpoint público para facilitar agendamentos.
     """
     
-    # Buscar bloqueios ativos para a data
+    tz = get_shop_timezone(db)
+    
+    # Barbearia fechada (feriado/fechamento) vale para todos os barbeiros
+    closed = closure_on(db, barber_shop_id(db, barber_id), check_date)
+    if closed is not None:
+        return {
+            "available": False,
+            "reason": closed.name,
+            "block_type": "closure",
+            "closure_id": closed.closure_id
+        }
+    
+    # Buscar bloqueios ativos para a data (avulsos e ocorrências de regras)
     blocks = db.query(BarberBlock).filter(
         and_(
             BarberBlock.barber_id == barber_id,
@@ -327,8 +731,9 @@ async def check_barber_availability(
             BarberBlock.deleted_at.is_(None)
         )
     ).all()
+    blocks.extend(rule_occurrences(db, barber_id, check_date, check_date, tz))
     
-    if not blocks:
+    if not blocks and not (start_time and end_time):
         return {
             "available": True,
             "reason": None
@@ -343,21 +748,30 @@ async def check_barber_availability(
                 "block_type": "all_day"
             }
     
-    # Se foram fornecidos horários, verificar bloqueios parciais
+    # Se foram fornecidos horários, usar o mesmo validador das reservas
+    # (bloqueios parciais e agendamentos ativos, horários locais da barbearia)
     if start_time and end_time:
-        check_start = datetime.strptime(f"{check_date} {start_time}", "%Y-%m-%d %H:%M")
-        check_end = datetime.strptime(f"{check_date} {end_time}", "%Y-%m-%d %H:%M")
+        from app.services.booking import find_conflict
+
+        check_start = from_local(datetime.strptime(f"{check_date} {start_time}", "%Y-%m-%d %H:%M"), tz)
+        check_end = from_local(datetime.strptime(f"{check_date} {end_time}", "%Y-%m-%d %H:%M"), tz)
         
-        for block in blocks:
-            if block.start_time and block.end_time:
-                # Verificar sobreposição de horários
-                if not (check_end <= block.start_time or check_start >= block.end_time):
-                    return {
-                        "available": False,
-                        "reason": block.reason or "Horário bloqueado",
-                        "block_type": "partial",
-                        "blocked_period": block.formatted_period
-                    }
+        conflict = find_conflict(db, barber_id, check_start, check_end)
+        if conflict and conflict.kind in ("block", "block_rule"):
+            return {
+                "available": False,
+                "reason": conflict.reason or "Horário bloqueado",
+                "block_type": "partial",
+                "blocked_period": f"{to_local(conflict.start_time, tz).strftime('%H:%M')} - "
+                                  f"{to_local(conflict.end_time, tz).strftime('%H:%M')}",
+                "conflict": conflict.to_dict()
+            }
+        if conflict:
+            return {
+                "available": False,
+                "reason": "Horário ocupado por outro agendamento",
+                "conflict": conflict.to_dict()
+            }
     
     return {
         "available": True,
@@ -9,70 +9,10 @@ from app.models.user import User
 
 router = APIRouter()
 
-# Dados mock de barbeiros
-MOCK_BARBERS = [
-    {
-        "id": 1,
-        "name": "Carlos Santos",
-        "specialties": ["Corte Masculino", "Barba Completa", "Degradê"],
-        "rating": 4.8,
-        "experience_years": 8,
-        "bio": "Especialista em cortes masculinos clássicos e modernos",
-        "avatar_url": None,
-        "is_active": True,
-        "work_schedule": {
-            "monday": {"start": "08:00", "end": "18:00"},
-            "tuesday": {"start": "08:00", "end": "18:00"},
-            "wednesday": {"start": "08:00", "end": "18:00"},
-            "thursday": {"start": "08:00", "end": "18:00"},
-            "friday": {"start": "08:00", "end": "18:00"},
-            "saturday": {"start": "08:00", "end": "16:00"},
-            "sunday": None
-        }
-    },
-    {
-        "id": 2,
-        "name": "André Lima",
-        "specialties": ["Corte Feminino", "Luzes", "Escova Progressiva"],
-        "rating": 4.9,
-        "experience_years": 12,
-        "bio": "Expert em cortes femininos e técnicas de coloração",
-        "avatar_url": None,
-        "is_active": True,
-        "work_schedule": {
-            "monday": {"start": "09:00", "end": "19:00"},
-            "tuesday": {"start": "09:00", "end": "19:00"},
-            "wednesday": {"start": "09:00", "end": "19:00"},
-            "thursday": {"start": "09:00", "end": "19:00"},
-            "friday": {"start": "09:00", "end": "19:00"},
-            "saturday": {"start": "08:00", "end": "17:00"},
-            "sunday": None
-        }
-    },
-    {
-        "id": 3,
-        "name": "Roberto Costa",
-        "specialties": ["Corte + Barba", "Relaxamento", "Tratamentos"],
-        "rating": 4.7,
-        "experience_years": 15,
-        "bio": "Veterano com experiência em todos os tipos de serviços",
-        "avatar_url": None,
-        "is_active": True,
-        "work_schedule": {
-            "monday": {"start": "08:00", "end": "17:00"},
-            "tuesday": {"start": "08:00", "end": "17:00"},
-            "wednesday": {"start": "08:00", "end": "17:00"},
-            "thursday": {"start": "08:00", "end": "17:00"},
-            "friday": {"start": "08:00", "end": "17:00"},
-            "saturday": {"start": "08:00", "end": "15:00"},
-            "sunday": None
-        }
-    }
-]
-
 @router.get("/test")
 async def test_barbers():
     """Endpoint de teste para barbeiros"""
+    from app.utils.mock_data import MOCK_BARBERS
     return {
         "message": "✂️ API de Barbeiros funcionando!",
         "timestamp": datetime.utcnow().isoformat(),
@@ -92,6 +32,7 @@ async def list_barbers(
     db: Session = Depends(get_db)
 ):
     """Listar todos os barbeiros disponíveis"""
+    from app.utils.mock_data import MOCK_BARBERS
     
     # Filtrar apenas barbeiros ativos
     active_barbers = [barber for barber in MOCK_BARBERS if barber["is_active"]]
@@ -109,6 +50,7 @@ async def get_barber(
     db: Session = Depends(get_db)
 ):
     """Obter detalhes de um barbeiro específico"""
+    from app.utils.mock_data import MOCK_BARBERS
     
     barber = next((b for b in MOCK_BARBERS if b["id"] == barber_id), None)
     
@@ -130,6 +72,7 @@ async def get_barber_schedule(
     db: Session = Depends(get_db)
 ):
     """Obter agenda/horários do barbeiro"""
+    from app.utils.mock_data import MOCK_BARBERS
     
     barber = next((b for b in MOCK_BARBERS if b["id"] == barber_id), None)
     
@@ -153,6 +96,7 @@ async def get_barber_stats(
     db: Session = Depends(get_db)
 ):
     """Obter estatísticas do barbeiro"""
+    from app.utils.mock_data import MOCK_BARBERS
     
     barber = next((b for b in MOCK_BARBERS if b["id"] == barber_id), None)
     
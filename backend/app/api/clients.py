@@ -2,10 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func, desc
 from datetime import datetime, date, timedelta
-from typing import List, Optional
+from collections import defaultdict
+from typing import Dict, List, Optional
 from pydantic import BaseModel, EmailStr
 
 from app.core.database import get_db
+from app.core.invalidation import InvalidationKind, publish_invalidation
 from app.api.auth import get_current_active_user
 from app.models.user import User, UserRole
 from app.models.client import Client, ClientStatus, Gender
@@ -181,6 +183,7 @@ async def create_client(
     db.add(db_client)
     db.commit()
     db.refresh(db_client)
+    publish_invalidation(InvalidationKind.CLIENTS, entity_id=db_client.id)
     
     return ClientResponse(**db_client.to_dict())
 
@@ -328,6 +331,7 @@ async def update_client(
     
     db.commit()
     db.refresh(client)
+    publish_invalidation(InvalidationKind.CLIENTS, entity_id=client.id)
     
     return ClientResponse(**client.to_dict())
 
@@ -357,6 +361,7 @@ async def delete_client(
     # Soft delete
     client.deleted_at = datetime.utcnow()
     db.commit()
+    publish_invalidation(InvalidationKind.CLIENTS, entity_id=client.id)
     
     return {"message": "Client deleted successfully"}
 
@@ -399,6 +404,7 @@ async def update_loyalty_points(
     
     db.commit()
     db.refresh(client)
+    publish_invalidation(InvalidationKind.CLIENTS, entity_id=client.id)
     
     return ClientResponse(**client.to_dict())
 
@@ -425,9 +431,10 @@ async def get_client_stats(
     active_clients = base_query.filter(Client.status == ClientStatus.ACTIVE).count()
     vip_clients = base_query.filter(Client.is_vip == True).count()
     
-    # Novos clientes este mês
-    from datetime import datetime
-    start_of_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    # Novos clientes este mês (mês no fuso da barbearia)
+    from app.utils.timezones import get_shop_timezone, local_midnight_utc, local_today
+    tz = get_shop_timezone(db, barbershop_id)
+    start_of_month = local_midnight_utc(local_today(tz).replace(day=1), tz)
     new_clients_this_month = base_query.filter(Client.created_at >= start_of_month).count()
     
     # Idade média (clientes com data de nascimento)
@@ -510,26 +517,55 @@ async def get_client_history(
 
 # === FUNÇÕES PARA MÉTRICAS DE RETORNO ===
 
-def calculate_client_return_metrics(client: Client, db: Session, barber_id: Optional[int] = None) -> ClientReturnMetrics:
+def load_visit_dates(db: Session, barber_id: Optional[int] = None) -> Dict[int, List[datetime]]:
     """
-    Calcula métricas de retorno de um cliente.
+    Datas dos atendimentos concluídos de todos os clientes (mais recente
+    primeiro), numa query só: listagens de retenção não fazem uma query por
+    cliente
     """
-    from app.models.barber import Barber
-    
-    # Buscar agendamentos completados do cliente
-    query = db.query(Appointment).filter(
+    query = db.query(Appointment.client_id, Appointment.appointment_date).filter(
         and_(
-            Appointment.client_id == client.id,
             Appointment.status == AppointmentStatus.COMPLETED,
             Appointment.deleted_at.is_(None)
         )
     )
-    
-    # Filtrar por barbeiro se especificado
     if barber_id:
         query = query.filter(Appointment.barber_id == barber_id)
     
-    appointments = query.order_by(desc(Appointment.appointment_date)).all()
+    visit_dates: Dict[int, List[datetime]] = defaultdict(list)
+    for client_id, appointment_date in query.order_by(Appointment.client_id, desc(Appointment.appointment_date)):
+        visit_dates[client_id].append(appointment_date)
+    return visit_dates
+
+def load_barber_names(db: Session) -> Dict[int, str]:
+    from app.models.barber import Barber
+    return dict(db.query(Barber.id, Barber.professional_name).all())
+
+def calculate_client_return_metrics(client: Client, db: Session, barber_id: Optional[int] = None,
+                                    visit_dates: Optional[List[datetime]] = None,
+                                    barber_names: Optional[Dict[int, str]] = None) -> ClientReturnMetrics:
+    """
+    Calcula métricas de retorno de um cliente.
+    Listagens passam visit_dates/barber_names já carregados (load_visit_dates,
+    load_barber_names); sem eles, as duas consultas são feitas aqui.
+    """
+    from app.models.barber import Barber
+    
+    if visit_dates is None:
+        # Buscar agendamentos completados do cliente
+        query = db.query(Appointment.appointment_date).filter(
+            and_(
+                Appointment.client_id == client.id,
+                Appointment.status == AppointmentStatus.COMPLETED,
+                Appointment.deleted_at.is_(None)
+            )
+        )
+        
+        # Filtrar por barbeiro se especificado
+        if barber_id:
+            query = query.filter(Appointment.barber_id == barber_id)
+        
+        visit_dates = [row[0] for row in query.order_by(desc(Appointment.appointment_date)).all()]
     
     # Calcular dias desde última visita
     days_since_last_visit = None
@@ -537,16 +573,16 @@ def calculate_client_return_metrics(client: Client, db: Session, barber_id: Opti
     if client.last_visit:
         last_visit_date = client.last_visit
         days_since_last_visit = (datetime.now() - client.last_visit.replace(tzinfo=None)).days
-    elif appointments:
-        last_visit_date = appointments[0].appointment_date
+    elif visit_dates:
+        last_visit_date = visit_dates[0]
         days_since_last_visit = (datetime.now() - last_visit_date.replace(tzinfo=None)).days
     
     # Calcular frequência média de retorno
     average_return_days = None
-    if len(appointments) >= 2:
+    if len(visit_dates) >= 2:
         return_intervals = []
-        for i in range(len(appointments) - 1):
-            interval = (appointments[i].appointment_date - appointments[i+1].appointment_date).days
+        for i in range(len(visit_dates) - 1):
+            interval = (visit_dates[i] - visit_dates[i+1]).days
             if interval > 0:
                 return_intervals.append(interval)
         
@@ -582,9 +618,12 @@ def calculate_client_return_metrics(client: Client, db: Session, barber_id: Opti
     # Buscar barbeiro favorito
     barber_name = None
     if client.favorite_barber_id:
-        barber = db.query(Barber).filter(Barber.id == client.favorite_barber_id).first()
-        if barber:
-            barber_name = barber.name
+        if barber_names is not None:
+            barber_name = barber_names.get(client.favorite_barber_id)
+        else:
+            barber = db.query(Barber).filter(Barber.id == client.favorite_barber_id).first()
+            if barber:
+                barber_name = barber.professional_name
     
     return ClientReturnMetrics(
         client_id=client.id,
@@ -654,10 +693,12 @@ async def get_clients_at_risk(
     )
     
     clients = query.all()
+    visit_dates = load_visit_dates(db, barber_id)
+    barber_names = load_barber_names(db)
     
     clients_at_risk = []
     for client in clients:
-        metrics = calculate_client_return_metrics(client, db, barber_id)
+        metrics = calculate_client_return_metrics(client, db, barber_id, visit_dates.get(client.id, []), barber_names)
         
         # Filtrar por nível de risco se especificado
         if risk_level and metrics.risk_level not in risk_level:
@@ -711,6 +752,8 @@ async def get_retention_stats(
     # Buscar todos os clientes
     query = db.query(Client).filter(Client.deleted_at.is_(None))
     all_clients = query.all()
+    visit_dates = load_visit_dates(db, barber_id)
+    barber_names = load_barber_names(db)
     
     total_clients = len(all_clients)
     active_clients = 0
@@ -722,7 +765,7 @@ async def get_retention_stats(
     clients_at_risk_list = []
     
     for client in all_clients:
-        metrics = calculate_client_return_metrics(client, db, barber_id)
+        metrics = calculate_client_return_metrics(client, db, barber_id, visit_dates.get(client.id, []), barber_names)
         
         # Classificar cliente
         if client.total_visits == 0:
@@ -89,7 +89,7 @@ async def calculate_appointment_commission(
     return {
         "appointment_id": appointment_id,
         "barber_id": barber.id,
-        "barber_name": barber.name,
+        "barber_name": barber.professional_name,
         "total_appointment_value": total_value,
         "total_commission": commission_amount,
         "commission_rate": commission_rate,
@@ -128,7 +128,7 @@ async def create_commission(
     return {
         "id": commission.id,
         "barber_id": commission.barber_id,
-        "barber_name": barber.name,
+        "barber_name": barber.professional_name,
         "appointment_id": commission.appointment_id,
         "product_id": commission.product_id,
         "commission_type": commission.commission_type.value,
@@ -172,7 +172,7 @@ async def get_barber_commissions(
         result.append({
             "id": comm.id,
             "barber_id": comm.barber_id,
-            "barber_name": barber.name,
+            "barber_name": barber.professional_name,
             "appointment_id": comm.appointment_id,
             "product_id": comm.product_id,
             "commission_type": comm.commission_type.value,
@@ -252,7 +252,7 @@ async def get_barber_commission_summary(
     
     return {
         "barber_id": barber_id,
-        "barber_name": barber.name,
+        "barber_name": barber.professional_name,
         "total_commission": round(total_commission, 2),
         "service_commissions": round(service_commissions, 2),
         "product_commissions": round(product_commissions, 2),
@@ -292,7 +292,7 @@ async def get_all_commissions(
         result.append({
             "id": comm.id,
             "barber_id": comm.barber_id,
-            "barber_name": comm.barber.name,
+            "barber_name": comm.barber.professional_name,
             "appointment_id": comm.appointment_id,
             "product_id": comm.product_id,
             "commission_type": comm.commission_type.value,
@@ -347,7 +347,7 @@ async def get_commissions_summary(
         barber_id = comm.barber_id
         if barber_id not in barber_commissions:
             barber_commissions[barber_id] = {
-                "barber_name": comm.barber.name if comm.barber else "Desconhecido",
+                "barber_name": comm.barber.professional_name if comm.barber else "Desconhecido",
                 "total_commission": 0,
                 "commissions_count": 0
             }
@@ -400,7 +400,7 @@ async def auto_generate_commissions(
             continue
         
         # Usar taxa de comissão do barbeiro ou padrão
-        commission_rate = barber.commission_rate if hasattr(barber, 'commission_rate') and barber.commission_rate else DEFAULT_SERVICE_COMMISSION_RATE
+        commission_rate = float(barber.commission_rate) if hasattr(barber, 'commission_rate') and barber.commission_rate else DEFAULT_SERVICE_COMMISSION_RATE
         
         # Calcular valor da comissão
         total_value = float(appointment.final_amount or appointment.total_amount)
@@ -421,7 +421,7 @@ async def auto_generate_commissions(
         generated_count += 1
         generated_commissions.append({
             "appointment_id": appointment.id,
-            "barber_name": barber.name,
+            "barber_name": barber.professional_name,
             "amount": commission_amount
         })
     
@@ -488,7 +488,7 @@ async def generate_commission_for_appointment(
         "message": "Comissão gerada com sucesso",
         "commission": {
             "id": commission.id,
-            "barber_name": barber.name,
+            "barber_name": barber.professional_name,
             "amount": commission.amount,
             "percentage": commission.percentage,
             "date": commission.date.isoformat()
@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from app.core.database import engine
+from app.core.db_pool import get_pool_status
+from app.core.memory_tracking import memory_stats
+from app.core.profiling import profile_store
+from app.api.auth import get_current_active_user
+from app.models.user import User
+
+router = APIRouter()
+
+# === FUNÇÕES AUXILIARES ===
+
+def require_admin(current_user: User = Depends(get_current_active_user)) -> User:
+    """Diagnósticos expõem detalhes internos: apenas administradores"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can access diagnostics"
+        )
+    return current_user
+
+# === ENDPOINTS ===
+
+@router.get("/db-pool")
+async def get_db_pool_diagnostics(current_user: User = Depends(require_admin)):
+    """
+    Estado do pool de conexões do banco.
+
+    Inclui conexões em uso, overflow, checkouts, invalidações e o
+    histograma de espera por conexão (em ms, cumulativo).
+    """
+    return get_pool_status(engine)
+
+
+@router.get("/profiles")
+async def list_profiles(current_user: User = Depends(require_admin)):
+    """
+    Perfis de CPU gravados pelo middleware de profiling (mais recentes primeiro).
+
+    Para perfilar uma requisição: PROFILING_ENABLED=true e enviar o header
+    `X-Profile: 1` com o token de admin; a resposta traz `X-Profile-Id`.
+    """
+    return {"profiles": profile_store.list(), "max_profiles": profile_store.max_profiles}
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str, current_user: User = Depends(require_admin)):
+    """Baixar o perfil em formato pstats (.prof) para snakeviz/flameprof"""
+    path = profile_store.path(profile_id)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+
+
+@router.get("/profiles/{profile_id}/summary", response_class=PlainTextResponse)
+async def get_profile_summary(
+    profile_id: str,
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|ncalls)$"),
+    limit: int = Query(40, ge=1, le=500),
+    current_user: User = Depends(require_admin)
+):
+    """Resumo em texto das funções mais caras do perfil"""
+    summary = profile_store.summary(profile_id, sort=sort, limit=limit)
+    if summary is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return summary
+
+
+@router.delete("/profiles")
+async def clear_profiles(current_user: User = Depends(require_admin)):
+    """Apagar todos os perfis gravados"""
+    return {"removed": profile_store.clear()}
+
+
+@router.get("/memory")
+async def get_memory_diagnostics(current_user: User = Depends(require_admin)):
+    """
+    Pico de memória por rota (requisições amostradas deste worker).
+
+    Rotas ordenadas pelo maior pico; `recent_offenders` traz as requisições que
+    passaram do orçamento com os maiores locais de alocação.
+    """
+    return memory_stats.snapshot()
+
+
+@router.delete("/memory")
+async def reset_memory_diagnostics(current_user: User = Depends(require_admin)):
+    """Zerar as estatísticas de memória deste worker"""
+    memory_stats.reset()
+    return {"reset": True}
@@ -43,42 +43,6 @@ class SaleResponse(BaseModel):
     data_criacao: datetime
     observacoes: Optional[str] = None
 
-# === DADOS MOCK ===
-mock_sales = [
-    {
-        "id": "1",
-        "cliente_nome": "João Silva",
-        "barbeiro_nome": "Carlos Santos", 
-        "itens": [
-            {"tipo": "servico", "nome": "Corte Masculino", "preco": 45.0, "quantidade": 1},
-            {"tipo": "servico", "nome": "Barba Completa", "preco": 25.0, "quantidade": 1},
-            {"tipo": "produto", "nome": "Pomada Modeladora", "preco": 35.0, "quantidade": 1}
-        ],
-        "valor_bruto": 105.0,
-        "desconto": 5.0,
-        "valor_final": 100.0,
-        "forma_pagamento": "Cartão de Crédito",
-        "status": "concluida",
-        "data_criacao": "2025-01-11T14:30:00",
-        "observacoes": "Cliente satisfeito"
-    },
-    {
-        "id": "2", 
-        "cliente_nome": "Maria Santos",
-        "barbeiro_nome": "André Lima",
-        "itens": [
-            {"tipo": "servico", "nome": "Corte Feminino", "preco": 60.0, "quantidade": 1}
-        ],
-        "valor_bruto": 60.0,
-        "desconto": 0.0,
-        "valor_final": 60.0,
-        "forma_pagamento": "PIX",
-        "status": "concluida", 
-        "data_criacao": "2025-01-11T15:00:00",
-        "observacoes": ""
-    }
-]
-
 # === ENDPOINTS ===
 
 @router.get("/test")
@@ -113,6 +77,7 @@ async def list_sales(
     """
     Listar todas as vendas com filtros opcionais
     """
+    from app.utils.mock_data import mock_sales
     sales = mock_sales.copy()
     
     # Aplicar filtros
@@ -139,6 +104,7 @@ async def get_sale(
     """
     Buscar venda específica por ID
     """
+    from app.utils.mock_data import mock_sales
     sale = next((s for s in mock_sales if s["id"] == sale_id), None)
     if not sale:
         raise HTTPException(status_code=404, detail="Venda não encontrada")
@@ -153,6 +119,7 @@ async def create_sale(
     """
     Criar nova venda
     """
+    from app.utils.mock_data import mock_sales
     # Calcular valores
     valor_bruto = sum(item.preco * item.quantidade for item in sale_data.itens)
     valor_final = valor_bruto - sale_data.desconto
@@ -183,6 +150,7 @@ async def update_sale(
     """
     Atualizar venda existente
     """
+    from app.utils.mock_data import mock_sales
     sale = next((s for s in mock_sales if s["id"] == sale_id), None)
     if not sale:
         raise HTTPException(status_code=404, detail="Venda não encontrada")
@@ -209,6 +177,7 @@ async def delete_sale(
     """
     Excluir venda (soft delete)
     """
+    from app.utils.mock_data import mock_sales
     sale = next((s for s in mock_sales if s["id"] == sale_id), None)
     if not sale:
         raise HTTPException(status_code=404, detail="Venda não encontrada")
@@ -227,6 +196,7 @@ async def get_sales_stats(
     """
     Estatísticas de vendas para dashboard
     """
+    from app.utils.mock_data import mock_sales
     sales = [s for s in mock_sales if s["status"] != "cancelada"]
     
     total_vendas = len(sales)
@@ -282,6 +252,7 @@ async def get_barber_commissions(
     """
     Calcular comissões de um barbeiro específico
     """
+    from app.utils.mock_data import mock_sales
     # Filtrar vendas do barbeiro
     barbeiro_sales = [s for s in mock_sales if s["barbeiro_nome"].lower().replace(" ", "") == barbeiro_id.lower()]
     
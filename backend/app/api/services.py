@@ -9,101 +9,10 @@ from app.models.user import User
 
 router = APIRouter()
 
-# Dados mock de serviços
-MOCK_SERVICES = [
-    {
-        "id": 1,
-        "name": "Corte Masculino",
-        "description": "Corte clássico masculino com máquina e tesoura",
-        "price": 45.00,
-        "duration_minutes": 30,
-        "category": "corte",
-        "is_active": True,
-        "barber_specialties": ["Carlos Santos", "Roberto Costa"],
-        "popularity": 95
-    },
-    {
-        "id": 2,
-        "name": "Corte Feminino",
-        "description": "Corte feminino personalizado com técnicas modernas",
-        "price": 60.00,
-        "duration_minutes": 45,
-        "category": "corte",
-        "is_active": True,
-        "barber_specialties": ["André Lima"],
-        "popularity": 88
-    },
-    {
-        "id": 3,
-        "name": "Barba Completa",
-        "description": "Aparar, modelar e finalizar a barba",
-        "price": 25.00,
-        "duration_minutes": 20,
-        "category": "barba",
-        "is_active": True,
-        "barber_specialties": ["Carlos Santos", "Roberto Costa"],
-        "popularity": 78
-    },
-    {
-        "id": 4,
-        "name": "Corte + Barba",
-        "description": "Pacote completo: corte de cabelo + barba",
-        "price": 65.00,
-        "duration_minutes": 50,
-        "category": "combo",
-        "is_active": True,
-        "barber_specialties": ["Carlos Santos", "Roberto Costa"],
-        "popularity": 92
-    },
-    {
-        "id": 5,
-        "name": "Degradê",
-        "description": "Corte degradê com transições suaves",
-        "price": 50.00,
-        "duration_minutes": 35,
-        "category": "corte",
-        "is_active": True,
-        "barber_specialties": ["Carlos Santos"],
-        "popularity": 85
-    },
-    {
-        "id": 6,
-        "name": "Luzes",
-        "description": "Aplicação de luzes e mechas",
-        "price": 120.00,
-        "duration_minutes": 90,
-        "category": "coloracao",
-        "is_active": True,
-        "barber_specialties": ["André Lima"],
-        "popularity": 65
-    },
-    {
-        "id": 7,
-        "name": "Escova Progressiva",
-        "description": "Tratamento alisante com escova progressiva",
-        "price": 150.00,
-        "duration_minutes": 120,
-        "category": "tratamento",
-        "is_active": True,
-        "barber_specialties": ["André Lima"],
-        "popularity": 45
-    },
-    {
-        "id": 8,
-        "name": "Relaxamento",
-        "description": "Tratamento relaxante para cabelo e couro cabeludo",
-        "price": 80.00,
-        "duration_minutes": 60,
-        "category": "tratamento",
-        "is_active": True,
-        "barber_specialties": ["Roberto Costa"],
-        "popularity": 55
-    }
-]
-
 @router.get("/test")
 async def test_services():
     """Endpoint de teste para serviços"""
+    from app.utils.mock_data import MOCK_SERVICES
     return {
         "message": "🛠️ API de Serviços funcionando!",
         "timestamp": datetime.utcnow().isoformat(),
@@ -131,6 +40,7 @@ async def list_services(
     db: Session = Depends(get_db)
 ):
     """Listar todos os serviços disponíveis com filtros opcionais"""
+    from app.utils.mock_data import MOCK_SERVICES
     
     # Filtrar apenas serviços ativos
     services = [service for service in MOCK_SERVICES if service["is_active"]]
@@ -165,6 +75,7 @@ async def list_categories(
     db: Session = Depends(get_db)
 ):
     """Listar todas as categorias de serviços"""
+    from app.utils.mock_data import MOCK_SERVICES
     
     categories = list(set([s["category"] for s in MOCK_SERVICES if s["is_active"]]))
     
@@ -193,6 +104,7 @@ async def get_popular_services(
     db: Session = Depends(get_db)
 ):
     """Obter serviços mais populares"""
+    from app.utils.mock_data import MOCK_SERVICES
     
     # Filtrar serviços ativos e ordenar por popularidade
     popular_services = [s for s in MOCK_SERVICES if s["is_active"]]
@@ -214,6 +126,7 @@ async def get_service(
     db: Session = Depends(get_db)
 ):
     """Obter detalhes de um serviço específico"""
+    from app.utils.mock_data import MOCK_SERVICES
     
     service = next((s for s in MOCK_SERVICES if s["id"] == service_id), None)
     
@@ -250,6 +163,7 @@ async def get_services_by_barber(
     db: Session = Depends(get_db)
 ):
     """Obter serviços disponíveis para um barbeiro específico"""
+    from app.utils.mock_data import MOCK_SERVICES
     
     # Mock: mapear ID do barbeiro para nome
     barber_names = {
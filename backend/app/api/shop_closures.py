@@ -0,0 +1,227 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_
+from typing import List, Literal, Optional
+from datetime import date, datetime
+from pydantic import BaseModel
+
+from app.core.database import get_db
+from app.core.invalidation import InvalidationKind, publish_invalidation
+from app.api.auth import get_current_active_user
+from app.models.user import User
+from app.models.barbershop import Barbershop
+from app.models.shop_closure import ShopClosure
+from app.services.closures import MAX_RECURRING_DAYS, closed_days, closure_on, default_barbershop_id
+
+router = APIRouter()
+
+# === SCHEMAS PYDANTIC ===
+
+class ShopClosureCreate(BaseModel):
+    start_date: date
+    end_date: Optional[date] = None  # Vazio = só start_date; intervalo = reforma, férias coletivas...
+    name: str
+    kind: Literal["holiday", "closure"] = "holiday"
+    recurs_yearly: bool = False  # Feriado de data fixa
+    notes: Optional[str] = None
+    barbershop_id: Optional[int] = None  # Padrão: a barbearia principal
+
+class ShopClosureBulkCreate(BaseModel):
+    closures: List[ShopClosureCreate]
+
+class ShopClosureResponse(BaseModel):
+    id: int
+    barbershop_id: int
+    start_date: date
+    end_date: date
+    name: str
+    kind: str
+    recurs_yearly: bool
+    notes: Optional[str]
+    is_active: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+# === FUNÇÕES AUXILIARES ===
+
+def require_admin(current_user: User = Depends(get_current_active_user)) -> User:
+    """Fechamentos valem para a barbearia inteira: apenas administradores"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can manage shop closures"
+        )
+    return current_user
+
+def resolve_barbershop_id(db: Session, barbershop_id: Optional[int]) -> int:
+    if barbershop_id is None:
+        barbershop_id = default_barbershop_id(db)
+    elif not db.query(Barbershop.id).filter(Barbershop.id == barbershop_id).first():
+        barbershop_id = None
+    if barbershop_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Barbershop not found"
+        )
+    return barbershop_id
+
+def build_closure(db: Session, data: ShopClosureCreate) -> ShopClosure:
+    end_date = data.end_date or data.start_date
+    if end_date < data.start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    if data.recurs_yearly and (end_date - data.start_date).days >= MAX_RECURRING_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Yearly closures must be shorter than a year"
+        )
+    return ShopClosure(
+        barbershop_id=resolve_barbershop_id(db, data.barbershop_id),
+        start_date=data.start_date,
+        end_date=end_date,
+        name=data.name,
+        kind=data.kind,
+        recurs_yearly=data.recurs_yearly,
+        notes=data.notes,
+        is_active=True
+    )
+
+# === ENDPOINTS ===
+
+@router.get("/", response_model=List[ShopClosureResponse])
+async def list_shop_closures(
+    year: Optional[int] = Query(None, ge=2000, le=2100, description="Só fechamentos que atingem o ano"),
+    barbershop_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Listar feriados e fechamentos cadastrados"""
+
+    query = db.query(ShopClosure).filter(
+        ShopClosure.barbershop_id == resolve_barbershop_id(db, barbershop_id),
+        ShopClosure.deleted_at.is_(None)
+    )
+    if year:
+        query = query.filter(and_(
+            ShopClosure.start_date <= date(year, 12, 31),
+            or_(ShopClosure.end_date >= date(year, 1, 1), ShopClosure.recurs_yearly == True)
+        ))
+
+    return query.order_by(ShopClosure.start_date).all()
+
+@router.get("/calendar")
+async def get_closure_calendar(
+    year: int = Query(..., ge=2000, le=2100),
+    barbershop_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Datas fechadas do ano (feriados anuais já repetidos no ano)"""
+
+    shop_id = resolve_barbershop_id(db, barbershop_id)
+    days = closed_days(db, shop_id, year)
+
+    return {
+        "barbershop_id": shop_id,
+        "year": year,
+        "closed_dates": [
+            {"date": day.isoformat(), "closure_id": closed.closure_id, "name": closed.name, "kind": closed.kind}
+            for day, closed in sorted(days.items())
+        ]
+    }
+
+@router.get("/check")
+async def check_shop_closure(
+    check_date: date,
+    barbershop_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    A barbearia está fechada na data?
+    Endpoint público, como o check-availability dos bloqueios.
+    """
+
+    closed = closure_on(db, resolve_barbershop_id(db, barbershop_id), check_date)
+    if closed is None:
+        return {"closed": False}
+
+    return {
+        "closed": True,
+        "closure_id": closed.closure_id,
+        "name": closed.name,
+        "kind": closed.kind
+    }
+
+@router.post("/", response_model=ShopClosureResponse, status_code=status.HTTP_201_CREATED)
+async def create_shop_closure(
+    closure_data: ShopClosureCreate,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Cadastrar feriado ou fechamento (um dia ou um intervalo de datas).
+    Vale para todos os barbeiros, sem criar bloqueios individuais.
+    """
+
+    closure = build_closure(db, closure_data)
+
+    db.add(closure)
+    db.commit()
+    db.refresh(closure)
+    publish_invalidation(InvalidationKind.SCHEDULES, entity_id=closure.barbershop_id)
+
+    return closure
+
+@router.post("/bulk", response_model=List[ShopClosureResponse], status_code=status.HTTP_201_CREATED)
+async def create_shop_closures_bulk(
+    bulk_data: ShopClosureBulkCreate,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Cadastrar vários fechamentos em uma transação (ex.: calendário de
+    feriados do ano); se algum for inválido, nenhum é gravado
+    """
+
+    closures = [build_closure(db, item) for item in bulk_data.closures]
+
+    db.add_all(closures)
+    db.commit()
+    for closure in closures:
+        db.refresh(closure)
+    for barbershop_id in {closure.barbershop_id for closure in closures}:
+        publish_invalidation(InvalidationKind.SCHEDULES, entity_id=barbershop_id)
+
+    return closures
+
+@router.delete("/{closure_id}")
+async def delete_shop_closure(
+    closure_id: int,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Remover feriado ou fechamento"""
+
+    closure = db.query(ShopClosure).filter(
+        ShopClosure.id == closure_id,
+        ShopClosure.deleted_at.is_(None)
+    ).first()
+
+    if not closure:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Closure not found"
+        )
+
+    # Soft delete
+    closure.deleted_at = datetime.now()
+    closure.is_active = False
+
+    db.commit()
+    publish_invalidation(InvalidationKind.SCHEDULES, entity_id=closure.barbershop_id)
+
+    return {"message": "Closure deleted successfully"}
@@ -0,0 +1,109 @@
+"""
+Bootstrap do banco para deploy: migrações + dados essenciais.
+
+Roda uma vez por deploy (build/pre-deploy do Render), para que os workers da
+API subam sem create_all, sem introspecção do schema e sem hash bcrypt:
+
+    python -m app.bootstrap                  # migrações + admin/barbearia padrão
+    python -m app.bootstrap --skip-seed      # só migrações
+    python -m app.bootstrap --seed-only      # só dados essenciais
+
+Bancos sem alembic_version (criados pelo create_all do startup ou do seed de
+benchmark) são marcados em vez de recriados: na última revisão, se o schema
+já é igual ao dos modelos, ou na revisão inicial, se ficou para trás. Como
+esses bancos podem já ter tabelas de migrações posteriores à inicial, toda
+migração que cria tabela ou índice deve ser idempotente (if_not_exists).
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from sqlalchemy import inspect
+
+from app.core.database import engine, ensure_essential_data
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+# Revisão equivalente ao schema que o create_all gerava
+INITIAL_REVISION = "0001"
+
+
+def get_alembic_config():
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    # Manter o logging configurado aqui (o fileConfig do alembic.ini o substituiria)
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def unversioned_revision(connection) -> str:
+    """
+    Revisão de um banco sem alembic_version: "head" quando o schema não
+    difere dos modelos (create_all atual), senão a revisão inicial
+    """
+    from alembic.autogenerate import compare_metadata
+    from alembic.migration import MigrationContext
+
+    from app.core.database import Base
+    import app.models  # noqa: F401  (registra todas as tabelas no Base.metadata)
+
+    context = MigrationContext.configure(connection, opts={"compare_type": True})
+    drift = compare_metadata(context, Base.metadata)
+    connection.commit()
+    return "head" if not drift else INITIAL_REVISION
+
+
+def run_migrations() -> None:
+    """Aplicar migrações até a última revisão (marcando bancos legados antes)"""
+    from alembic import command
+
+    config = get_alembic_config()
+    # Conexão sem transação aberta: o env.py abre uma por migração e as que
+    # criam índices CONCURRENTLY (PostgreSQL) precisam sair dela
+    with engine.connect() as connection:
+        config.attributes["connection"] = connection
+        tables = set(inspect(connection).get_table_names())
+        connection.commit()
+
+        if "alembic_version" not in tables and "users" in tables:
+            revision = unversioned_revision(connection)
+            logger.info(f"🔄 Banco criado sem migrações: marcando na revisão {revision}")
+            command.stamp(config, revision)
+
+        logger.info("🔄 Aplicando migrações...")
+        command.upgrade(config, "head")
+    logger.info("✅ Schema atualizado")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Migrações e dados essenciais do banco")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--skip-seed", action="store_true", help="Só aplicar migrações")
+    group.add_argument("--seed-only", action="store_true", help="Só criar dados essenciais")
+    args = parser.parse_args(argv)
+
+    try:
+        if not args.seed_only:
+            run_migrations()
+    except Exception as exc:
+        logger.error(f"❌ Falha ao aplicar migrações: {exc}")
+        return 1
+
+    if not args.skip_seed:
+        if not ensure_essential_data():
+            return 1
+        logger.info("✅ Dados essenciais verificados")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,625 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.database import Base, SessionLocal, get_redis
+from app.core.invalidation import InvalidationEvent, InvalidationKind, invalidation_bus
+from app.core.metrics import (
+    CACHE_COALESCED,
+    CACHE_ERRORS,
+    CACHE_HITS,
+    CACHE_MISSES,
+    CACHE_STALE_HITS,
+    record_background_job,
+)
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# === CACHE DE RESPOSTAS E CONSULTAS ===
+# Duas camadas:
+#   - L1: LRU em memória do processo (sempre ativa, TTL curto quando há Redis)
+#   - L2: Redis compartilhado entre workers (opcional)
+# Sem Redis, o L1 guarda a entrada completa e o cache continua funcionando.
+#
+# Cada entrada guarda "fresh_until" e "stale_until": depois de fresh_until o valor
+# ainda é servido (stale-while-revalidate) enquanto uma única atualização roda em
+# background. Misses simultâneos da mesma chave são coalescidos em uma única carga.
+
+# Contadores Prometheus correspondentes a cada estatística
+_STAT_COUNTERS = {
+    "hits": CACHE_HITS,
+    "stale_hits": CACHE_STALE_HITS,
+    "misses": CACHE_MISSES,
+    "coalesced": CACHE_COALESCED,
+    "errors": CACHE_ERRORS,
+}
+
+TagsSpec = Union[Sequence[str], Callable[[Dict[str, Any]], Iterable[str]]]
+
+# Tempo que o Redis fica "desligado" após uma falha antes de tentar de novo
+REDIS_RETRY_SECONDS = 30.0
+
+
+class LocalLRUCache:
+    """
+    Cache LRU em memória com expiração por entrada e índice de tags.
+    Thread-safe: endpoints síncronos rodam no threadpool do FastAPI.
+    Também serve de cache limitado para os serviços (chave hashable, valor qualquer).
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            entry, expires_at, _ = item
+            if expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: Hashable, entry: Any, expires_at: float, tags: Sequence[str] = ()) -> None:
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (entry, expires_at, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, set()):
+                    if key in self._entries:
+                        self._remove(key)
+                        removed += 1
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _remove(self, key: Hashable) -> None:
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        for tag in item[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class ResponseCache:
+    """
+    Cache em duas camadas (L1 local + L2 Redis) com coalescência de requisições,
+    stale-while-revalidate e invalidação por tags.
+    """
+
+    def __init__(self):
+        self.local = LocalLRUCache(settings.cache_local_max_entries)
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "errors": 0,
+        }
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._background_tasks: Set[asyncio.Task] = set()
+        # Lock por chave em carga, com o número de threads usando; sai do dict com a última
+        self._sync_locks: Dict[str, List[Any]] = {}
+        self._sync_refreshing: Set[str] = set()
+        self._sync_guard = threading.Lock()
+        self._redis_retry_at = 0.0
+
+    def _count(self, name: str) -> None:
+        self.stats[name] += 1
+        _STAT_COUNTERS[name].inc()
+
+    # --- chaves ---
+
+    def make_key(self, namespace: str, tenant: Any, params: Dict[str, Any]) -> str:
+        """Chave namespaced por tenant (barbearia) e pelo hash dos parâmetros"""
+        raw = json.dumps(params, sort_keys=True, default=str)
+        digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+        return f"{settings.cache_key_prefix}:{tenant}:{namespace}:{digest}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{settings.cache_key_prefix}:tag:{tag}"
+
+    # --- redis ---
+
+    def _redis(self):
+        if time.time() < self._redis_retry_at:
+            return None
+        return get_redis()
+
+    def _redis_failed(self, exc: Exception) -> None:
+        self._count("errors")
+        self._redis_retry_at = time.time() + REDIS_RETRY_SECONDS
+        logger.warning(f"⚠️ Redis indisponível para cache, usando apenas memória local: {exc}")
+
+    # --- leitura/escrita de entradas ---
+
+    def get_entry(self, key: str) -> Optional[dict]:
+        entry = self.local.get(key)
+        if entry is not None:
+            return entry
+
+        client = self._redis()
+        if client is None:
+            return None
+
+        try:
+            raw = client.get(key)
+        except Exception as exc:
+            self._redis_failed(exc)
+            return None
+
+        if raw is None:
+            return None
+
+        entry = json.loads(raw)
+        self.local.set(key, entry, self._local_expiry(entry, redis_available=True), entry.get("tags", ()))
+        return entry
+
+    def set_entry(self, key: str, value: Any, ttl: int, stale_ttl: int, tags: Sequence[str] = ()) -> dict:
+        now = time.time()
+        entry = {
+            "value": value,
+            "fresh_until": now + ttl,
+            "stale_until": now + ttl + stale_ttl,
+            "tags": list(tags),
+        }
+
+        client = self._redis()
+        redis_available = False
+        if client is not None:
+            expire_seconds = max(1, min(ttl + stale_ttl, settings.redis_expire_seconds))
+            try:
+                pipe = client.pipeline()
+                pipe.set(key, json.dumps(entry, default=str), ex=expire_seconds)
+                for tag in tags:
+                    tag_key = self._tag_key(tag)
+                    pipe.sadd(tag_key, key)
+                    pipe.expire(tag_key, settings.redis_expire_seconds)
+                pipe.execute()
+                redis_available = True
+            except Exception as exc:
+                self._redis_failed(exc)
+
+        self.local.set(key, entry, self._local_expiry(entry, redis_available), tags)
+        return entry
+
+    def _local_expiry(self, entry: dict, redis_available: bool) -> float:
+        # Com Redis, o L1 é só um atalho de curta duração; sem Redis ele é o cache
+        if redis_available:
+            return min(entry["stale_until"], time.time() + settings.cache_local_ttl_seconds)
+        return entry["stale_until"]
+
+    def invalidate_tags(self, *tags: str) -> None:
+        """Remover todas as entradas marcadas com qualquer uma das tags"""
+        tags = tuple(tag for tag in tags if tag)
+        if not tags:
+            return
+
+        self.local.invalidate_tags(tags)
+
+        client = self._redis()
+        if client is None:
+            return
+
+        try:
+            for tag in tags:
+                tag_key = self._tag_key(tag)
+                keys = client.smembers(tag_key)
+                if keys:
+                    client.delete(*keys)
+                client.delete(tag_key)
+        except Exception as exc:
+            self._redis_failed(exc)
+
+    def clear_local(self) -> None:
+        self.local.clear()
+
+    # --- carga assíncrona ---
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        tags: Sequence[str] = (),
+        refresher: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        Retornar o valor em cache ou carregá-lo.
+        `refresher` é usado na revalidação em background (ex.: com sessão de banco nova).
+        """
+        entry = self.get_entry(key)
+        now = time.time()
+
+        if entry is not None and now < entry["fresh_until"]:
+            self._count("hits")
+            return entry["value"]
+
+        if entry is not None and now < entry["stale_until"]:
+            self._count("stale_hits")
+            if key not in self._inflight:
+                self._schedule_refresh(key, refresher or loader, ttl, stale_ttl, tags)
+            return entry["value"]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._count("coalesced")
+            return await asyncio.shield(inflight)
+
+        self._count("misses")
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_future_exception)
+        self._inflight[key] = future
+        try:
+            value = jsonable_encoder(await loader())
+            self.set_entry(key, value, ttl, stale_ttl, tags)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        refresher: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        tags: Sequence[str],
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        future.add_done_callback(_consume_future_exception)
+        self._inflight[key] = future
+
+        async def refresh():
+            started = time.perf_counter()
+            try:
+                value = jsonable_encoder(await refresher())
+                self.set_entry(key, value, ttl, stale_ttl, tags)
+                self.stats["refreshes"] += 1
+                record_background_job("cache_refresh", started, success=True)
+                future.set_result(value)
+            except Exception as exc:
+                self._count("errors")
+                record_background_job("cache_refresh", started, success=False)
+                logger.warning(f"⚠️ Falha ao revalidar cache '{key}': {exc}")
+                future.set_exception(exc)
+            finally:
+                self._inflight.pop(key, None)
+
+        task = loop.create_task(refresh())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    # --- carga síncrona (funções de consulta comuns) ---
+
+    def get_or_load_sync(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: int,
+        stale_ttl: int,
+        tags: Sequence[str] = (),
+        refresher: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        entry = self.get_entry(key)
+        now = time.time()
+
+        if entry is not None and now < entry["fresh_until"]:
+            self._count("hits")
+            return entry["value"]
+
+        if entry is not None and now < entry["stale_until"]:
+            self._count("stale_hits")
+            self._schedule_refresh_sync(key, refresher or loader, ttl, stale_ttl, tags)
+            return entry["value"]
+
+        with self._sync_guard:
+            slot = self._sync_locks.get(key)
+            if slot is None:
+                slot = self._sync_locks[key] = [threading.Lock(), 0]
+            slot[1] += 1
+
+        try:
+            with slot[0]:
+                # Outra thread pode ter carregado enquanto esperávamos
+                entry = self.get_entry(key)
+                if entry is not None and time.time() < entry["fresh_until"]:
+                    self._count("coalesced")
+                    return entry["value"]
+
+                self._count("misses")
+                value = jsonable_encoder(loader())
+                self.set_entry(key, value, ttl, stale_ttl, tags)
+                return value
+        finally:
+            with self._sync_guard:
+                slot[1] -= 1
+                if slot[1] == 0:
+                    del self._sync_locks[key]
+
+    def _schedule_refresh_sync(
+        self,
+        key: str,
+        refresher: Callable[[], Any],
+        ttl: int,
+        stale_ttl: int,
+        tags: Sequence[str],
+    ) -> None:
+        with self._sync_guard:
+            if key in self._sync_refreshing:
+                return
+            self._sync_refreshing.add(key)
+
+        def refresh():
+            started = time.perf_counter()
+            try:
+                value = jsonable_encoder(refresher())
+                self.set_entry(key, value, ttl, stale_ttl, tags)
+                self.stats["refreshes"] += 1
+                record_background_job("cache_refresh", started, success=True)
+            except Exception as exc:
+                self._count("errors")
+                record_background_job("cache_refresh", started, success=False)
+                logger.warning(f"⚠️ Falha ao revalidar cache '{key}': {exc}")
+            finally:
+                with self._sync_guard:
+                    self._sync_refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"cache-refresh:{key}", daemon=True).start()
+
+
+def _consume_future_exception(future: asyncio.Future) -> None:
+    # Evita o aviso "Future exception was never retrieved" quando ninguém aguardava
+    if not future.cancelled():
+        future.exception()
+
+
+# Instância global do cache
+response_cache = ResponseCache()
+
+
+# === API PÚBLICA ===
+
+def invalidate_cache_tags(*tags: str) -> None:
+    """
+    Invalidar entradas por tag (L1 deste processo + Redis).
+    Caminhos de escrita devem usar publish_invalidation(), que também
+    limpa o L1 dos outros workers.
+    """
+    response_cache.invalidate_tags(*tags)
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Estatísticas de acerto/erro do cache"""
+    return {
+        **response_cache.stats,
+        "local_entries": len(response_cache.local),
+        "redis_available": response_cache._redis() is not None,
+    }
+
+
+# === INTEGRAÇÃO COM O BARRAMENTO DE INVALIDAÇÃO ===
+
+def cache_tags_for_event(event: InvalidationEvent) -> List[str]:
+    """Tags de cache afetadas por um evento de invalidação"""
+    if event.kind == InvalidationKind.APPOINTMENTS:
+        availability = f"availability:barber:{event.barber_id}" if event.barber_id else "availability"
+        return ["appointments", availability]
+    if event.kind == InvalidationKind.SCHEDULES and event.barber_id is None:
+        # Horário ou calendário de fechamentos da barbearia
+        return ["availability", "closures"]
+    if event.kind in (InvalidationKind.BARBER_BLOCKS, InvalidationKind.SCHEDULES):
+        return [f"availability:barber:{event.barber_id}" if event.barber_id else "availability"]
+    if event.kind == InvalidationKind.CLIENTS:
+        return ["clients"]
+    return []
+
+
+def _on_invalidation(event: InvalidationEvent) -> None:
+    tags = cache_tags_for_event(event)
+    if invalidation_bus.is_local(event):
+        response_cache.invalidate_tags(*tags)
+    else:
+        # O worker de origem já limpou o Redis; aqui só o L1 deste processo
+        response_cache.local.invalidate_tags(tags)
+
+
+invalidation_bus.subscribe(_on_invalidation)
+invalidation_bus.on_reconnect(response_cache.clear_local)
+
+
+def shared_tenant(arguments: Dict[str, Any]) -> str:
+    """Tenant de consultas que agregam o banco inteiro (sem escopo de barbearia)"""
+    return "shared"
+
+
+def _is_key_param(value: Any) -> bool:
+    """Sessões, objetos ORM e requests não entram na chave do cache"""
+    return not isinstance(value, (Session, Base, Request))
+
+
+def _resolve_tags(tags: TagsSpec, arguments: Dict[str, Any]) -> List[str]:
+    if callable(tags):
+        return [tag for tag in tags(arguments) if tag]
+    return list(tags)
+
+
+async def _maybe_await(result: Any) -> Any:
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+def _call_with_fresh_sessions(func: Callable, arguments: Dict[str, Any]) -> Tuple[Any, List[Session]]:
+    """
+    Chamar `func` trocando sessões de banco por sessões novas.
+    A sessão da requisição original já foi fechada quando a revalidação roda.
+    """
+    sessions: List[Session] = []
+    call_args = {}
+    for name, value in arguments.items():
+        if isinstance(value, Session):
+            value = SessionLocal()
+            sessions.append(value)
+        call_args[name] = value
+    try:
+        return func(**call_args), sessions
+    except BaseException:
+        for session in sessions:
+            session.close()
+        raise
+
+
+def cached(
+    namespace: str,
+    ttl: Optional[int] = None,
+    stale_ttl: Optional[int] = None,
+    tags: TagsSpec = (),
+    tenant: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    vary_on_user: bool = False,
+):
+    """
+    Decorator de cache para endpoints GET e funções de consulta custosas.
+
+    - **namespace**: identifica o endpoint/consulta na chave
+    - **ttl**: segundos em que o valor é considerado fresco
+    - **stale_ttl**: segundos extras em que o valor antigo é servido enquanto revalida
+    - **tags**: lista de tags (ou função dos argumentos) usadas na invalidação
+    - **tenant**: função dos argumentos que retorna o tenant; obrigatória quando
+      a função não recebe `barbershop_id` (use `shared_tenant` para consultas
+      que não dependem da barbearia)
+    - **vary_on_user**: inclui o usuário atual na chave (respostas por usuário)
+
+    Uso:
+        @router.get("/revenue")
+        @cached("analytics:revenue", ttl=60, tags=["appointments"], tenant=shared_tenant)
+        async def get_revenue_over_time(...):
+    """
+    def decorator(func: Callable):
+        signature = inspect.signature(func)
+        if tenant is None and "barbershop_id" not in signature.parameters:
+            # Sem tenant, entradas de barbearias diferentes dividiriam a mesma chave
+            raise TypeError(f"@cached('{namespace}'): informe tenant= (a função não recebe barbershop_id)")
+
+        def build(args, kwargs):
+            bound = signature.bind_partial(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+
+            params = {name: value for name, value in arguments.items() if _is_key_param(value)}
+            if vary_on_user:
+                user = arguments.get("current_user")
+                if user is not None:
+                    params["__user__"] = [user.id, getattr(user.role, "value", user.role)]
+
+            tenant_id = tenant(arguments) if tenant else arguments["barbershop_id"]
+            key = response_cache.make_key(namespace, tenant_id, params)
+            return key, _resolve_tags(tags, arguments), arguments
+
+        fresh_ttl = ttl if ttl is not None else settings.cache_default_ttl_seconds
+        stale_window = stale_ttl if stale_ttl is not None else settings.cache_stale_ttl_seconds
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not settings.cache_enabled:
+                    return await func(*args, **kwargs)
+
+                key, entry_tags, arguments = build(args, kwargs)
+
+                async def refresher():
+                    result, sessions = _call_with_fresh_sessions(func, arguments)
+                    try:
+                        return await _maybe_await(result)
+                    finally:
+                        for session in sessions:
+                            session.close()
+
+                return await response_cache.get_or_load(
+                    key,
+                    loader=lambda: func(*args, **kwargs),
+                    ttl=fresh_ttl,
+                    stale_ttl=stale_window,
+                    tags=entry_tags,
+                    refresher=refresher,
+                )
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            if not settings.cache_enabled:
+                return func(*args, **kwargs)
+
+            key, entry_tags, arguments = build(args, kwargs)
+
+            def refresher():
+                result, sessions = _call_with_fresh_sessions(func, arguments)
+                try:
+                    return result
+                finally:
+                    for session in sessions:
+                        session.close()
+
+            return response_cache.get_or_load_sync(
+                key,
+                loader=lambda: func(*args, **kwargs),
+                ttl=fresh_ttl,
+                stale_ttl=stale_window,
+                tags=entry_tags,
+                refresher=refresher,
+            )
+
+        return sync_wrapper
+
+    return decorator
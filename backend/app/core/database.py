@@ -1,13 +1,17 @@
 from sqlalchemy import create_engine, MetaData, text
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from sqlalchemy.pool import StaticPool
-import redis
-from typing import Generator
+from typing import TYPE_CHECKING, Generator, Optional
 import logging
+import threading
 import json
 
 from app.core.config import settings
+from app.core.db_pool import InstrumentedQueuePool, instrument_engine
+from app.core.sql_instrumentation import instrument_sql
+
+if TYPE_CHECKING:
+    import redis
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -48,19 +52,26 @@ else:
 connect_args = {}
 if DATABASE_URL.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
-    poolclass = StaticPool
 else:
     # Para PostgreSQL no Render, às vezes é necessário passar via connect_args explicitamente
     if "sslmode=require" in DATABASE_URL:
         connect_args = {"sslmode": "require"}
-    poolclass = None
+    # Limite de tempo por statement, aplicado na abertura de cada conexão
+    if settings.db_statement_timeout_ms > 0:
+        connect_args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+
+# SQLite em memória precisa de uma única conexão compartilhada (StaticPool);
+# SQLite em arquivo e PostgreSQL usam o pool instrumentado
+is_sqlite_memory = DATABASE_URL.startswith("sqlite") and (
+    ":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") in ("sqlite:", "sqlite:/")
+)
 
 # Criar engine do SQLAlchemy
-if poolclass:
+if is_sqlite_memory:
     engine = create_engine(
         DATABASE_URL,
         connect_args=connect_args,
-        poolclass=poolclass,
+        poolclass=StaticPool,
         echo=settings.database_echo
     )
 else:
@@ -70,10 +81,23 @@ else:
         DATABASE_URL,
         connect_args=connect_args,
         echo=settings.database_echo,
-        pool_pre_ping=True,  # Verificar conexão antes de usar
-        pool_size=5,
-        max_overflow=10
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=settings.db_pool_pre_ping,  # Verificar conexão antes de usar
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle
     )
+    logger.info(
+        f"⚙️ Pool de conexões: size={settings.db_pool_size}, "
+        f"max_overflow={settings.db_max_overflow}, timeout={settings.db_pool_timeout}s"
+    )
+
+# Métricas de checkout, espera e invalidação do pool
+instrument_engine(engine)
+
+# Contagem e tempo de queries por requisição (detecção de N+1)
+instrument_sql(engine)
 
 # Criar SessionLocal
 SessionLocal = sessionmaker(
@@ -89,21 +113,32 @@ Base = declarative_base()
 metadata = MetaData()
 
 # === CONFIGURAÇÃO DO REDIS ===
+# Conexão aberta no primeiro get_redis(), não na importação: um Redis lento ou
+# inacessível não atrasa o boot (o ping pode esperar até o timeout de conexão)
 
-try:
-    redis_client = redis.from_url(
-        settings.redis_url,
-        decode_responses=True,
-        socket_connect_timeout=5,
-        socket_timeout=5,
-        retry_on_timeout=True
-    )
-    # Testar conexão
-    redis_client.ping()
-    logger.info("✅ Conexão com Redis estabelecida")
-except Exception as e:
-    logger.warning(f"⚠️ Não foi possível conectar ao Redis: {e}")
-    redis_client = None
+redis_client = None
+_redis_checked = False
+_redis_lock = threading.Lock()
+
+def _connect_redis():
+    # Cliente redis importado só aqui: fora do caminho de boot
+    import redis
+
+    try:
+        client = redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_connect_timeout=5,
+            socket_timeout=5,
+            retry_on_timeout=True
+        )
+        # Testar conexão
+        client.ping()
+        logger.info("✅ Conexão com Redis estabelecida")
+        return client
+    except Exception as e:
+        logger.warning(f"⚠️ Não foi possível conectar ao Redis: {e}")
+        return None
 
 # === DEPENDENCY INJECTION ===
 
@@ -122,19 +157,123 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
-def get_redis() -> redis.Redis:
+def get_redis() -> Optional["redis.Redis"]:
     """
     Dependency para obter cliente Redis.
     Retorna None se Redis não estiver disponível.
     """
+    global redis_client, _redis_checked
+    if not _redis_checked:
+        with _redis_lock:
+            if not _redis_checked:
+                redis_client = _connect_redis()
+                _redis_checked = True
     return redis_client
 
 # === FUNÇÕES UTILITÁRIAS ===
 
+def ensure_essential_data():
+    """
+    Garantir os dados essenciais: admin padrão e barbearia padrão.
+    Idempotente; roda no bootstrap (deploy) ou no init_database (desenvolvimento).
+    """
+    from app.models.barbershop import Barbershop
+    from app.models.user import User, UserRole, UserStatus
+    from passlib.context import CryptContext
+    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    get_password_hash = lambda pwd: pwd_context.hash(pwd)
+    
+    db = SessionLocal()
+    try:
+        logger.info("🔄 Verificando dados essenciais...")
+        
+        # Sempre garantir que exista o admin padrão (email/senha conhecidos)
+        # (em alguns cenários o banco já existe e só havia admin diferente)
+        admin_user = db.query(User).filter(User.email == "admin@barbeariadodudao.com").first()
+        if not admin_user:
+            logger.info("🔄 Criando usuário admin padrão...")
+            admin_user = User(
+                email="admin@barbeariadodudao.com",
+                hashed_password=get_password_hash("dudao123"),
+                full_name="Administrador",
+                role=UserRole.ADMIN,
+                status=UserStatus.ACTIVE,
+                is_verified=True
+            )
+            db.add(admin_user)
+            db.commit()
+            db.refresh(admin_user)
+            logger.info("✅ Usuário admin criado")
+
+        # Verificar se já existe barbearia com id=1
+        existing_barbershop = db.query(Barbershop).filter(Barbershop.id == 1).first()
+        
+        if not existing_barbershop:
+            logger.info("🔄 Criando barbearia padrão...")
+            
+            # Criar barbearia padrão usando ORM (mais confiável)
+            opening_hours_data = {
+                "0": {"open": "08:00", "close": "18:00", "break_start": "12:00", "break_end": "13:00"},
+                "1": {"open": "08:00", "close": "18:00", "break_start": "12:00", "break_end": "13:00"},
+                "2": {"open": "08:00", "close": "18:00", "break_start": "12:00", "break_end": "13:00"},
+                "3": {"open": "08:00", "close": "18:00", "break_start": "12:00", "break_end": "13:00"},
+                "4": {"open": "08:00", "close": "18:00", "break_start": "12:00", "break_end": "13:00"},
+                "5": {"open": "08:00", "close": "18:00", "break_start": "12:00", "break_end": "13:00"},
+                "6": {"open": "09:00", "close": "14:00"}
+            }
+            
+            default_barbershop = Barbershop(
+                name="Barbearia Principal",
+                slug="barbearia-principal",
+                description="Barbearia principal do sistema",
+                email="contato@barbearia.com",
+                phone="(11) 99999-9999",
+                owner_id=admin_user.id,
+                is_active=True,
+                accepts_online_booking=True,
+                default_appointment_duration=30,
+                max_appointments_per_day=20,
+                opening_hours=opening_hours_data
+            )
+            db.add(default_barbershop)
+            db.flush()  # Flush para obter o ID
+            
+            # Não tentar forçar ID=1, apenas usar o ID gerado
+            # O importante é que a barbearia exista
+            
+            db.commit()
+            db.refresh(default_barbershop)
+            logger.info(f"✅ Barbearia padrão criada com ID={default_barbershop.id}")
+            
+            # Verificar se realmente foi criada
+            verify_barbershop = db.query(Barbershop).filter(Barbershop.id == default_barbershop.id).first()
+            if verify_barbershop:
+                logger.info(f"✅ Verificação: Barbearia ID={verify_barbershop.id} existe no banco")
+            else:
+                logger.error(f"❌ ERRO: Barbearia não foi criada corretamente!")
+        else:
+            logger.info("✅ Barbearia padrão já existe")
+    
+    except Exception as e:
+        logger.error(f"⚠️ Erro ao criar dados essenciais: {e}")
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        db.rollback()
+        # init_database não trata como falha, pois as tabelas já foram criadas;
+        # o bootstrap usa o retorno para sair com erro
+        return False
+    finally:
+        db.close()
+    
+    return True
+
 def init_database():
     """
     Inicializar banco de dados criando todas as tabelas e dados essenciais.
     """
+    # Registrar todos os modelos no Base.metadata (main não importa mais os routers no boot)
+    import app.models  # noqa: F401
+
     try:
         # Criar todas as tabelas
         logger.info("🔄 Criando tabelas do banco de dados...")
@@ -142,92 +281,7 @@ def init_database():
         logger.info("✅ Tabelas criadas com sucesso")
         
         # Criar dados essenciais (admin + barbearia padrão)
-        from app.models.barbershop import Barbershop
-        from app.models.user import User, UserRole, UserStatus
-        from passlib.context import CryptContext
-        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-        get_password_hash = lambda pwd: pwd_context.hash(pwd)
-        
-        db = SessionLocal()
-        try:
-            logger.info("🔄 Verificando dados essenciais...")
-            
-            # Sempre garantir que exista o admin padrão (email/senha conhecidos)
-            # (em alguns cenários o banco já existe e só havia admin diferente)
-            admin_user = db.query(User).filter(User.email == "admin@barbeariadodudao.com").first()
-            if not admin_user:
-                logger.info("🔄 Criando usuário admin padrão...")
-                admin_user = User(
-                    email="admin@barbeariadodudao.com",
-                    hashed_password=get_password_hash("dudao123"),
-                    full_name="Administrador",
-                    role=UserRole.ADMIN,
-                    status=UserStatus.ACTIVE,
-                    is_verified=True
-                )
-                db.add(admin_user)
-                db.commit()
-                db.refresh(admin_user)
-                logger.info("✅ Usuário admin criado")
-
-            # Verificar se já existe barbearia com id=1
-            existing_barbershop = db.query(Barbershop).filter(Barbershop.id == 1).first()
-            
-            if not existing_barbershop:
-                logger.info("🔄 Criando barbearia padrão...")
-                
-                # Criar barbearia padrão usando ORM (mais confiável)
-                opening_hours_data = {
-                    "0": {"open": "08:00", "close": "18:00", "break_start": "12:00", "break_end": "13:00"},
-                    "1": {"open": "08:00", "close": "18:00", "break_start": "12:00", "break_end": "13:00"},
-                    "2": {"open": "08:00", "close": "18:00", "break_start": "12:00", "break_end": "13:00"},
-                    "3": {"open": "08:00", "close": "18:00", "break_start": "12:00", "break_end": "13:00"},
-                    "4": {"open": "08:00", "close": "18:00", "break_start": "12:00", "break_end": "13:00"},
-                    "5": {"open": "08:00", "close": "18:00", "break_start": "12:00", "break_end": "13:00"},
-                    "6": {"open": "09:00", "close": "14:00"}
-                }
-                
-                default_barbershop = Barbershop(
-                    name="Barbearia Principal",
-                    slug="barbearia-principal",
-                    description="Barbearia principal do sistema",
-                    email="contato@barbearia.com",
-                    phone="(11) 99999-9999",
-                    owner_id=admin_user.id,
-                    is_active=True,
-                    accepts_online_booking=True,
-                    default_appointment_duration=30,
-                    max_appointments_per_day=20,
-                    opening_hours=opening_hours_data
-                )
-                db.add(default_barbershop)
-                db.flush()  # Flush para obter o ID
-                
-                # Não tentar forçar ID=1, apenas usar o ID gerado
-                # O importante é que a barbearia exista
-                
-                db.commit()
-                db.refresh(default_barbershop)
-                logger.info(f"✅ Barbearia padrão criada com ID={default_barbershop.id}")
-                
-                # Verificar se realmente foi criada
-                verify_barbershop = db.query(Barbershop).filter(Barbershop.id == default_barbershop.id).first()
-                if verify_barbershop:
-                    logger.info(f"✅ Verificação: Barbearia ID={verify_barbershop.id} existe no banco")
-                else:
-                    logger.error(f"❌ ERRO: Barbearia não foi criada corretamente!")
-            else:
-                logger.info("✅ Barbearia padrão já existe")
-        
-        except Exception as e:
-            logger.error(f"⚠️ Erro ao criar dados essenciais: {e}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            db.rollback()
-            # Não retornar False aqui, pois as tabelas já foram criadas
-            # Apenas logar o erro e continuar
-        finally:
-            db.close()
+        ensure_essential_data()
         
         logger.info("✅ Banco de dados inicializado completamente")
         return True
@@ -0,0 +1,140 @@
+import logging
+import time
+from typing import Any, Dict, Iterator, Tuple
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.core.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUTS,
+    DB_POOL_CONNECTS,
+    DB_POOL_INVALIDATIONS,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SLOW_CHECKOUTS,
+    DB_POOL_SOFT_INVALIDATIONS,
+    DB_POOL_TIMEOUTS,
+    DB_POOL_WAIT,
+)
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# === INSTRUMENTAÇÃO DO POOL DE CONEXÕES ===
+# Mede quanto tempo cada checkout espera por uma conexão, quantas conexões de
+# overflow estão em uso e quantas são invalidadas. Serve para dimensionar o
+# pool contra os limites de conexões do Supabase/Render com dados reais.
+
+# As métricas Prometheus (DB_POOL_*) são a única fonte: o endpoint de
+# diagnóstico lê os mesmos valores que o /metrics exporta, deste worker.
+
+
+def _samples(metric) -> Iterator[Tuple[str, Dict[str, str], float]]:
+    for family in metric.collect():
+        for sample in family.samples:
+            yield sample.name, sample.labels, sample.value
+
+
+def _metric_value(metric, name: str) -> float:
+    return next((value for sample_name, _, value in _samples(metric) if sample_name == name), 0.0)
+
+
+def pool_stats_snapshot() -> Dict[str, Any]:
+    """Contadores e histograma de espera do pool (ms, cumulativo), lidos das métricas"""
+    histogram = []
+    for name, labels, value in _samples(DB_POOL_WAIT):
+        if name.endswith("_bucket"):
+            bound = labels["le"]
+            histogram.append({
+                "le_ms": bound if bound == "+Inf" else round(float(bound) * 1000, 3),
+                "count": int(value),
+            })
+
+    wait_count = int(_metric_value(DB_POOL_WAIT, "db_pool_checkout_wait_seconds_count"))
+    wait_sum_ms = _metric_value(DB_POOL_WAIT, "db_pool_checkout_wait_seconds_sum") * 1000
+    return {
+        "checkouts": int(_metric_value(DB_POOL_CHECKOUTS, "db_pool_checkouts_total")),
+        "connects": int(_metric_value(DB_POOL_CONNECTS, "db_pool_connects_total")),
+        "invalidations": int(_metric_value(DB_POOL_INVALIDATIONS, "db_pool_invalidations_total")),
+        "soft_invalidations": int(_metric_value(DB_POOL_SOFT_INVALIDATIONS, "db_pool_soft_invalidations_total")),
+        "timeouts": int(_metric_value(DB_POOL_TIMEOUTS, "db_pool_timeouts_total")),
+        "slow_waits": int(_metric_value(DB_POOL_SLOW_CHECKOUTS, "db_pool_slow_checkouts_total")),
+        "wait_ms": {
+            "count": wait_count,
+            "sum": round(wait_sum_ms, 3),
+            "avg": round(wait_sum_ms / wait_count, 3) if wait_count else 0.0,
+            "histogram": histogram,
+        },
+    }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool que mede o tempo de espera de cada checkout.
+    Esperas acima de `db_pool_slow_checkout_ms` são logadas com o estado do pool.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            logger.error(f"❌ Timeout aguardando conexão do banco: {self.status()}")
+            raise
+        finally:
+            wait_ms = (time.perf_counter() - started) * 1000
+            DB_POOL_WAIT.observe(wait_ms / 1000)
+            DB_POOL_OVERFLOW.set(max(self.overflow(), 0))
+            if wait_ms >= settings.db_pool_slow_checkout_ms:
+                DB_POOL_SLOW_CHECKOUTS.inc()
+                logger.warning(f"⚠️ Checkout lento do pool: {wait_ms:.1f}ms ({self.status()})")
+
+
+def instrument_engine(engine) -> None:
+    """Registrar listeners de eventos do pool no engine"""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTS.inc()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.inc()
+        DB_POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        DB_POOL_INVALIDATIONS.inc()
+        logger.warning(f"⚠️ Conexão do pool invalidada: {exception}")
+
+    @event.listens_for(engine, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_connection, connection_record, exception):
+        DB_POOL_SOFT_INVALIDATIONS.inc()
+
+
+def get_pool_status(engine) -> Dict[str, Any]:
+    """Estado atual do pool + estatísticas acumuladas"""
+    pool = engine.pool
+    status = {
+        "pool_class": type(pool).__name__,
+        "stats": pool_stats_snapshot(),
+    }
+
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            # overflow() é negativo enquanto o pool base não está cheio
+            "overflow_in_use": max(pool.overflow(), 0),
+            "max_overflow": settings.db_max_overflow,
+            "timeout_seconds": pool.timeout(),
+        })
+
+    return status
@@ -0,0 +1,161 @@
+import asyncio
+import importlib.util
+import logging
+from typing import Callable, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.tracing import TracingTransport
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# === CLIENTE HTTP COMPARTILHADO ===
+# Um único httpx.AsyncClient por processo: mantém conexões keep-alive (e HTTP/2,
+# quando disponível) entre logins e chamadas a provedores externos, evitando
+# pagar TCP + TLS a cada requisição. Toda integração externa (Google OAuth,
+# notificações, pagamentos) deve usar get_http_client().
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """
+    Stream de resposta que libera a vaga do host quando o corpo é fechado.
+    A conexão só volta ao pool depois que o corpo foi consumido.
+    """
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    Transport que limita conexões simultâneas por host.
+    O httpx só oferece limites globais do pool; aqui cada host ganha seu
+    próprio semáforo para que um provedor lento não esgote o pool inteiro.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int):
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore_for(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self._max_per_host))
+        return semaphore
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        semaphore = self._semaphore_for(request.url.host)
+        await semaphore.acquire()
+
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                semaphore.release()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+
+        # Corpo já em memória (ex.: httpx.MockTransport): o cliente nunca
+        # fecharia o stream, então a vaga é liberada aqui
+        if response.is_closed:
+            release()
+            return response
+
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _http2_available() -> bool:
+    """HTTP/2 depende do pacote opcional `h2` (httpx[http2])"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_http_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """
+    Criar um AsyncClient configurado a partir das Settings.
+    `transport` permite injetar um transport alternativo (ex.: httpx.MockTransport em testes).
+    """
+    limits = httpx.Limits(
+        max_connections=settings.http_client_max_connections,
+        max_keepalive_connections=settings.http_client_max_keepalive_connections,
+        keepalive_expiry=settings.http_client_keepalive_expiry_seconds,
+    )
+    timeout = httpx.Timeout(
+        settings.http_client_timeout_seconds,
+        connect=settings.http_client_connect_timeout_seconds,
+    )
+
+    http2 = settings.http_client_http2 and _http2_available()
+    if settings.http_client_http2 and not http2:
+        logger.warning("⚠️ Pacote 'h2' não instalado, cliente HTTP usando apenas HTTP/1.1")
+
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+
+    return httpx.AsyncClient(
+        transport=TracingTransport(HostLimitedTransport(transport, settings.http_client_max_connections_per_host)),
+        timeout=timeout,
+        headers={"User-Agent": f"{settings.app_name}/{settings.app_version}"},
+    )
+
+
+async def start_http_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """
+    Criar o cliente compartilhado (chamado no startup da aplicação).
+    """
+    global _client
+    if _client is not None and not _client.is_closed:
+        return _client
+
+    _client = build_http_client(transport)
+    logger.info("✅ Cliente HTTP compartilhado criado")
+    return _client
+
+
+async def close_http_client() -> None:
+    """
+    Fechar o cliente compartilhado e suas conexões (chamado no shutdown).
+    """
+    global _client
+    if _client is None:
+        return
+
+    client, _client = _client, None
+    await client.aclose()
+    logger.info("✅ Cliente HTTP compartilhado fechado")
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Obter o cliente HTTP compartilhado.
+    Se o startup não rodou (scripts, testes), cria o cliente sob demanda.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_http_client()
+    return _client
@@ -0,0 +1,331 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import get_redis
+from app.core.metrics import INVALIDATION_EVENTS, INVALIDATION_RECONNECTS
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# === BARRAMENTO DE INVALIDAÇÃO ENTRE WORKERS ===
+# Cada worker mantém caches em memória (L1 de respostas, agendas, calendários).
+# Quando um worker grava, ele publica um evento tipado; todos os workers aplicam
+# o evento aos seus caches locais. O worker de origem aplica imediatamente e
+# ignora o eco que volta pelo Redis.
+#
+# Backends:
+#   - redis: pub/sub em um canal, com uma thread ouvinte por processo
+#   - memory: hub em memória (testes e execução com um único worker)
+
+
+class InvalidationKind(str, Enum):
+    """Tipos de evento de invalidação"""
+    APPOINTMENTS = "appointments"
+    BARBER_BLOCKS = "barber_blocks"
+    CLIENTS = "clients"
+    SCHEDULES = "schedules"  # working_hours do barbeiro / opening_hours e fechamentos da barbearia
+
+
+@dataclass(frozen=True)
+class InvalidationEvent:
+    """
+    Evento publicado após o commit de uma escrita.
+    `barber_id` e `entity_id` permitem invalidar só o necessário; quando
+    ausentes, os assinantes devem descartar tudo daquele tipo.
+    """
+    kind: InvalidationKind
+    barber_id: Optional[int] = None
+    entity_id: Optional[int] = None
+    origin: str = ""
+    published_at: float = field(default_factory=time.time)
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["kind"] = self.kind.value
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, payload) -> "InvalidationEvent":
+        if isinstance(payload, bytes):
+            payload = payload.decode("utf-8")
+        data = json.loads(payload)
+        data["kind"] = InvalidationKind(data["kind"])
+        return cls(**data)
+
+
+InvalidationHandler = Callable[[InvalidationEvent], None]
+MessageCallback = Callable[[str], None]
+
+
+# === BACKENDS ===
+
+class InMemoryHub:
+    """Hub em memória: entrega cada mensagem a todos os backends conectados"""
+
+    def __init__(self):
+        self._subscribers: List[MessageCallback] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: MessageCallback) -> None:
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: MessageCallback) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def publish(self, payload: str) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(payload)
+
+
+class InMemoryBackend:
+    """
+    Backend em memória.
+    Vários barramentos ligados ao mesmo hub simulam vários workers nos testes.
+    """
+
+    name = "memory"
+
+    def __init__(self, hub: Optional[InMemoryHub] = None):
+        self.hub = hub or InMemoryHub()
+        self._callback: Optional[MessageCallback] = None
+
+    def start(self, on_message: MessageCallback, on_reconnect: Callable[[], None]) -> None:
+        self._callback = on_message
+        self.hub.subscribe(on_message)
+
+    def publish(self, payload: str) -> None:
+        self.hub.publish(payload)
+
+    def stop(self) -> None:
+        if self._callback is not None:
+            self.hub.unsubscribe(self._callback)
+            self._callback = None
+
+
+class RedisPubSubBackend:
+    """
+    Backend Redis pub/sub.
+    A thread ouvinte reconecta sozinha; como mensagens publicadas durante a
+    queda são perdidas, `on_reconnect` é chamado para descartar os caches locais.
+    """
+
+    name = "redis"
+
+    def __init__(self, client, channel: str):
+        self.client = client
+        self.channel = channel
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, on_message: MessageCallback, on_reconnect: Callable[[], None]) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._listen,
+            args=(on_message, on_reconnect),
+            name="invalidation-bus",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def publish(self, payload: str) -> None:
+        self.client.publish(self.channel, payload)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _listen(self, on_message: MessageCallback, on_reconnect: Callable[[], None]) -> None:
+        backoff = 1.0
+        first_connection = True
+
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                if not first_connection:
+                    logger.info("✅ Barramento de invalidação reconectado ao Redis")
+                    on_reconnect()
+                first_connection = False
+                backoff = 1.0
+
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        on_message(message["data"])
+            except Exception as exc:
+                if self._stop.is_set():
+                    break
+                logger.warning(f"⚠️ Barramento de invalidação sem Redis, tentando de novo em {backoff:.0f}s: {exc}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+
+# === BARRAMENTO ===
+
+class InvalidationBus:
+    """
+    Publica e distribui eventos de invalidação.
+    Handlers rodam no worker de origem (na hora) e nos demais (via backend).
+    """
+
+    def __init__(self, backend=None):
+        self._backend = backend
+        self._started = False
+        self._handlers: Dict[Optional[InvalidationKind], List[InvalidationHandler]] = {}
+        self._reconnect_handlers: List[Callable[[], None]] = []
+        self._origin = ""
+        self._origin_pid = None
+
+    @property
+    def origin(self) -> str:
+        # Recalculado após fork (gunicorn/uvicorn workers) para cada processo ter o seu
+        pid = os.getpid()
+        if self._origin_pid != pid:
+            self._origin = f"{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:8]}"
+            self._origin_pid = pid
+        return self._origin
+
+    @property
+    def backend_name(self) -> Optional[str]:
+        return self._backend.name if self._started and self._backend else None
+
+    def subscribe(self, handler: InvalidationHandler, kind: Optional[InvalidationKind] = None) -> None:
+        """Registrar handler para um tipo de evento (ou para todos, se `kind` for None)"""
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def on_reconnect(self, handler: Callable[[], None]) -> None:
+        """Registrar handler chamado quando eventos podem ter sido perdidos"""
+        self._reconnect_handlers.append(handler)
+
+    def is_local(self, event: InvalidationEvent) -> bool:
+        return event.origin == self.origin
+
+    def publish(
+        self,
+        kind: InvalidationKind,
+        barber_id: Optional[int] = None,
+        entity_id: Optional[int] = None,
+    ) -> InvalidationEvent:
+        """Aplicar o evento localmente e distribuí-lo aos outros workers"""
+        event = InvalidationEvent(kind=kind, barber_id=barber_id, entity_id=entity_id, origin=self.origin)
+        INVALIDATION_EVENTS.labels(kind.value, "published").inc()
+        self._dispatch(event)
+
+        if self._started and self._backend is not None:
+            try:
+                self._backend.publish(event.to_json())
+            except Exception as exc:
+                logger.warning(f"⚠️ Falha ao publicar evento de invalidação {kind.value}: {exc}")
+
+        return event
+
+    def start(self, backend=None) -> None:
+        if self._started:
+            return
+        if backend is not None:
+            self._backend = backend
+        if self._backend is None:
+            return
+
+        self._backend.start(self._on_message, self._on_reconnect)
+        self._started = True
+        logger.info(f"✅ Barramento de invalidação ativo (backend: {self._backend.name})")
+
+    def stop(self) -> None:
+        if not self._started:
+            return
+        self._backend.stop()
+        self._started = False
+
+    def _on_message(self, payload) -> None:
+        try:
+            event = InvalidationEvent.from_json(payload)
+        except Exception as exc:
+            logger.warning(f"⚠️ Evento de invalidação inválido ignorado: {exc}")
+            return
+
+        if self.is_local(event):
+            return
+        INVALIDATION_EVENTS.labels(event.kind.value, "received").inc()
+        self._dispatch(event)
+
+    def _on_reconnect(self) -> None:
+        INVALIDATION_RECONNECTS.inc()
+        for handler in list(self._reconnect_handlers):
+            try:
+                handler()
+            except Exception as exc:
+                logger.error(f"❌ Erro no handler de reconexão: {exc}")
+
+    def _dispatch(self, event: InvalidationEvent) -> None:
+        handlers = self._handlers.get(event.kind, []) + self._handlers.get(None, [])
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception as exc:
+                logger.error(f"❌ Erro ao aplicar invalidação {event.kind.value}: {exc}")
+
+
+# Instância global do barramento
+invalidation_bus = InvalidationBus()
+
+
+def publish_invalidation(
+    kind: InvalidationKind,
+    barber_id: Optional[int] = None,
+    entity_id: Optional[int] = None,
+) -> InvalidationEvent:
+    """
+    Publicar evento de invalidação.
+    Chamar sempre depois do commit da escrita.
+    """
+    return invalidation_bus.publish(kind, barber_id=barber_id, entity_id=entity_id)
+
+
+def start_invalidation_bus() -> None:
+    """
+    Iniciar o barramento (chamado no startup da aplicação).
+    Backend definido por INVALIDATION_BUS_BACKEND: auto, redis, memory ou none.
+    """
+    backend_name = settings.invalidation_bus_backend.lower()
+    if backend_name == "none":
+        return
+
+    redis_client = get_redis()
+    if backend_name == "redis" or (backend_name == "auto" and redis_client is not None):
+        if redis_client is None:
+            logger.warning("⚠️ Redis indisponível, barramento de invalidação em memória (apenas este worker)")
+            invalidation_bus.start(InMemoryBackend())
+            return
+        invalidation_bus.start(RedisPubSubBackend(redis_client, settings.invalidation_bus_channel))
+        return
+
+    invalidation_bus.start(InMemoryBackend())
+
+
+def stop_invalidation_bus() -> None:
+    """Parar o barramento (chamado no shutdown da aplicação)"""
+    invalidation_bus.stop()
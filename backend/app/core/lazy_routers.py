@@ -0,0 +1,72 @@
+import importlib
+import logging
+import threading
+import time
+from typing import Dict, List, Tuple
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# === ROUTERS SOB DEMANDA ===
+# Importar todos os routers no boot custa a maior parte do cold start: cada
+# rota monta dependências e modelos Pydantic na importação. Com
+# LAZY_ROUTERS=true o módulo de um router só é importado (e incluído no app)
+# na primeira requisição ao seu prefixo; docs e openapi.json carregam todos.
+# Com LAZY_ROUTERS=false tudo é carregado no boot, como antes.
+
+
+class LazyRouters:
+    """Registro de routers (módulo, prefixo, tags) incluídos no app sob demanda"""
+
+    def __init__(self, app):
+        self.app = app
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Tuple[str, List[str]]] = {}
+
+    def add(self, module_path: str, prefix: str, tags: List[str]) -> None:
+        self._pending[prefix] = (module_path, tags)
+
+    @property
+    def pending(self) -> List[str]:
+        return list(self._pending)
+
+    def load(self, prefix: str) -> None:
+        with self._lock:
+            entry = self._pending.get(prefix)
+            if entry is None:
+                return
+            module_path, tags = entry
+            start = time.perf_counter()
+            module = importlib.import_module(module_path)
+            self.app.include_router(module.router, prefix=prefix, tags=tags)
+            # Schema OpenAPI em cache não teria as rotas novas
+            self.app.openapi_schema = None
+            del self._pending[prefix]
+        logger.info(f"📦 Router {module_path} carregado em {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def load_all(self) -> None:
+        for prefix in self.pending:
+            self.load(prefix)
+
+    def load_for_path(self, path: str) -> None:
+        for prefix in self.pending:
+            if path == prefix or path.startswith(prefix + "/"):
+                self.load(prefix)
+
+
+class LazyRouterMiddleware:
+    """Middleware ASGI que inclui o router do prefixo antes do roteamento"""
+
+    def __init__(self, app, routers: LazyRouters):
+        self.app = app
+        self.routers = routers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket") and self.routers.pending:
+            path = scope.get("path", "")
+            fastapi_app = self.routers.app
+            if path in (fastapi_app.openapi_url, fastapi_app.docs_url, fastapi_app.redoc_url):
+                self.routers.load_all()
+            else:
+                self.routers.load_for_path(path)
+        await self.app(scope, receive, send)
@@ -0,0 +1,221 @@
+import logging
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import HTTP_MEMORY_BUDGET_EXCEEDED, HTTP_MEMORY_PEAK, UNMATCHED_ROUTE
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# === PICO DE MEMÓRIA POR ROTA (TRACEMALLOC AMOSTRADO) ===
+# Endpoints que carregam tabelas inteiras como objetos ORM podem estourar a
+# memória do worker. Uma fração das requisições (MEMORY_TRACKING_SAMPLE_RATE)
+# é medida com tracemalloc: o pico alocado vai para a métrica
+# http_request_memory_peak_bytes e para o resumo em /diagnostics/memory.
+#
+# Quando o pico passa do orçamento da rota (MEMORY_ROUTE_BUDGETS_MB ou
+# MEMORY_BUDGET_MB), os principais locais de alocação são logados. O snapshot
+# é tirado no início da resposta, quando resultados e objetos da sessão ainda
+# estão vivos.
+#
+# tracemalloc é global ao processo e deixa as alocações mais lentas: só uma
+# requisição é medida por vez por worker, e o tracing é desligado ao final.
+
+MAX_OFFENDERS = 50
+TRACEBACK_FRAMES = 25
+
+# Alocações são atribuídas ao frame mais interno do código da aplicação
+# (app/core fica de fora: middlewares aparecem em todas as pilhas)
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORE_DIR = os.path.join(APP_DIR, "core")
+
+
+def _is_app_frame(filename: str) -> bool:
+    return filename.startswith(APP_DIR) and not filename.startswith(CORE_DIR)
+
+# Frames do próprio tracemalloc/importação não interessam nos relatórios
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def _mb(value: float) -> float:
+    return round(value / (1024 * 1024), 2)
+
+
+def get_route_budget_bytes(route_key: str) -> int:
+    """Orçamento da rota ("MÉTODO /template") em bytes"""
+    budget_mb = settings.memory_route_budgets_mb.get(route_key, settings.memory_budget_mb)
+    return int(budget_mb * 1024 * 1024)
+
+
+class MemoryStats:
+    """Agregados por rota e últimos ofensores (memória do worker atual)"""
+
+    def __init__(self, max_offenders: int = MAX_OFFENDERS):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, dict] = {}
+        self._offenders: Deque[dict] = deque(maxlen=max_offenders)
+
+    def record(self, route_key: str, peak_bytes: int, budget_bytes: int) -> None:
+        with self._lock:
+            stats = self._routes.setdefault(route_key, {
+                "samples": 0, "peak_total": 0, "max_peak": 0, "last_peak": 0, "over_budget": 0,
+            })
+            stats["samples"] += 1
+            stats["peak_total"] += peak_bytes
+            stats["max_peak"] = max(stats["max_peak"], peak_bytes)
+            stats["last_peak"] = peak_bytes
+            if peak_bytes > budget_bytes:
+                stats["over_budget"] += 1
+
+    def add_offender(self, offender: dict) -> None:
+        with self._lock:
+            self._offenders.append(offender)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            routes = [
+                {
+                    "route": route_key,
+                    "samples": stats["samples"],
+                    "mean_peak_mb": _mb(stats["peak_total"] / stats["samples"]),
+                    "max_peak_mb": _mb(stats["max_peak"]),
+                    "last_peak_mb": _mb(stats["last_peak"]),
+                    "budget_mb": _mb(get_route_budget_bytes(route_key)),
+                    "over_budget": stats["over_budget"],
+                }
+                for route_key, stats in self._routes.items()
+            ]
+            offenders = list(reversed(self._offenders))
+
+        routes.sort(key=lambda item: item["max_peak_mb"], reverse=True)
+        # ru_maxrss é em KB no Linux e em bytes no macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        max_rss_bytes = max_rss if sys.platform == "darwin" else max_rss * 1024
+        return {
+            "enabled": settings.memory_tracking_enabled,
+            "sample_rate": settings.memory_tracking_sample_rate,
+            "default_budget_mb": settings.memory_budget_mb,
+            "process_max_rss_mb": _mb(max_rss_bytes),
+            "routes": routes,
+            "recent_offenders": offenders,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._offenders.clear()
+
+
+# Instância global das estatísticas de memória
+memory_stats = MemoryStats()
+
+# tracemalloc é global: uma requisição medida por vez por worker
+_tracking_lock = threading.Lock()
+
+
+def top_allocation_sites(snapshot: tracemalloc.Snapshot, limit: int) -> List[dict]:
+    """
+    Maiores locais de alocação vivos no snapshot.
+    Cada alocação conta para a linha do app que a originou (a linha da
+    biblioteca só aparece quando não há frame do app na pilha).
+    """
+    sites: Dict[str, list] = {}
+    for trace in snapshot.filter_traces(_SNAPSHOT_FILTERS).traces:
+        frames = list(trace.traceback)  # do mais antigo para o mais recente
+        frame = next((f for f in reversed(frames) if _is_app_frame(f.filename)), frames[-1])
+        filename = frame.filename
+        if filename.startswith(APP_DIR):
+            filename = os.path.relpath(filename, os.path.dirname(APP_DIR))
+        key = f"{filename}:{frame.lineno}"
+        entry = sites.setdefault(key, [0, 0])
+        entry[0] += trace.size
+        entry[1] += 1
+
+    ranked = sorted(sites.items(), key=lambda item: item[1][0], reverse=True)
+    return [{"site": site, "size_mb": _mb(size), "count": count} for site, (size, count) in ranked[:limit]]
+
+
+class MemoryTrackingMiddleware:
+    """
+    Middleware ASGI que mede o pico de alocação de requisições amostradas.
+    Com MEMORY_TRACKING_ENABLED=false só repassa a requisição.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.memory_tracking_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        if random.random() >= settings.memory_tracking_sample_rate or not _tracking_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        # Se o tracing já estava ligado (PYTHONTRACEMALLOC), não desligar no final
+        owns_tracing = not tracemalloc.is_tracing()
+        if owns_tracing:
+            tracemalloc.start(TRACEBACK_FRAMES)
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        top_sites: Optional[List[dict]] = None
+
+        async def send_wrapper(message):
+            nonlocal top_sites
+            if message["type"] == "http.response.start":
+                _, peak = tracemalloc.get_traced_memory()
+                if peak - baseline > get_route_budget_bytes(self._route_key(scope)):
+                    top_sites = top_allocation_sites(tracemalloc.take_snapshot(), settings.memory_top_allocations)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            if owns_tracing:
+                tracemalloc.stop()
+            _tracking_lock.release()
+            self._report(scope, max(peak - baseline, 0), top_sites)
+
+    @staticmethod
+    def _route_key(scope) -> str:
+        # O router do FastAPI grava a rota casada no scope
+        route = scope.get("route")
+        return f"{scope.get('method', '')} {getattr(route, 'path', UNMATCHED_ROUTE)}"
+
+    def _report(self, scope, peak_bytes: int, top_sites: Optional[List[dict]]) -> None:
+        route_key = self._route_key(scope)
+        method, route = route_key.split(" ", 1)
+        budget = get_route_budget_bytes(route_key)
+
+        memory_stats.record(route_key, peak_bytes, budget)
+        HTTP_MEMORY_PEAK.labels(method, route).observe(peak_bytes)
+        if peak_bytes <= budget:
+            return
+
+        HTTP_MEMORY_BUDGET_EXCEEDED.labels(method, route).inc()
+        memory_stats.add_offender({
+            "route": route_key,
+            "path": scope.get("path", ""),
+            "peak_mb": _mb(peak_bytes),
+            "budget_mb": _mb(budget),
+            "at": time.time(),
+            "top_allocations": top_sites or [],
+        })
+        sites = "; ".join(f"{site['site']} ({site['size_mb']}MB)" for site in (top_sites or [])[:5])
+        logger.warning(f"⚠️ {route_key} alocou {_mb(peak_bytes)}MB (orçamento {_mb(budget)}MB). "
+                       f"Maiores alocações: {sites or 'n/d'}")
@@ -0,0 +1,228 @@
+import os
+import time
+from typing import Dict, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from starlette.routing import Match
+
+from app.core.config import settings
+
+# === MÉTRICAS (FORMATO PROMETHEUS) ===
+# Métricas são objetos globais; o registro de cada evento é só um lookup de
+# labels + incremento em buckets pré-definidos.
+#
+# Com vários workers, definir PROMETHEUS_MULTIPROC_DIR (diretório vazio,
+# limpo a cada deploy): cada processo grava seus valores em arquivos mmap e
+# o /metrics agrega todos os workers.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+MEMORY_BUCKETS = tuple(mb * 1024 * 1024 for mb in (1, 4, 16, 32, 64, 128, 256, 512, 1024))
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+# --- HTTP ---
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "Requisições HTTP por rota (template) e status",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota (template)",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requisições HTTP em andamento",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+
+# Pico de alocação por requisição (amostrado, ver app/core/memory_tracking.py)
+HTTP_MEMORY_PEAK = Histogram(
+    "http_request_memory_peak_bytes",
+    "Pico de memória alocada durante a requisição (tracemalloc, amostrado)",
+    ["method", "route"],
+    buckets=MEMORY_BUCKETS,
+)
+HTTP_MEMORY_BUDGET_EXCEEDED = Counter(
+    "http_request_memory_budget_exceeded_total",
+    "Requisições amostradas que passaram do orçamento de memória da rota",
+    ["method", "route"],
+)
+
+# --- Pool de conexões ---
+
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Checkouts de conexões do pool")
+DB_POOL_CONNECTS = Counter("db_pool_connects_total", "Conexões novas abertas pelo pool")
+DB_POOL_INVALIDATIONS = Counter("db_pool_invalidations_total", "Conexões invalidadas")
+DB_POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Timeouts aguardando conexão do pool")
+DB_POOL_SOFT_INVALIDATIONS = Counter("db_pool_soft_invalidations_total", "Conexões marcadas para reciclar no checkin")
+DB_POOL_SLOW_CHECKOUTS = Counter("db_pool_slow_checkouts_total", "Checkouts acima de DB_POOL_SLOW_CHECKOUT_MS")
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Conexões em uso",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_in_use",
+    "Conexões de overflow em uso",
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Tempo aguardando uma conexão do pool",
+    buckets=POOL_WAIT_BUCKETS,
+)
+
+# --- Cache ---
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Consultas ao cache de respostas por resultado",
+    ["result"],
+)
+CACHE_HITS = CACHE_REQUESTS.labels("hit")
+CACHE_STALE_HITS = CACHE_REQUESTS.labels("stale")
+CACHE_MISSES = CACHE_REQUESTS.labels("miss")
+CACHE_COALESCED = CACHE_REQUESTS.labels("coalesced")
+CACHE_ERRORS = Counter("cache_errors_total", "Falhas do cache (Redis indisponível, revalidação)")
+
+# --- Jobs em background ---
+
+BACKGROUND_JOBS = Counter(
+    "background_jobs_total",
+    "Execuções de jobs em background por resultado",
+    ["job", "result"],
+)
+BACKGROUND_JOB_DURATION = Histogram(
+    "background_job_duration_seconds",
+    "Duração dos jobs em background",
+    ["job"],
+    buckets=LATENCY_BUCKETS,
+)
+INVALIDATION_EVENTS = Counter(
+    "cache_invalidation_events_total",
+    "Eventos do barramento de invalidação",
+    ["kind", "direction"],
+)
+INVALIDATION_RECONNECTS = Counter(
+    "cache_invalidation_reconnects_total",
+    "Reconexões do ouvinte do barramento de invalidação",
+)
+
+
+def record_background_job(job: str, started: float, success: bool) -> None:
+    """Registrar execução de um job (started = time.perf_counter() no início)"""
+    BACKGROUND_JOBS.labels(job, "success" if success else "error").inc()
+    BACKGROUND_JOB_DURATION.labels(job).observe(time.perf_counter() - started)
+
+
+# === EXPOSIÇÃO ===
+
+def is_multiprocess() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Gerar o payload do /metrics (agregando workers em modo multiprocess)"""
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead() -> None:
+    """Descartar gauges 'live' deste worker (chamado no shutdown)"""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+# === MIDDLEWARE ===
+
+class PrometheusMiddleware:
+    """
+    Middleware ASGI que registra contagem, latência e requisições em andamento
+    por template de rota (ex.: /api/v1/clients/{client_id}), nunca pelo path
+    bruto, para manter a cardinalidade das labels limitada.
+    """
+
+    # Limite do cache (método, path) -> template
+    ROUTE_CACHE_SIZE = 10000
+
+    def __init__(self, app):
+        self.app = app
+        self._route_cache: Dict[Tuple[str, str], str] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.metrics_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._route_template(scope)
+        in_flight = HTTP_IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            # O router do FastAPI grava a rota casada no scope: vale também
+            # para routers incluídos só agora pelo LazyRouterMiddleware, que
+            # a resolução antecipada acima ainda não enxergava
+            matched = getattr(scope.get("route"), "path", None)
+            if matched and matched != route:
+                route = matched
+                self._remember(scope, matched)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+
+    def _route_template(self, scope) -> str:
+        key = (scope["method"], scope["path"])
+        template = self._route_cache.get(key)
+        if template is not None:
+            return template
+
+        template = UNMATCHED_ROUTE
+        app = scope.get("app")
+        for route in getattr(app, "routes", []):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                template = route.path
+                break
+            if match == Match.PARTIAL and template == UNMATCHED_ROUTE:
+                # Path casa mas o método não (405)
+                template = route.path
+
+        # Sem cache para path não casado: pode ser de um router sob demanda
+        # ainda não incluído
+        if template != UNMATCHED_ROUTE:
+            self._remember(scope, template)
+        return template
+
+    def _remember(self, scope, template: str) -> None:
+        if len(self._route_cache) < self.ROUTE_CACHE_SIZE:
+            self._route_cache[(scope["method"], scope["path"])] = template
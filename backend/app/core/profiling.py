@@ -0,0 +1,201 @@
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+
+from app.core.config import settings
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# === PROFILING DE CPU POR REQUISIÇÃO (OPT-IN) ===
+# Desligado por padrão: com PROFILING_ENABLED=false o middleware só repassa a
+# requisição. Quando ligado, uma requisição é perfilada se:
+#   - trouxer o header PROFILING_HEADER (ex.: "X-Profile: 1") junto com um
+#     Authorization de admin, ou
+#   - cair na amostragem PROFILING_SAMPLE_RATE (0.0 a 1.0)
+#
+# O resultado (formato pstats, .prof) vai para um buffer circular em disco,
+# limitado a PROFILING_MAX_PROFILES arquivos, e pode ser baixado pelos
+# endpoints de diagnóstico. Arquivos .prof abrem em snakeviz, flameprof ou
+# gprof2dot para gerar flamegraphs.
+#
+# Limitações do cProfile:
+#   - mede a thread do event loop; endpoints `def` (threadpool) aparecem só
+#     como a espera pelo resultado
+#   - corrotinas de outras requisições intercaladas no mesmo loop entram no
+#     perfil; por isso só uma requisição é perfilada por vez por worker
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]+-[0-9a-f]{8}$")
+
+
+class ProfileStore:
+    """Buffer circular de perfis em disco (um .prof e um .json por requisição)"""
+
+    def __init__(self, directory: Optional[str] = None, max_profiles: int = 50):
+        self.directory = Path(directory or os.path.join(tempfile.gettempdir(), "barbershop-profiles"))
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_id() -> str:
+        # Prefixo em ms mantém a ordem cronológica na listagem do diretório
+        return f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+
+    def save(self, profile_id: str, profiler: cProfile.Profile, metadata: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(self.directory / f"{profile_id}.prof"))
+        metadata = {"id": profile_id, **metadata}
+        (self.directory / f"{profile_id}.json").write_text(json.dumps(metadata), encoding="utf-8")
+        self._prune()
+
+    def list(self) -> List[dict]:
+        """Perfis disponíveis, do mais recente para o mais antigo"""
+        profiles = []
+        for meta_path in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                profiles.append(json.loads(meta_path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.prof"
+        return path if path.exists() else None
+
+    def summary(self, profile_id: str, sort: str = "cumulative", limit: int = 40) -> Optional[str]:
+        """Resumo em texto (pstats) das funções mais caras"""
+        path = self.path(profile_id)
+        if path is None:
+            return None
+        output = io.StringIO()
+        stats = pstats.Stats(str(path), stream=output)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+    def clear(self) -> int:
+        removed = 0
+        with self._lock:
+            for path in list(self.directory.glob("*.prof")) + list(self.directory.glob("*.json")):
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    pass
+        return removed // 2
+
+    def _prune(self) -> None:
+        with self._lock:
+            profiles = sorted(self.directory.glob("*.prof"))
+            for path in profiles[:max(len(profiles) - self.max_profiles, 0)]:
+                for stale in (path, path.with_suffix(".json")):
+                    try:
+                        stale.unlink()
+                    except OSError:
+                        pass
+
+
+# Instância global do buffer de perfis
+profile_store = ProfileStore(settings.profiling_dir or None, settings.profiling_max_profiles)
+
+# Um perfil por vez por worker (cProfile mede a thread inteira do event loop)
+_profiling_lock = threading.Lock()
+
+
+def get_token_role(authorization: str) -> Optional[str]:
+    """Papel do JWT do header Authorization (verifica só a assinatura, sem consultar o banco)"""
+    if not authorization.lower().startswith("bearer "):
+        return None
+    import jwt  # só quando há token: fora do caminho de boot
+
+    try:
+        payload = jwt.decode(authorization[7:], settings.secret_key, algorithms=[settings.algorithm])
+    except jwt.PyJWTError:
+        return None
+    return payload.get("role")
+
+
+def _is_admin_token(authorization: str) -> bool:
+    return get_token_role(authorization) == "admin"
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI que perfila requisições selecionadas com cProfile.
+    Responde com `X-Profile-Id` quando a requisição foi perfilada.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._header = settings.profiling_header.lower().encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.profiling_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        trigger = self._trigger(scope)
+        if trigger is None or not _profiling_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = profile_store.new_id()
+        status_code = 500
+        profiler = cProfile.Profile()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profiler.disable()
+        finally:
+            _profiling_lock.release()
+            duration_ms = (time.perf_counter() - started) * 1000
+            try:
+                profile_store.save(profile_id, profiler, {
+                    "method": scope.get("method", ""),
+                    "path": scope.get("path", ""),
+                    "status": status_code,
+                    "duration_ms": round(duration_ms, 2),
+                    "trigger": trigger,
+                    "created_at": time.time(),
+                })
+                logger.info(f"🔬 Perfil {profile_id} salvo: {scope.get('method')} {scope.get('path')} "
+                            f"({duration_ms:.0f}ms, {trigger})")
+            except OSError as exc:
+                logger.warning(f"⚠️ Não foi possível salvar o perfil: {exc}")
+
+    def _trigger(self, scope) -> Optional[str]:
+        headers = dict(scope.get("headers", []))
+        if self._header in headers:
+            if _is_admin_token(headers.get(b"authorization", b"").decode("latin-1")):
+                return "header"
+            logger.warning(f"⚠️ Header de profiling sem token de admin em {scope.get('path')}")
+            return None
+        if settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate:
+            return "sample"
+        return None
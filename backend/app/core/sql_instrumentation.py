@@ -0,0 +1,207 @@
+import heapq
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# === INSTRUMENTAÇÃO DE SQL POR REQUISIÇÃO ===
+# Hooks before/after_cursor_execute contam queries e tempo de banco da
+# requisição atual (via ContextVar, que o FastAPI propaga para o threadpool).
+# O middleware expõe o resultado em headers (fora de produção) ou em uma linha
+# de log JSON (produção) e avisa quando a mesma query se repete demais (N+1).
+
+_NUMBER_RE = re.compile(r"\b\d+(\.\d+)?\b")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)|\bIN\s*\((?:\s*%\(\w+\)s\s*,?)+\)", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Remover literais e listas IN para agrupar queries com a mesma forma"""
+    normalized = _STRING_RE.sub("?", statement)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _IN_LIST_RE.sub("IN (...)", normalized)
+    return _SPACE_RE.sub(" ", normalized).strip()
+
+
+class QueryStats:
+    """Queries executadas dentro de uma requisição (ou de um bloco capture_queries)"""
+
+    def __init__(self, keep_slowest: int = 3):
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements: Counter = Counter()
+        self._keep_slowest = keep_slowest
+        self._slowest: List[Tuple[float, int, str]] = []
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        normalized = normalize_statement(statement)
+        self.statements[normalized] += 1
+
+        item = (elapsed_ms, self.count, normalized)
+        if len(self._slowest) < self._keep_slowest:
+            heapq.heappush(self._slowest, item)
+        else:
+            heapq.heappushpop(self._slowest, item)
+
+    @property
+    def slowest(self) -> List[Dict[str, Any]]:
+        return [
+            {"statement": statement[:300], "ms": round(elapsed, 2)}
+            for elapsed, _, statement in sorted(self._slowest, reverse=True)
+        ]
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements normalizados que se repetiram mais de `threshold` vezes"""
+        return [(statement, count) for statement, count in self.statements.most_common() if count > threshold]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+def get_current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+# === HOOKS DO SQLALCHEMY ===
+
+def instrument_sql(engine) -> None:
+    """Registrar hooks de cursor no engine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start_time"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, (time.perf_counter() - started) * 1000)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        # Statement que falhou não passa pelo after_cursor_execute
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start_time"):
+            connection.info["query_start_time"].pop()
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """
+    Capturar as queries executadas dentro do bloco.
+
+    Uso:
+        with capture_queries() as stats:
+            calculate_client_return_metrics(client, db)
+        print(stats.count, stats.total_ms)
+    """
+    stats = QueryStats(settings.sql_slowest_statements)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int, max_repeats: Optional[int] = None) -> Iterator[QueryStats]:
+    """
+    Falhar (AssertionError) se o bloco exceder o orçamento de queries.
+    `max_repeats` limita quantas vezes o mesmo statement pode se repetir (N+1).
+    """
+    with capture_queries() as stats:
+        yield stats
+
+    assert stats.count <= max_queries, (
+        f"Orçamento de queries excedido: {stats.count} > {max_queries}\n"
+        + "\n".join(f"{count}x {statement}" for statement, count in stats.statements.most_common(5))
+    )
+    if max_repeats is not None:
+        repeated = stats.repeated(max_repeats)
+        assert not repeated, f"Possível N+1: {repeated[0][1]}x {repeated[0][0]}"
+
+
+def assert_query_budget(response, max_queries: int) -> None:
+    """
+    Verificar o orçamento de queries de um endpoint pelo header X-DB-Queries.
+    Para uso com TestClient (headers são emitidos fora de produção).
+    """
+    header = response.headers.get("x-db-queries")
+    assert header is not None, "Resposta sem header X-DB-Queries (instrumentação desativada?)"
+    assert int(header) <= max_queries, (
+        f"{response.request.method} {response.request.url.path} executou {header} queries "
+        f"(orçamento: {max_queries})"
+    )
+
+
+# === MIDDLEWARE ===
+
+class SQLInstrumentationMiddleware:
+    """
+    Middleware ASGI que mede as queries de cada requisição HTTP.
+    Fora de produção adiciona `Server-Timing` e `X-DB-Queries`; em produção
+    registra uma linha de log JSON por requisição que acessou o banco.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.sql_instrumentation_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(settings.sql_slowest_statements)
+        token = _current_stats.set(stats)
+        emit_headers = settings.environment != "production"
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if emit_headers:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", f'db;dur={stats.total_ms:.2f};desc="{stats.count} queries"'.encode()))
+                    headers.append((b"x-db-queries", str(stats.count).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            self._report(scope, stats, status_code, emit_headers)
+
+    def _report(self, scope, stats: QueryStats, status_code: int, emit_headers: bool) -> None:
+        path = scope.get("path", "")
+        method = scope.get("method", "")
+
+        for statement, count in stats.repeated(settings.sql_n_plus_one_threshold):
+            logger.warning(f"⚠️ Possível N+1 em {method} {path}: {count}x {statement[:200]}")
+
+        if not emit_headers and stats.count:
+            logger.info(json.dumps({
+                "event": "request_db_stats",
+                "method": method,
+                "path": path,
+                "status": status_code,
+                "queries": stats.count,
+                "db_ms": round(stats.total_ms, 2),
+                "slowest": stats.slowest,
+            }))
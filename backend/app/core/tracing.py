@@ -0,0 +1,259 @@
+import logging
+from urllib.parse import parse_qs
+
+import httpx
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.profiling import get_token_role
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# === TRACING DISTRIBUÍDO (OPENTELEMETRY, OPCIONAL) ===
+# Spans para cada requisição HTTP, cada statement SQL, cada comando Redis e
+# cada chamada HTTP de saída (Google OAuth, notificações, pagamentos).
+# Depende dos pacotes opcionais opentelemetry-sdk (+ exporter OTLP); sem eles,
+# ou com TRACING_ENABLED=false, nada é instrumentado.
+#
+# Amostragem:
+#   - head: TRACING_SAMPLE_RATE das requisições novas é exportada (traceparent
+#     recebido é respeitado)
+#   - tail-keep: as demais são gravadas em memória e só exportadas se a
+#     requisição demorar mais que TRACING_SLOW_REQUEST_MS ou terminar em erro
+#
+# Exporters: file (JSON por linha, para rodar local), otlp (collector
+# OTLP/HTTP, ex.: Jaeger ou Tempo) ou console. Sampler, processor e exporters
+# ficam em app/core/tracing_export.py, importado só quando o tracing liga.
+
+_provider = None
+_tracer = None
+_instrumented_engines = set()
+
+
+def _otel_available() -> bool:
+    try:
+        import opentelemetry.sdk.trace  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_tracer():
+    """Tracer ativo (None quando o tracing está desligado)"""
+    return _tracer
+
+
+# === INSTRUMENTAÇÃO ===
+
+def instrument_engine_tracing(engine) -> None:
+    """Span por statement SQL (só o SQL com placeholders, nunca os parâmetros)"""
+    if id(engine) in _instrumented_engines:
+        return
+    _instrumented_engines.add(id(engine))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _tracer is None:
+            return
+        from opentelemetry.trace import SpanKind
+
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+        span = _tracer.start_span(
+            f"db {operation}",
+            kind=SpanKind.CLIENT,
+            attributes={
+                "db.system": engine.dialect.name,
+                "db.operation": operation,
+                "db.statement": statement[:2000],
+            },
+        )
+        conn.info.setdefault("tracing_spans", []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("tracing_spans")
+        if spans:
+            span = spans.pop()
+            if cursor is not None and cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.set_attribute("db.rowcount", cursor.rowcount)
+            span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        connection = exception_context.connection
+        spans = connection.info.get("tracing_spans") if connection is not None else None
+        if spans:
+            from opentelemetry.trace import Status, StatusCode
+
+            span = spans.pop()
+            span.record_exception(exception_context.original_exception)
+            span.set_status(Status(StatusCode.ERROR))
+            span.end()
+
+
+def instrument_redis(client) -> None:
+    """Span por comando Redis (nome do comando, sem chaves nem valores)"""
+    if client is None or getattr(client, "_tracing_instrumented", False):
+        return
+    original = client.execute_command
+
+    def execute_command(*args, **options):
+        if _tracer is None:
+            return original(*args, **options)
+        from opentelemetry.trace import SpanKind
+
+        command = str(args[0]).upper() if args else "UNKNOWN"
+        with _tracer.start_as_current_span(
+            f"redis {command}",
+            kind=SpanKind.CLIENT,
+            attributes={"db.system": "redis", "db.operation": command},
+        ):
+            return original(*args, **options)
+
+    client.execute_command = execute_command
+    client._tracing_instrumented = True
+
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """Transport que abre um span por chamada HTTP de saída"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if _tracer is None:
+            return await self._transport.handle_async_request(request)
+        from opentelemetry.trace import SpanKind, Status, StatusCode
+
+        # Sem query string: pode conter códigos OAuth e tokens
+        url = f"{request.url.scheme}://{request.url.host}{request.url.path}"
+        with _tracer.start_as_current_span(
+            f"HTTP {request.method} {request.url.host}",
+            kind=SpanKind.CLIENT,
+            attributes={
+                "http.request.method": request.method,
+                "server.address": request.url.host,
+                "url.full": url,
+            },
+        ) as span:
+            response = await self._transport.handle_async_request(request)
+            span.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.set_status(Status(StatusCode.ERROR))
+            return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# === MIDDLEWARE ===
+
+class TracingMiddleware:
+    """
+    Middleware ASGI que abre o span raiz de cada requisição.
+    Atributos: rota (template), tenant (barbershop_id) e papel do usuário.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        from opentelemetry.propagate import extract
+        from opentelemetry.trace import SpanKind, Status, StatusCode
+
+        headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope.get("headers", [])}
+        method = scope.get("method", "")
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with _tracer.start_as_current_span(
+            method,
+            context=extract(headers),
+            kind=SpanKind.SERVER,
+            attributes={
+                "http.request.method": method,
+                "url.path": scope.get("path", ""),
+                "user.role": get_token_role(headers.get("authorization", "")) or "anonymous",
+            },
+        ) as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # O router do FastAPI grava a rota casada e os path params no scope
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.update_name(f"{method} {route}")
+                    span.set_attribute("http.route", route)
+                span.set_attribute("tenant.id", str(self._tenant(scope)))
+                span.set_attribute("http.response.status_code", status_code)
+                if status_code >= 500:
+                    span.set_status(Status(StatusCode.ERROR))
+
+    @staticmethod
+    def _tenant(scope):
+        path_params = scope.get("path_params") or {}
+        if "barbershop_id" in path_params:
+            return path_params["barbershop_id"]
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        return query.get("barbershop_id", ["default"])[0]
+
+
+# === CICLO DE VIDA ===
+
+def start_tracing() -> bool:
+    """
+    Configurar o tracing (chamado no startup, depois do fork dos workers).
+    Retorna False quando desligado ou sem os pacotes do OpenTelemetry.
+    """
+    global _provider, _tracer
+    if not settings.tracing_enabled or _tracer is not None:
+        return _tracer is not None
+    if not _otel_available():
+        logger.warning("⚠️ TRACING_ENABLED=true mas opentelemetry-sdk não está instalado; tracing desligado")
+        return False
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    from app.core.database import engine, get_redis
+    from app.core.tracing_export import HeadSampler, TailKeepProcessor, build_exporter
+
+    exporter = build_exporter(settings.tracing_exporter.lower())
+    _provider = TracerProvider(
+        sampler=HeadSampler(settings.tracing_sample_rate),
+        resource=Resource.create({
+            "service.name": settings.tracing_service_name,
+            "service.version": settings.app_version,
+            "deployment.environment": settings.environment,
+        }),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    if settings.tracing_slow_request_ms > 0:
+        _provider.add_span_processor(TailKeepProcessor(exporter, settings.tracing_slow_request_ms))
+
+    _tracer = _provider.get_tracer("barbershop")
+    instrument_engine_tracing(engine)
+    instrument_redis(get_redis())
+    logger.info(f"✅ Tracing ativo (exporter: {settings.tracing_exporter}, amostragem: "
+                f"{settings.tracing_sample_rate:.0%}, lentas acima de {settings.tracing_slow_request_ms:.0f}ms)")
+    return True
+
+
+def stop_tracing() -> None:
+    """Exportar spans pendentes e desligar o tracing (chamado no shutdown)"""
+    global _provider, _tracer
+    if _provider is None:
+        return
+    provider, _provider, _tracer = _provider, None, None
+    provider.shutdown()
@@ -0,0 +1,126 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from opentelemetry.sdk.trace import SpanProcessor
+from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.sampling import Decision, Sampler, SamplingResult
+from opentelemetry.trace import StatusCode, get_current_span
+
+from app.core.config import settings
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# === AMOSTRAGEM E EXPORTAÇÃO DE SPANS ===
+# Depende do opentelemetry-sdk: importado apenas por start_tracing().
+
+
+class HeadSampler(Sampler):
+    """
+    Sampler por fração do trace_id. Traces fora da amostra continuam sendo
+    gravados (RECORD_ONLY) para o TailKeepProcessor decidir no final.
+    """
+
+    def __init__(self, rate: float):
+        self._bound = int(max(0.0, min(rate, 1.0)) * (1 << 64))
+
+    def should_sample(self, parent_context, trace_id, name, kind=None, attributes=None, links=None, trace_state=None):
+        parent = get_current_span(parent_context).get_span_context()
+        if parent.is_valid:
+            sampled = parent.trace_flags.sampled
+        else:
+            sampled = (trace_id & 0xFFFFFFFFFFFFFFFF) < self._bound
+        decision = Decision.RECORD_AND_SAMPLE if sampled else Decision.RECORD_ONLY
+        return SamplingResult(decision, attributes, parent.trace_state if parent.is_valid else trace_state)
+
+    def get_description(self) -> str:
+        return f"HeadSampler{{{self._bound / (1 << 64):.4f}}}"
+
+
+class TailKeepProcessor(SpanProcessor):
+    """
+    Guarda os spans de traces fora da amostra até o span raiz local terminar;
+    exporta o trace inteiro só se ele foi lento ou terminou em erro.
+    Spans amostrados seguem pelo BatchSpanProcessor normal.
+    """
+
+    def __init__(self, exporter, slow_ms: float, max_pending_traces: int = 1000, max_spans_per_trace: int = 500):
+        self._exporter = exporter
+        self._slow_ns = int(slow_ms * 1_000_000)
+        self._max_pending_traces = max_pending_traces
+        self._max_spans_per_trace = max_spans_per_trace
+        self._pending: "OrderedDict[int, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Exportação fora do event loop (OTLP faz I/O de rede)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tracing-tail")
+
+    def on_start(self, span, parent_context=None) -> None:
+        pass
+
+    def on_end(self, span) -> None:
+        context = span.context
+        if context.trace_flags.sampled:
+            return
+
+        with self._lock:
+            spans = self._pending.get(context.trace_id)
+            if spans is None:
+                spans = self._pending[context.trace_id] = []
+                while len(self._pending) > self._max_pending_traces:
+                    self._pending.popitem(last=False)
+            if len(spans) < self._max_spans_per_trace:
+                spans.append(span)
+
+            is_local_root = span.parent is None or span.parent.is_remote
+            if not is_local_root:
+                return
+            spans = self._pending.pop(context.trace_id, [])
+
+        if self._should_keep(span):
+            self._executor.submit(self._exporter.export, spans)
+
+    def _should_keep(self, root) -> bool:
+        if root.status.status_code == StatusCode.ERROR:
+            return True
+        return (root.end_time - root.start_time) >= self._slow_ns
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+class JsonFileSpanExporter(SpanExporter):
+    """Exporter que grava um span por linha (JSON) em arquivo local"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        lines = [span.to_json(indent=None) for span in spans]
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as output:
+                output.write("\n".join(lines) + "\n")
+        except OSError as exc:
+            logger.warning(f"⚠️ Falha ao gravar spans em {self.path}: {exc}")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+def build_exporter(name: str):
+    if name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint)
+    if name == "console":
+        return ConsoleSpanExporter()
+    return JsonFileSpanExporter(settings.tracing_file_path)
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 import os
@@ -7,28 +7,20 @@ from dotenv import load_dotenv
 # Carregar variáveis de ambiente
 load_dotenv()
 
-# Importar routers
-from app.api.auth import router as auth_router
-from app.api.appointments import router as appointments_router
-from app.api.clients import router as clients_router
-from app.api.barbers import router as barbers_router
-from app.api.services import router as services_router
-from app.api.products import router as products_router
-from app.api.sales import router as sales_router
-from app.api.analytics import router as analytics_router
-from app.api.ai import router as ai_router
-from app.api.commissions import router as commissions_router
-from app.api.barber_blocks import router as barber_blocks_router
-
-# Importar modelos para garantir que sejam registrados no Base.metadata
-from app.models import (
-    User, Barbershop, Barber, Client, Service, 
-    Appointment, Commission, Product, BarberBlock
-)
-
 # Importar função de inicialização do banco
 from app.core.database import init_database
 
+# Cliente HTTP compartilhado para integrações externas
+from app.core.http_client import start_http_client, close_http_client
+from app.core.invalidation import start_invalidation_bus, stop_invalidation_bus
+from app.core.sql_instrumentation import SQLInstrumentationMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.memory_tracking import MemoryTrackingMiddleware
+from app.core.tracing import TracingMiddleware, start_tracing, stop_tracing
+from app.core.lazy_routers import LazyRouters, LazyRouterMiddleware
+from app.core.metrics import PrometheusMiddleware, render_metrics, mark_worker_dead
+from app.core.config import settings
+
 # Criar instância do FastAPI
 app = FastAPI(
     title="💈 Barbershop Manager API",
@@ -67,6 +59,9 @@ app = FastAPI(
     },
 )
 
+# Routers registrados mais abaixo (ROUTERS); incluídos sob demanda pelo middleware
+lazy_routers = LazyRouters(app)
+
 # Configurar CORS - DEVE SER O PRIMEIRO MIDDLEWARE
 # Obter URLs permitidas das variáveis de ambiente
 allowed_origins = [
@@ -108,6 +103,24 @@ app.add_middleware(
     max_age=3600,
 )
 
+# Middleware de routers sob demanda (mais interno: roda logo antes do roteamento)
+app.add_middleware(LazyRouterMiddleware, routers=lazy_routers)
+
+# Middleware de pico de memória por rota (amostrado, desligado por padrão)
+app.add_middleware(MemoryTrackingMiddleware)
+
+# Middleware de profiling de CPU (opt-in, só repassa quando PROFILING_ENABLED=false)
+app.add_middleware(ProfilingMiddleware)
+
+# Middleware de instrumentação de SQL (queries e tempo de banco por requisição)
+app.add_middleware(SQLInstrumentationMiddleware)
+
+# Middleware de tracing (span raiz da requisição; só repassa se TRACING_ENABLED=false)
+app.add_middleware(TracingMiddleware)
+
+# Middleware de métricas (mais externo: mede a requisição inteira)
+app.add_middleware(PrometheusMiddleware)
+
 # Middleware de segurança - COMENTADO TEMPORARIAMENTE PARA DEBUG
 # app.add_middleware(
 #     TrustedHostMiddleware,
@@ -132,6 +145,17 @@ async def health_check():
         "version": "1.0.0"
     }
 
+# Métricas Prometheus
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def metrics(request: Request):
+    """
+    Métricas no formato Prometheus (requisições por rota, pool, cache, jobs).
+    """
+    if settings.metrics_token and request.headers.get("authorization") != f"Bearer {settings.metrics_token}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
 # Root endpoint
 @app.get("/", tags=["Root"])
 async def root():
@@ -146,18 +170,27 @@ async def root():
         "health": "/health"
     }
 
-# Incluir routers
-app.include_router(auth_router, prefix="/api/v1/auth", tags=["Autenticação"])
-app.include_router(appointments_router, prefix="/api/v1/appointments", tags=["Agendamentos"])
-app.include_router(clients_router, prefix="/api/v1/clients", tags=["Clientes"])
-app.include_router(barbers_router, prefix="/api/v1/barbers", tags=["Barbeiros"])
-app.include_router(services_router, prefix="/api/v1/services", tags=["Serviços"])
-app.include_router(products_router, prefix="/api/v1/products", tags=["Produtos"])
-app.include_router(sales_router, prefix="/api/v1/sales", tags=["Vendas"])
-app.include_router(analytics_router, prefix="/api/v1/analytics", tags=["Analytics"])
-app.include_router(ai_router, prefix="/api/v1/ai", tags=["Inteligência Artificial"])
-app.include_router(commissions_router, prefix="/api/v1/commissions", tags=["Comissões"])
-app.include_router(barber_blocks_router, prefix="/api/v1/barber-blocks", tags=["Bloqueios de Agenda"])
+# Incluir routers (importados na primeira requisição ao prefixo com LAZY_ROUTERS=true)
+ROUTERS = [
+    ("app.api.auth", "/api/v1/auth", ["Autenticação"]),
+    ("app.api.appointments", "/api/v1/appointments", ["Agendamentos"]),
+    ("app.api.clients", "/api/v1/clients", ["Clientes"]),
+    ("app.api.barbers", "/api/v1/barbers", ["Barbeiros"]),
+    ("app.api.services", "/api/v1/services", ["Serviços"]),
+    ("app.api.products", "/api/v1/products", ["Produtos"]),
+    ("app.api.sales", "/api/v1/sales", ["Vendas"]),
+    ("app.api.analytics", "/api/v1/analytics", ["Analytics"]),
+    ("app.api.ai", "/api/v1/ai", ["Inteligência Artificial"]),
+    ("app.api.commissions", "/api/v1/commissions", ["Comissões"]),
+    ("app.api.barber_blocks", "/api/v1/barber-blocks", ["Bloqueios de Agenda"]),
+    ("app.api.shop_closures", "/api/v1/shop-closures", ["Fechamentos da Barbearia"]),
+    ("app.api.diagnostics", "/api/v1/diagnostics", ["Diagnósticos"]),
+]
+
+for module_path, prefix, tags in ROUTERS:
+    lazy_routers.add(module_path, prefix, tags)
+if not settings.lazy_routers:
+    lazy_routers.load_all()
 
 # Evento de startup
 @app.on_event("startup")
@@ -174,17 +207,30 @@ async def startup_event():
     print(f"🔍 DATABASE_URL: {db_url_preview}")
     
     # Inicializar banco de dados (criar tabelas se não existirem)
-    try:
-        print("🔄 Inicializando tabelas do banco de dados...")
-        if init_database():
-            print("✅ Banco de dados inicializado com sucesso!")
-        else:
-            print("⚠️ Aviso: Não foi possível inicializar o banco de dados")
-    except Exception as e:
-        print(f"❌ Erro ao inicializar banco de dados: {e}")
-        import traceback
-        print(traceback.format_exc())
-        # Não bloquear o startup se o banco já existir
+    # Em produção o schema é das migrações: python -m app.bootstrap no deploy
+    if not settings.db_init_on_startup:
+        print("⏭️ Schema gerenciado por migrações (python -m app.bootstrap); DB_INIT_ON_STARTUP=true para criar no startup")
+    else:
+        try:
+            print("🔄 Inicializando tabelas do banco de dados...")
+            if init_database():
+                print("✅ Banco de dados inicializado com sucesso!")
+            else:
+                print("⚠️ Aviso: Não foi possível inicializar o banco de dados")
+        except Exception as e:
+            print(f"❌ Erro ao inicializar banco de dados: {e}")
+            import traceback
+            print(traceback.format_exc())
+            # Não bloquear o startup se o banco já existir
+    
+    print("Configurando tracing...")
+    start_tracing()
+
+    print("Criando cliente HTTP compartilhado...")
+    await start_http_client()
+    
+    print("Iniciando barramento de invalidação de cache...")
+    start_invalidation_bus()
     
     print("Inicializando modulos de IA...")
     print("API pronta para receber requisicoes!")
@@ -196,6 +242,13 @@ async def shutdown_event():
     Eventos executados no encerramento da aplicação.
     """
     print("Encerrando Barbershop Manager API...")
+    print("Fechando cliente HTTP compartilhado...")
+    await close_http_client()
+    print("Parando barramento de invalidação de cache...")
+    stop_invalidation_bus()
+    mark_worker_dead()
+    print("Exportando spans pendentes...")
+    stop_tracing()
     print("Fechando conexoes do banco de dados...")
     print("API encerrada com sucesso!")
 
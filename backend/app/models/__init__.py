@@ -8,6 +8,8 @@ from .appointment import Appointment
 from .commission import Commission, CommissionType
 from .product import Product
 from .barber_block import BarberBlock
+from .barber_block_rule import BarberBlockRule
+from .shop_closure import ShopClosure
 
 # Garantir que todos os modelos sejam importados para o SQLAlchemy
 __all__ = [
@@ -20,5 +22,7 @@ __all__ = [
     "Commission",
     "CommissionType",
     "Product",
-    "BarberBlock"
+    "BarberBlock",
+    "BarberBlockRule",
+    "ShopClosure"
 ] 
\ No newline at end of file
@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Numeric, Text, Enum
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from sqlalchemy import ForeignKey, Table
+from sqlalchemy import ForeignKey, Index, Table
 import enum
 from app.core.database import Base
 
@@ -16,6 +16,13 @@ class AppointmentStatus(str, enum.Enum):
     NO_SHOW = "no_show"         # Cliente não compareceu
     RESCHEDULED = "rescheduled"  # Reagendado
 
+# Status que ocupam a agenda do barbeiro (pausado libera o horário)
+ACTIVE_STATUSES = (
+    AppointmentStatus.PENDING,
+    AppointmentStatus.CONFIRMED,
+    AppointmentStatus.IN_PROGRESS,
+)
+
 class AppointmentType(str, enum.Enum):
     """Tipo de agendamento"""
     REGULAR = "regular"          # Agendamento normal
@@ -228,12 +235,9 @@ class Appointment(Base):
             return f"{minutes}m"
     
     def generate_appointment_number(self) -> str:
-        """Gera número do agendamento"""
-        from datetime import datetime
-        import random
-        date_str = datetime.now().strftime("%Y%m%d")
-        random_num = random.randint(1000, 9999)
-        return f"AG{date_str}{random_num}"
+        """Gera número do agendamento (mesmo formato do endpoint de criação)"""
+        from app.utils.appointment_codes import generate_appointment_code
+        return generate_appointment_code()
     
     def calculate_total_amount(self) -> float:
         """Calcula valor total dos serviços"""
@@ -291,4 +295,22 @@ class Appointment(Base):
             "review": self.review,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        } 
\ No newline at end of file
+        }
+
+# === ÍNDICES DOS CAMINHOS QUENTES (migração 0002) ===
+
+# Conflito na reserva (app/services/booking.py): só agendamentos que ocupam a
+# agenda; por end_time para que "end_time > início" percorra só os atuais/futuros
+Index(
+    "ix_appointments_barber_active_end",
+    Appointment.barber_id,
+    Appointment.end_time,
+    postgresql_where=Appointment.status.in_(ACTIVE_STATUSES) & Appointment.deleted_at.is_(None),
+    sqlite_where=Appointment.status.in_(ACTIVE_STATUSES) & Appointment.deleted_at.is_(None),
+)
+# Agenda do barbeiro por dia/período (disponibilidade, listagem, analytics por barbeiro)
+Index("ix_appointments_barber_date", Appointment.barber_id, Appointment.appointment_date)
+# Histórico do cliente (listagem e métricas de retorno, mais recente primeiro)
+Index("ix_appointments_client_date", Appointment.client_id, Appointment.appointment_date)
+# Analytics por status e período
+Index("ix_appointments_status_date", Appointment.status, Appointment.appointment_date)
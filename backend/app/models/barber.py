@@ -65,6 +65,7 @@ class Barber(Base):
     # services = relationship("Service", back_populates="barber", cascade="all, delete-orphan")
     commissions = relationship("Commission", back_populates="barber", cascade="all, delete-orphan")
     blocks = relationship("BarberBlock", back_populates="barber", cascade="all, delete-orphan")
+    block_rules = relationship("BarberBlockRule", back_populates="barber", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<Barber(id={self.id}, name='{self.professional_name}', barbershop_id={self.barbershop_id})>"
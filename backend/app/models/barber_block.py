@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Date, Index, true
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -73,6 +73,11 @@ class BarberBlock(Base):
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
 
-
-
-
+# Bloqueios ativos do barbeiro no dia (check-availability e disponibilidade)
+Index(
+    "ix_barber_blocks_barber_active_date",
+    BarberBlock.barber_id,
+    BarberBlock.block_date,
+    postgresql_where=(BarberBlock.is_active == true()) & BarberBlock.deleted_at.is_(None),
+    sqlite_where=(BarberBlock.is_active == true()) & BarberBlock.deleted_at.is_(None),
+)
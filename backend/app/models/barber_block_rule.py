@@ -0,0 +1,89 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Date, Time, JSON, Index, true
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+class BarberBlockRule(Base):
+    """
+    Regra de bloqueio recorrente (ex.: "toda segunda de folga", "almoço 12h–13h
+    todo dia"). Uma linha vale para todas as datas da regra; as ocorrências são
+    calculadas só para o período consultado (app/services/block_rules.py).
+    """
+    __tablename__ = "barber_block_rules"
+
+    # === IDENTIFICAÇÃO ===
+    id = Column(Integer, primary_key=True, index=True)
+
+    # === RELACIONAMENTOS ===
+    barber_id = Column(Integer, ForeignKey("barbers.id"), nullable=False, index=True)
+
+    # === RECORRÊNCIA ===
+    frequency = Column(String(10), nullable=False, default="weekly")  # "daily" ou "weekly"
+    interval = Column(Integer, nullable=False, default=1)  # A cada N dias/semanas
+    weekdays = Column(JSON, nullable=True)  # [0, 2, 4] (0=segunda); semanal sem dias = dia de start_date
+    start_date = Column(Date, nullable=False)  # Primeira data da regra
+    until_date = Column(Date, nullable=True)  # Última data (inclusiva); vazio = sem fim
+    exception_dates = Column(JSON, nullable=True)  # ["2025-03-03", ...] datas em que a regra não vale
+
+    # === PERÍODO BLOQUEADO EM CADA OCORRÊNCIA (horário local da barbearia) ===
+    all_day = Column(Boolean, default=True)
+    start_time = Column(Time, nullable=True)
+    end_time = Column(Time, nullable=True)
+
+    # === INFORMAÇÕES ===
+    reason = Column(String(255), nullable=True)
+    notes = Column(Text, nullable=True)
+
+    # === CONTROLE ===
+    is_active = Column(Boolean, default=True)
+
+    # === TIMESTAMPS ===
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    deleted_at = Column(DateTime, nullable=True)  # Soft delete
+
+    # === RELACIONAMENTOS ===
+    barber = relationship("Barber", back_populates="block_rules")
+
+    def __repr__(self):
+        return f"<BarberBlockRule(id={self.id}, barber_id={self.barber_id}, frequency='{self.frequency}')>"
+
+    @property
+    def formatted_period(self) -> str:
+        """Retorna o período formatado"""
+        if self.all_day:
+            return "Dia inteiro"
+
+        if self.start_time and self.end_time:
+            return f"{self.start_time.strftime('%H:%M')} - {self.end_time.strftime('%H:%M')}"
+
+        return "Horário não definido"
+
+    def to_dict(self) -> dict:
+        """Converte para dicionário (para JSON)"""
+        return {
+            "id": self.id,
+            "barber_id": self.barber_id,
+            "frequency": self.frequency,
+            "interval": self.interval,
+            "weekdays": self.weekdays,
+            "start_date": self.start_date.isoformat() if self.start_date else None,
+            "until_date": self.until_date.isoformat() if self.until_date else None,
+            "exception_dates": self.exception_dates or [],
+            "all_day": self.all_day,
+            "start_time": self.start_time.strftime("%H:%M") if self.start_time else None,
+            "end_time": self.end_time.strftime("%H:%M") if self.end_time else None,
+            "reason": self.reason,
+            "notes": self.notes,
+            "is_active": self.is_active,
+            "formatted_period": self.formatted_period,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+# Regras ativas do barbeiro (expansão das ocorrências)
+Index(
+    "ix_barber_block_rules_barber_active",
+    BarberBlockRule.barber_id,
+    postgresql_where=(BarberBlockRule.is_active == true()) & BarberBlockRule.deleted_at.is_(None),
+    sqlite_where=(BarberBlockRule.is_active == true()) & BarberBlockRule.deleted_at.is_(None),
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Date, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Date, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -21,7 +21,8 @@ class Commission(Base):
     
     # === RELACIONAMENTOS ===
     barber_id = Column(Integer, ForeignKey("barbers.id"), nullable=False, index=True)
-    appointment_id = Column(Integer, ForeignKey("appointments.id"), nullable=True, index=True)
+    # Uma comissão por agendamento (índice único uq_commissions_appointment_id)
+    appointment_id = Column(Integer, ForeignKey("appointments.id"), nullable=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=True, index=True)
     
     # === DADOS DA COMISSÃO ===
@@ -61,4 +62,8 @@ class Commission(Base):
     @property
     def is_product_commission(self) -> bool:
         """Verifica se é comissão por produto"""
-        return self.commission_type == CommissionType.PRODUCT 
\ No newline at end of file
+        return self.commission_type == CommissionType.PRODUCT
+
+# Índice único: gerar comissão duas vezes para o mesmo agendamento vira erro de
+# integridade (NULLs de comissões de produto não conflitam entre si)
+Index("uq_commissions_appointment_id", Commission.appointment_id, unique=True)
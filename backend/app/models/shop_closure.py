@@ -0,0 +1,67 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Date, Index, true
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+class ShopClosure(Base):
+    """
+    Fechamento da barbearia inteira: feriado nacional/local ou fechamento
+    avulso (reforma, evento). Uma linha por período, valendo para todos os
+    barbeiros, em vez de um BarberBlock por barbeiro e data.
+    """
+    __tablename__ = "shop_closures"
+
+    # === IDENTIFICAÇÃO ===
+    id = Column(Integer, primary_key=True, index=True)
+
+    # === RELACIONAMENTOS ===
+    barbershop_id = Column(Integer, ForeignKey("barbershops.id"), nullable=False, index=True)
+
+    # === PERÍODO (datas locais, inclusivas) ===
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    recurs_yearly = Column(Boolean, default=False)  # Feriado de data fixa (ex.: 25/12): mesmo dia/mês todo ano
+
+    # === INFORMAÇÕES ===
+    kind = Column(String(20), nullable=False, default="holiday")  # "holiday" ou "closure"
+    name = Column(String(255), nullable=False)  # Ex.: "Natal", "Reforma"
+    notes = Column(Text, nullable=True)
+
+    # === CONTROLE ===
+    is_active = Column(Boolean, default=True)
+
+    # === TIMESTAMPS ===
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    deleted_at = Column(DateTime, nullable=True)  # Soft delete
+
+    # === RELACIONAMENTOS ===
+    barbershop = relationship("Barbershop")
+
+    def __repr__(self):
+        return f"<ShopClosure(id={self.id}, barbershop_id={self.barbershop_id}, {self.start_date}..{self.end_date})>"
+
+    def to_dict(self) -> dict:
+        """Converte para dicionário (para JSON)"""
+        return {
+            "id": self.id,
+            "barbershop_id": self.barbershop_id,
+            "start_date": self.start_date.isoformat() if self.start_date else None,
+            "end_date": self.end_date.isoformat() if self.end_date else None,
+            "recurs_yearly": self.recurs_yearly,
+            "kind": self.kind,
+            "name": self.name,
+            "notes": self.notes,
+            "is_active": self.is_active,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+# Fechamentos ativos da barbearia (carga do calendário do ano)
+Index(
+    "ix_shop_closures_shop_active_dates",
+    ShopClosure.barbershop_id,
+    ShopClosure.start_date,
+    ShopClosure.end_date,
+    postgresql_where=(ShopClosure.is_active == true()) & ShopClosure.deleted_at.is_(None),
+    sqlite_where=(ShopClosure.is_active == true()) & ShopClosure.deleted_at.is_(None),
+)
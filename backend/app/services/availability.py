@@ -0,0 +1,268 @@
+"""
+Busca de horários livres ("primeiro horário disponível").
+
+Cada barbeiro vira um gerador de horários em ordem cronológica: para cada dia
+local, o expediente compilado (app/services/schedules.py: barbeiro ∩
+barbearia, menos os minutos bloqueados) menos os agendamentos ativos dá os
+vãos livres, e cada vão rende os inícios alinhados à grade em que o
+atendimento inteiro cabe.
+
+"Inteiro" é a pegada dos serviços (ServiceFootprint): soma das durações mais
+preparação antes e limpeza depois. Um início t é válido quando
+[t - preparação, t + duração + limpeza) está dentro de um vão livre; a grade
+(AVAILABILITY_GRANULARITY_MINUTES) só define quais t são oferecidos.
+
+Os geradores de todos os barbeiros são combinados com heapq.merge (merge de k
+listas ordenadas) e a busca para no K-ésimo resultado. Cada gerador só avança
+o necessário: a ocupação é carregada em janelas de DAYS_PER_FETCH dias por
+barbeiro, então o custo acompanha os resultados e não barbeiros × dias × slots.
+"""
+
+import heapq
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from itertools import islice
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import true
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.appointment import Appointment, appointment_services
+from app.models.barber import Barber
+from app.models.service import Service
+from app.services.booking import overlap_clause
+from app.services.schedules import get_barber_schedule, load_block_masks
+from app.utils.timezones import as_utc, local_midnight_utc, to_local
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Dias de ocupação carregados por consulta, por barbeiro
+DAYS_PER_FETCH = 7
+
+MAX_HORIZON_DAYS = 60
+
+Interval = Tuple[datetime, datetime]
+
+
+class BusyInterval(NamedTuple):
+    """Período (UTC) ocupado por um agendamento"""
+    start: datetime
+    end: datetime
+    appointment_id: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class ServiceFootprint:
+    """Tempo de agenda de uma combinação de serviços"""
+    duration: timedelta
+    preparation: timedelta = timedelta(0)  # antes do início marcado
+    cleanup: timedelta = timedelta(0)      # depois do fim do atendimento
+
+    @classmethod
+    def from_services(cls, services: Sequence) -> "ServiceFootprint":
+        """Serviços em sequência: toda a preparação antes, toda a limpeza depois"""
+        return cls(
+            duration=timedelta(minutes=sum(service.duration_minutes or 0 for service in services)),
+            preparation=timedelta(minutes=sum(service.preparation_time or 0 for service in services)),
+            cleanup=timedelta(minutes=sum(service.cleanup_time or 0 for service in services)),
+        )
+
+    @classmethod
+    def default(cls) -> "ServiceFootprint":
+        return cls(duration=timedelta(minutes=settings.default_appointment_duration))
+
+    def window(self, start: datetime) -> Interval:
+        """Período que precisa estar livre para começar em `start`"""
+        return start - self.preparation, start + self.duration + self.cleanup
+
+    @property
+    def buffers(self) -> Tuple[timedelta, timedelta]:
+        """(preparação, limpeza), no formato das funções de app/services/booking.py"""
+        return self.preparation, self.cleanup
+
+
+@dataclass(frozen=True, order=True)
+class SlotOption:
+    """Início possível para o atendimento (ordenado por horário, depois barbeiro)"""
+    start_time: datetime
+    barber_id: int
+    end_time: datetime = field(compare=False)
+    barber_name: str = field(default="", compare=False)
+
+    def to_dict(self, tz: ZoneInfo) -> dict:
+        local_start = to_local(self.start_time, tz)
+        return {
+            "barber_id": self.barber_id,
+            "barber_name": self.barber_name,
+            "start_time": self.start_time.isoformat(),
+            "end_time": self.end_time.isoformat(),
+            "local_date": local_start.date().isoformat(),
+            "local_time": local_start.strftime("%H:%M"),
+        }
+
+
+def appointment_footprint(db: Session, appointment: Appointment) -> ServiceFootprint:
+    """
+    Pegada de um agendamento já gravado: a duração dele e os buffers dos
+    serviços ligados em appointment_services (sem serviços, sem buffers).
+    """
+    services = db.query(Service).join(
+        appointment_services, appointment_services.c.service_id == Service.id
+    ).filter(appointment_services.c.appointment_id == appointment.id).all()
+    footprint = ServiceFootprint.from_services(services)
+    duration = appointment.end_time - appointment.start_time if appointment.end_time and appointment.start_time \
+        else footprint.duration
+    return ServiceFootprint(duration=duration, preparation=footprint.preparation, cleanup=footprint.cleanup)
+
+
+# === VÃOS LIVRES ===
+
+def subtract_intervals(base: Sequence[Interval], busy: Sequence[Interval]) -> List[Interval]:
+    """
+    Partes de `base` fora de `busy` (varredura linear; as duas listas
+    ordenadas por início e `base` sem sobreposições).
+    """
+    free: List[Interval] = []
+    index = 0
+    for start, end in base:
+        cursor = start
+        # Ocupações que terminam antes deste trecho não afetam os próximos
+        while index < len(busy) and busy[index][1] <= cursor:
+            index += 1
+        scan = index
+        while scan < len(busy) and busy[scan][0] < end:
+            busy_start, busy_end = busy[scan][:2]
+            if busy_start > cursor:
+                free.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+            if cursor >= end:
+                break
+            scan += 1
+        if cursor < end:
+            free.append((cursor, end))
+    return free
+
+
+def load_booked_intervals(db: Session, barber_id: int, first_day: date, last_day: date,
+                          tz: ZoneInfo) -> List[BusyInterval]:
+    """Agendamentos ativos do barbeiro nos dias locais, em UTC e ordenados"""
+    window_start = local_midnight_utc(first_day, tz)
+    window_end = local_midnight_utc(last_day + timedelta(days=1), tz)
+    booked = [
+        BusyInterval(as_utc(start), as_utc(end), appointment_id)
+        for appointment_id, start, end in db.query(Appointment.id, Appointment.start_time, Appointment.end_time)
+        .filter(overlap_clause(barber_id, window_start, window_end))
+    ]
+    booked.sort()
+    return booked
+
+
+def free_gaps(db: Session, barber: Barber, start: datetime, end: datetime,
+              tz: ZoneInfo) -> Iterator[Tuple[date, Interval]]:
+    """Vãos livres do barbeiro entre start e end, em ordem, com o dia local de cada um"""
+    schedule = get_barber_schedule(db, barber)
+    day = to_local(start, tz).date()
+    last_day = to_local(end, tz).date()
+    while day <= last_day:
+        chunk_end = min(day + timedelta(days=DAYS_PER_FETCH - 1), last_day)
+        booked = load_booked_intervals(db, barber.id, day, chunk_end, tz)
+        blocked = load_block_masks(db, barber.id, day, chunk_end, tz, barber.barbershop_id)
+        while day <= chunk_end:
+            base = [
+                (max(a, start), min(b, end))
+                for a, b in schedule.intervals(day, tz, blocked.get(day, 0))
+                if b > start and a < end
+            ]
+            for gap in subtract_intervals(base, booked):
+                yield day, gap
+            day += timedelta(days=1)
+
+
+def _granularity(step_minutes: Optional[int]) -> timedelta:
+    return timedelta(minutes=step_minutes or settings.availability_granularity_minutes)
+
+
+def gap_starts(day: date, gap: Interval, footprint: ServiceFootprint, step: timedelta,
+               tz: ZoneInfo) -> Iterator[datetime]:
+    """Inícios da grade do dia cuja janela (com preparação e limpeza) cabe no vão"""
+    gap_start, gap_end = gap
+    midnight = local_midnight_utc(day, tz)
+    offset = gap_start + footprint.preparation - midnight
+    candidate = midnight + step * -(-offset // step)  # arredondar para cima na grade
+    while footprint.window(candidate)[1] <= gap_end:
+        yield candidate
+        candidate += step
+
+
+def barber_slots(db: Session, barber: Barber, footprint: ServiceFootprint, start: datetime, end: datetime,
+                 tz: ZoneInfo, step_minutes: Optional[int] = None) -> Iterator[SlotOption]:
+    """Inícios na grade em que o atendimento inteiro cabe num vão livre"""
+    step = _granularity(step_minutes)
+    for day, gap in free_gaps(db, barber, start, end, tz):
+        for candidate in gap_starts(day, gap, footprint, step, tz):
+            yield SlotOption(candidate, barber.id, candidate + footprint.duration, barber.professional_name)
+
+
+def day_availability(db: Session, barber: Barber, day: date, footprint: ServiceFootprint, tz: ZoneInfo,
+                     step_minutes: Optional[int] = None) -> List[Tuple[datetime, bool, Optional[int]]]:
+    """
+    Grade do expediente do dia: (início UTC, cabe o atendimento?, agendamento
+    que ocupa o horário). Uma varredura linear sobre os vãos e outra sobre os
+    agendamentos, ambas ordenadas como a grade.
+    """
+    step = _granularity(step_minutes)
+    schedule = get_barber_schedule(db, barber)
+    shifts = schedule.intervals(day, tz)
+    if not shifts:
+        return []
+
+    appointments = load_booked_intervals(db, barber.id, day, day, tz)
+    blocked = load_block_masks(db, barber.id, day, day, tz, barber.barbershop_id).get(day, 0)
+    gaps = subtract_intervals(schedule.intervals(day, tz, blocked), appointments)
+
+    grid = []
+    midnight = local_midnight_utc(day, tz)
+    candidate = midnight + step * -(-(shifts[0][0] - midnight) // step)
+    gap_index = busy_index = 0
+    while candidate < shifts[-1][1]:
+        window_start, window_end = footprint.window(candidate)
+        while gap_index < len(gaps) and gaps[gap_index][1] <= window_start:
+            gap_index += 1
+        fits = gap_index < len(gaps) and gaps[gap_index][0] <= window_start and window_end <= gaps[gap_index][1]
+
+        while busy_index < len(appointments) and appointments[busy_index].end <= candidate:
+            busy_index += 1
+        occupied_by = None
+        if busy_index < len(appointments) and appointments[busy_index].start < candidate + step:
+            occupied_by = appointments[busy_index].appointment_id
+
+        grid.append((candidate, fits, occupied_by))
+        candidate += step
+    return grid
+
+
+# === BUSCA ===
+
+def bookable_barbers(db: Session, barber_ids: Optional[Sequence[int]] = None) -> List[Barber]:
+    query = db.query(Barber).filter(
+        Barber.is_active == true(),
+        Barber.accepts_appointments == true(),
+        Barber.deleted_at.is_(None),
+    )
+    if barber_ids:
+        query = query.filter(Barber.id.in_(barber_ids))
+    return query.order_by(Barber.id).all()
+
+
+def find_next_available(db: Session, barbers: Sequence[Barber], footprint: ServiceFootprint, tz: ZoneInfo,
+                        limit: int = 5, horizon_days: int = 14, now: Optional[datetime] = None,
+                        step_minutes: Optional[int] = None) -> List[SlotOption]:
+    """Os `limit` primeiros horários livres entre os barbeiros, a partir de agora"""
+    start = (now or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    end = local_midnight_utc(to_local(start, tz).date() + timedelta(days=horizon_days), tz)
+    streams = [barber_slots(db, barber, footprint, start, end, tz, step_minutes) for barber in barbers]
+    return list(islice(heapq.merge(*streams), limit))
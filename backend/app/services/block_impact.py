@@ -0,0 +1,263 @@
+"""
+Impacto de um bloqueio novo sobre os agendamentos já marcados.
+
+Um bloqueio (folga, atestado) criado por cima de horários marcados deixava
+esses agendamentos em conflito silencioso. Aqui o bloqueio vira uma operação:
+
+    1. os agendamentos ativos do barbeiro que se sobrepõem ao bloqueio saem
+       de uma query (overlap_clause, pelo índice parcial de agendamentos)
+    2. as alternativas de todos eles saem de uma passada só: os vãos livres
+       de cada colega na janela afetada e os do próprio barbeiro depois do
+       bloqueio são carregados uma vez (free_gaps) e repartidos entre os
+       agendamentos em ordem cronológica; a primeira opção de cada um é
+       reservada na lista, para dois clientes não receberem o mesmo horário
+    3. opcionalmente, todos são remarcados (primeira opção) ou cancelados na
+       mesma transação do bloqueio
+
+As opções de colega mantêm o horário do cliente e vêm primeiro; depois, os
+próximos horários do mesmo barbeiro.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.barber import Barber
+from app.services.availability import (
+    Interval,
+    ServiceFootprint,
+    SlotOption,
+    bookable_barbers,
+    free_gaps,
+    gap_starts,
+    subtract_intervals,
+)
+from app.services.booking import find_conflict, lock_barber_schedule, overlap_clause
+from app.utils.timezones import as_utc, day_bounds, local_midnight_utc, to_local
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Opções sugeridas por agendamento afetado
+IMPACT_ALTERNATIVES = 3
+
+# Até quantos dias depois do bloqueio procurar horário com o mesmo barbeiro
+REBOOK_HORIZON_DAYS = 14
+
+RESOLUTIONS = ("keep", "reassign", "cancel")
+
+DayGap = Tuple[date, Interval]
+
+
+@dataclass
+class AffectedAppointment:
+    """Agendamento atingido pelo bloqueio, com as alternativas calculadas"""
+    appointment: Appointment
+    start_time: datetime  # horário original (UTC), antes de remarcar
+    end_time: datetime
+    barber_id: int
+    alternatives: List[SlotOption] = field(default_factory=list)
+    outcome: Optional[str] = None  # "reassigned", "cancelled" ou "unresolved"
+
+    @property
+    def duration(self) -> timedelta:
+        return self.end_time - self.start_time
+
+    def to_dict(self, tz: ZoneInfo) -> dict:
+        appointment = self.appointment
+        data = {
+            "appointment_id": appointment.id,
+            "appointment_number": appointment.appointment_number,
+            "client_id": appointment.client_id,
+            "client_name": appointment.client_name,
+            "client_phone": appointment.client_phone,
+            "barber_id": self.barber_id,
+            "start_time": self.start_time.isoformat(),
+            "end_time": self.end_time.isoformat(),
+            "local_time": to_local(self.start_time, tz).strftime("%d/%m %H:%M"),
+            "alternatives": [
+                {**option.to_dict(tz), "same_barber": option.barber_id == self.barber_id}
+                for option in self.alternatives
+            ],
+            "outcome": self.outcome,
+        }
+        if self.outcome == "reassigned":
+            data["new_barber_id"] = appointment.barber_id
+            data["new_start_time"] = as_utc(appointment.start_time).isoformat()
+        return data
+
+
+def block_window(block_date: date, all_day: bool, start_time: Optional[datetime],
+                 end_time: Optional[datetime], tz: ZoneInfo) -> Interval:
+    """Período bloqueado em UTC (o dia local inteiro, se all_day)"""
+    if all_day:
+        return day_bounds(block_date, tz)
+    return as_utc(start_time), as_utc(end_time)
+
+
+def affected_appointments(db: Session, barber_id: int, start: datetime, end: datetime) -> List[Appointment]:
+    """Agendamentos ativos do barbeiro que se sobrepõem ao bloqueio, em ordem"""
+    return db.query(Appointment).filter(
+        overlap_clause(barber_id, start, end)
+    ).order_by(Appointment.start_time, Appointment.id).all()
+
+
+def colleagues_of(db: Session, barber: Barber) -> List[Barber]:
+    """Barbeiros da mesma barbearia que aceitam agendamentos"""
+    return [
+        colleague for colleague in bookable_barbers(db)
+        if colleague.id != barber.id and colleague.barbershop_id == barber.barbershop_id
+    ]
+
+
+# === ALTERNATIVAS (UMA PASSADA) ===
+
+def _claim(gaps: List[DayGap], start: datetime, end: datetime) -> None:
+    """Tirar [start, end) dos vãos (o horário foi prometido a um agendamento)"""
+    for index, (day, gap) in enumerate(gaps):
+        if gap[0] < end and gap[1] > start:
+            gaps[index:index + 1] = [(day, piece) for piece in subtract_intervals([gap], [(start, end)])]
+            return
+
+
+def _contains(gaps: Sequence[DayGap], start: datetime, end: datetime) -> bool:
+    return any(gap[0] <= start and end <= gap[1] for _, gap in gaps)
+
+
+def _later_slots(gaps: Sequence[DayGap], footprint: ServiceFootprint, step: timedelta, tz: ZoneInfo,
+                 barber: Barber, limit: int) -> List[SlotOption]:
+    found: List[SlotOption] = []
+    if limit <= 0:
+        return found
+    for day, gap in gaps:
+        for candidate in gap_starts(day, gap, footprint, step, tz):
+            found.append(SlotOption(candidate, barber.id, candidate + footprint.duration, barber.professional_name))
+            if len(found) >= limit:
+                return found
+    return found
+
+
+def plan_alternatives(db: Session, barber: Barber, items: Sequence[AffectedAppointment],
+                      block_end: datetime, tz: ZoneInfo, colleagues: Iterable[Barber] = (),
+                      limit: int = IMPACT_ALTERNATIVES, horizon_days: int = REBOOK_HORIZON_DAYS,
+                      now: Optional[datetime] = None, step_minutes: Optional[int] = None) -> None:
+    """
+    Preencher item.alternatives de todos os agendamentos afetados.
+    Vãos de cada barbeiro carregados uma vez; a primeira opção de cada
+    agendamento é descontada dos vãos antes de passar ao próximo.
+    """
+    if not items:
+        return
+    step = timedelta(minutes=step_minutes or settings.availability_granularity_minutes)
+    window_start = min(item.start_time for item in items)
+    window_end = max(item.end_time for item in items)
+
+    colleague_gaps = [
+        (colleague, list(free_gaps(db, colleague, window_start, window_end, tz)))
+        for colleague in colleagues
+    ]
+
+    search_start = max(block_end, (now or datetime.now(timezone.utc)).astimezone(timezone.utc))
+    search_end = local_midnight_utc(to_local(search_start, tz).date() + timedelta(days=horizon_days), tz)
+    own_gaps = list(free_gaps(db, barber, search_start, search_end, tz))
+
+    for item in items:
+        options: List[Tuple[SlotOption, List[DayGap]]] = []
+        for colleague, gaps in colleague_gaps:
+            if len(options) >= limit:
+                break
+            if _contains(gaps, item.start_time, item.end_time):
+                options.append((
+                    SlotOption(item.start_time, colleague.id, item.end_time, colleague.professional_name),
+                    gaps,
+                ))
+        footprint = ServiceFootprint(duration=item.duration)
+        for option in _later_slots(own_gaps, footprint, step, tz, barber, limit - len(options)):
+            options.append((option, own_gaps))
+
+        item.alternatives = [option for option, _ in options]
+        if options:
+            first, gaps = options[0]
+            _claim(gaps, first.start_time, first.end_time)
+
+
+def assess_block_impact(db: Session, barber: Barber, start: datetime, end: datetime, tz: ZoneInfo,
+                        include_colleagues: bool = True, now: Optional[datetime] = None) -> List[AffectedAppointment]:
+    """Agendamentos atingidos por [start, end) e as alternativas de cada um"""
+    items = [
+        AffectedAppointment(
+            appointment=appointment,
+            start_time=as_utc(appointment.start_time),
+            end_time=as_utc(appointment.end_time),
+            barber_id=appointment.barber_id,
+        )
+        for appointment in affected_appointments(db, barber.id, start, end)
+    ]
+    colleagues = colleagues_of(db, barber) if include_colleagues and items else []
+    plan_alternatives(db, barber, items, end, tz, colleagues, now=now)
+    return items
+
+
+# === RESOLUÇÃO EM LOTE ===
+
+def lock_schedules(db: Session, barber_ids: Iterable[int]) -> None:
+    """Locks de agenda de vários barbeiros, sempre na mesma ordem (sem deadlock)"""
+    for barber_id in sorted(set(barber_ids)):
+        lock_barber_schedule(db, barber_id)
+
+
+def reassign_affected(db: Session, items: Sequence[AffectedAppointment]) -> None:
+    """
+    Remarcar cada agendamento para a primeira alternativa. Os locks já
+    estão na transação; a conferência final usa a mesma validação das
+    reservas. Sem opção (ou com conflito) o agendamento fica onde está.
+    O commit é do chamador.
+    """
+    for item in items:
+        if not item.alternatives:
+            item.outcome = "unresolved"
+            continue
+        option = item.alternatives[0]
+        conflict = find_conflict(db, option.barber_id, option.start_time, option.end_time,
+                                 exclude_id=item.appointment.id)
+        if conflict is not None:
+            logger.warning(f"⚠️ Agendamento {item.appointment.id} não remarcado: conflito com {conflict.kind} {conflict.id}")
+            item.outcome = "unresolved"
+            continue
+
+        appointment = item.appointment
+        appointment.barber_id = option.barber_id
+        appointment.appointment_date = option.start_time
+        appointment.start_time = option.start_time
+        appointment.end_time = option.end_time
+        item.outcome = "reassigned"
+        # Próximas conferências precisam ver esta remarcação
+        db.flush()
+
+
+def cancel_affected(db: Session, items: Sequence[AffectedAppointment], cancelled_by: str,
+                    reason: Optional[str] = None) -> None:
+    """Cancelar os agendamentos afetados (o commit é do chamador)"""
+    cancelled_at = datetime.now()
+    for item in items:
+        appointment = item.appointment
+        appointment.status = AppointmentStatus.CANCELLED
+        appointment.cancelled_at = cancelled_at
+        appointment.cancelled_by = cancelled_by
+        appointment.cancellation_reason = reason
+        item.outcome = "cancelled"
+
+
+def touched_barber_ids(items: Iterable[AffectedAppointment]) -> List[int]:
+    """Barbeiros cujas agendas mudaram (origem e destino), para invalidação"""
+    touched = set()
+    for item in items:
+        if item.outcome in ("reassigned", "cancelled"):
+            touched.update((item.barber_id, item.appointment.barber_id))
+    return sorted(touched)
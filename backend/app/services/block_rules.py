@@ -0,0 +1,235 @@
+"""
+Bloqueios recorrentes (BarberBlockRule) expandidos sob demanda.
+
+Uma regra ("toda segunda", "12h–13h todo dia", com datas de exceção) é uma
+linha só, qualquer que seja o horizonte. As ocorrências são calculadas apenas
+para as semanas consultadas e guardadas em memória por (barbeiro, semana),
+num LRU de até RULE_CACHE_MAX_ENTRIES semanas:
+consultas seguidas da mesma semana (disponibilidade, reserva, listagem) não
+voltam ao banco. O evento BARBER_BLOCKS do barramento de invalidação descarta
+as semanas do barbeiro; RULE_CACHE_TTL_SECONDS é a rede de segurança.
+"""
+
+import logging
+import time as _time
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_, or_, true
+from sqlalchemy.orm import Session
+
+from app.core.cache import LocalLRUCache
+from app.core.invalidation import InvalidationEvent, InvalidationKind, invalidation_bus
+from app.models.barber_block_rule import BarberBlockRule
+from app.utils.timezones import day_bounds, from_local, to_local
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+FREQUENCIES = ("daily", "weekly")
+
+RULE_CACHE_TTL_SECONDS = 300.0
+
+# Semanas expandidas mantidas em memória (LRU por barbeiro, semana e fuso)
+RULE_CACHE_MAX_ENTRIES = 4096
+
+# Listagem de bloqueios sem período informado: ocorrências dos próximos dias
+LIST_DEFAULT_DAYS = 31
+MAX_EXPANSION_DAYS = 366
+
+
+@dataclass(frozen=True)
+class BlockOccurrence:
+    """Uma data em que a regra bloqueia a agenda (horários em UTC)"""
+    rule_id: int
+    barber_id: int
+    block_date: date
+    all_day: bool
+    start_time: Optional[datetime]
+    end_time: Optional[datetime]
+    reason: Optional[str] = None
+    notes: Optional[str] = None
+
+    def bounds(self, tz: ZoneInfo) -> Tuple[datetime, datetime]:
+        """Período bloqueado em UTC (o dia local inteiro, se all_day)"""
+        if self.all_day:
+            return day_bounds(self.block_date, tz)
+        return self.start_time, self.end_time
+
+    def overlaps(self, start: datetime, end: datetime, tz: ZoneInfo) -> bool:
+        block_start, block_end = self.bounds(tz)
+        return block_start < end and block_end > start
+
+
+@dataclass(frozen=True)
+class RuleSpec:
+    """Cópia da regra desligada da sessão, com as exceções já convertidas"""
+    id: int
+    barber_id: int
+    frequency: str
+    interval: int
+    weekdays: FrozenSet[int]
+    start_date: date
+    until_date: Optional[date]
+    exception_dates: FrozenSet[date]
+    all_day: bool
+    start_time: Optional[time]
+    end_time: Optional[time]
+    reason: Optional[str]
+    notes: Optional[str]
+
+    @classmethod
+    def from_model(cls, rule: BarberBlockRule) -> "RuleSpec":
+        weekdays = frozenset(rule.weekdays or ()) or frozenset({rule.start_date.weekday()})
+        return cls(
+            id=rule.id,
+            barber_id=rule.barber_id,
+            frequency=rule.frequency,
+            interval=max(rule.interval or 1, 1),
+            weekdays=weekdays,
+            start_date=rule.start_date,
+            until_date=rule.until_date,
+            exception_dates=frozenset(date.fromisoformat(value) for value in rule.exception_dates or ()),
+            all_day=bool(rule.all_day),
+            start_time=rule.start_time,
+            end_time=rule.end_time,
+            reason=rule.reason,
+            notes=rule.notes,
+        )
+
+    def occurs_on(self, day: date) -> bool:
+        if day < self.start_date or (self.until_date and day > self.until_date) or day in self.exception_dates:
+            return False
+        if self.frequency == "daily":
+            return (day - self.start_date).days % self.interval == 0
+        weeks = (week_start(day) - week_start(self.start_date)).days // 7
+        return day.weekday() in self.weekdays and weeks % self.interval == 0
+
+    def occurrence(self, day: date, tz: ZoneInfo) -> Optional[BlockOccurrence]:
+        if self.all_day:
+            return BlockOccurrence(self.id, self.barber_id, day, True, None, None, self.reason, self.notes)
+        if not self.start_time or not self.end_time:
+            return None
+        return BlockOccurrence(
+            self.id, self.barber_id, day, False,
+            from_local(datetime.combine(day, self.start_time), tz),
+            from_local(datetime.combine(day, self.end_time), tz),
+            self.reason, self.notes,
+        )
+
+
+def week_start(day: date) -> date:
+    """Segunda-feira da semana do dia"""
+    return day - timedelta(days=day.weekday())
+
+
+def expand_rules(rules: Iterable[RuleSpec], first_day: date, last_day: date,
+                 tz: ZoneInfo) -> List[BlockOccurrence]:
+    """Ocorrências das regras entre as duas datas (inclusivas), em ordem de data"""
+    occurrences: List[BlockOccurrence] = []
+    rules = list(rules)
+    day = first_day
+    while day <= last_day:
+        for rule in rules:
+            if rule.occurs_on(day):
+                occurrence = rule.occurrence(day, tz)
+                if occurrence is not None:
+                    occurrences.append(occurrence)
+        day += timedelta(days=1)
+    return occurrences
+
+
+# === CACHE POR (BARBEIRO, SEMANA) ===
+
+_week_cache = LocalLRUCache(RULE_CACHE_MAX_ENTRIES)
+
+
+def _barber_tag(barber_id: int) -> str:
+    return f"barber:{barber_id}"
+
+
+def load_rules(db: Session, barber_id: int, first_day: date, last_day: date) -> List[RuleSpec]:
+    """Regras ativas do barbeiro que podem ter ocorrência no período"""
+    rules = db.query(BarberBlockRule).filter(and_(
+        BarberBlockRule.barber_id == barber_id,
+        BarberBlockRule.is_active == true(),
+        BarberBlockRule.deleted_at.is_(None),
+        BarberBlockRule.start_date <= last_day,
+        or_(BarberBlockRule.until_date.is_(None), BarberBlockRule.until_date >= first_day),
+    )).all()
+    return [RuleSpec.from_model(rule) for rule in rules]
+
+
+def rule_occurrences(db: Session, barber_id: int, first_day: date, last_day: date,
+                     tz: ZoneInfo) -> List[BlockOccurrence]:
+    """
+    Ocorrências das regras do barbeiro no período, semana a semana pelo cache.
+    As semanas que faltam são expandidas com uma única query de regras.
+    """
+    weeks = []
+    monday = week_start(first_day)
+    while monday <= last_day:
+        weeks.append(monday)
+        monday += timedelta(days=7)
+
+    found: Dict[date, Tuple[BlockOccurrence, ...]] = {}
+    for monday in weeks:
+        cached = _week_cache.get((barber_id, monday, tz.key))
+        if cached is not None:
+            found[monday] = cached
+
+    missing = [monday for monday in weeks if monday not in found]
+    if missing:
+        rules = load_rules(db, barber_id, missing[0], missing[-1] + timedelta(days=6))
+        expanded = {
+            monday: tuple(expand_rules(rules, monday, monday + timedelta(days=6), tz))
+            for monday in missing
+        }
+        expires_at = _time.time() + RULE_CACHE_TTL_SECONDS
+        for monday, occurrences in expanded.items():
+            _week_cache.set((barber_id, monday, tz.key), occurrences, expires_at, (_barber_tag(barber_id),))
+        found.update(expanded)
+
+    return [
+        occurrence
+        for monday in weeks
+        for occurrence in found[monday]
+        if first_day <= occurrence.block_date <= last_day
+    ]
+
+
+def rule_conflict(db: Session, barber_id: int, start: datetime, end: datetime,
+                  tz: ZoneInfo) -> Optional[BlockOccurrence]:
+    """Primeira ocorrência de regra que atinge [start, end)"""
+    first_day = to_local(start, tz).date()
+    last_day = to_local(end - timedelta(microseconds=1), tz).date()
+    for occurrence in rule_occurrences(db, barber_id, first_day, last_day, tz):
+        if occurrence.overlaps(start, end, tz):
+            return occurrence
+    return None
+
+
+def rule_barber_ids(db: Session) -> List[int]:
+    """Barbeiros com alguma regra ativa (listagem geral do admin)"""
+    rows = db.query(BarberBlockRule.barber_id).filter(
+        BarberBlockRule.is_active == true(),
+        BarberBlockRule.deleted_at.is_(None),
+    ).distinct().all()
+    return [row[0] for row in rows]
+
+
+def clear_rule_cache(barber_id: Optional[int] = None) -> None:
+    if barber_id is None:
+        _week_cache.clear()
+        return
+    _week_cache.invalidate_tags((_barber_tag(barber_id),))
+
+
+def _on_blocks_event(event: InvalidationEvent) -> None:
+    clear_rule_cache(event.barber_id)
+
+
+invalidation_bus.subscribe(_on_blocks_event, InvalidationKind.BARBER_BLOCKS)
+invalidation_bus.on_reconnect(clear_rule_cache)
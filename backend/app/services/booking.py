@@ -0,0 +1,297 @@
+"""
+Reserva de horários com exclusão mútua por barbeiro.
+
+Verificar conflito com SELECT e depois inserir não basta: duas requisições
+simultâneas (em workers diferentes) para o mesmo horário passam pela
+verificação antes de qualquer uma gravar. Aqui a verificação e o INSERT rodam
+na mesma transação, depois de um lock que serializa as reservas do barbeiro:
+
+    - PostgreSQL: pg_advisory_xact_lock(namespace, barber_id), liberado no
+      commit/rollback; reservas de barbeiros diferentes não esperam umas
+      pelas outras
+    - SQLite: BEGIN IMMEDIATE (lock de escrita do banco inteiro; o SQLite só
+      tem um escritor por vez de qualquer forma)
+
+A verificação cobre agendamentos ativos e bloqueios de agenda ativos (dia
+inteiro ou parciais) em uma única query (UNION ALL, cada lado pelo seu índice
+parcial) e devolve o item que conflita, para a interface sugerir outro
+horário sem novas chamadas. Bloqueios recorrentes (regras) e fechamentos da
+barbearia (feriados) são conferidos depois, pelos calendários em memória
+(app/services/block_rules.py e app/services/closures.py).
+
+Remarcar (move_appointment) e reativar um agendamento cancelado ou pausado
+(reclaim_slot) passam pelo mesmo lock e pela mesma verificação.
+
+O período conferido inclui a preparação antes e a limpeza depois dos serviços
+(`buffers`, de ServiceFootprint), a mesma regra da disponibilidade: um
+horário que a busca não oferece também não é aceito na reserva.
+
+Conflitos viram BookingConflict, que os routers traduzem em 409.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_, bindparam, false, literal, null, or_, select, text, true, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.appointment import ACTIVE_STATUSES, Appointment, AppointmentStatus
+from app.models.barber_block import BarberBlock
+from app.services.block_rules import rule_conflict
+from app.services.closures import barber_shop_id, closure_conflict
+from app.utils.appointment_codes import MAX_ATTEMPTS, generate_appointment_code, is_code_collision
+from app.utils.timezones import day_bounds, get_shop_timezone, to_local
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Primeira chave dos advisory locks de agenda ("BARB"), para não colidir com
+# outros usos de pg_advisory_lock no mesmo banco
+BOOKING_LOCK_NAMESPACE = 0x42415242
+
+# (preparação, limpeza) em volta do atendimento; ServiceFootprint.buffers
+Buffers = Tuple[timedelta, timedelta]
+NO_BUFFERS: Buffers = (timedelta(0), timedelta(0))
+
+
+@dataclass(frozen=True)
+class ScheduleConflict:
+    """Item da agenda que ocupa o horário pedido"""
+    kind: str  # "appointment", "block", "block_rule" ou "closure"
+    id: int
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    all_day: bool = False
+    reason: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "type": self.kind,
+            "id": self.id,
+            "start_time": self.start_time.isoformat() if self.start_time else None,
+            "end_time": self.end_time.isoformat() if self.end_time else None,
+            "all_day": self.all_day,
+            "reason": self.reason,
+        }
+
+
+class BookingConflict(Exception):
+    """O horário pedido sobrepõe um agendamento ativo ou um bloqueio do barbeiro"""
+
+    def __init__(self, conflict: ScheduleConflict):
+        label = "agendamento" if conflict.kind == "appointment" else "bloqueio"
+        super().__init__(f"Horário ocupado pelo {label} {conflict.id}")
+        self.conflict = conflict
+
+
+def active_status_clause():
+    """
+    status IN (ativos) com os valores escritos no SQL: o índice parcial
+    ix_appointments_barber_active_end só é usado quando o planner vê as
+    constantes (o SQLite não usa índice parcial com parâmetros)
+    """
+    return Appointment.status.in_(
+        bindparam("active_statuses", list(ACTIVE_STATUSES), expanding=True, literal_execute=True)
+    )
+
+
+def overlap_clause(barber_id: int, start: datetime, end: datetime, exclude_id: Optional[int] = None):
+    """
+    Agendamentos ativos do barbeiro que se sobrepõem a [start, end).
+    Dois intervalos se sobrepõem quando cada um começa antes do outro
+    terminar, o que cobre início, fim e agendamento que contém o novo.
+    """
+    clause = and_(
+        Appointment.barber_id == barber_id,
+        active_status_clause(),
+        Appointment.deleted_at.is_(None),
+        Appointment.end_time > start,
+        Appointment.start_time < end,
+    )
+    if exclude_id is not None:
+        clause = and_(clause, Appointment.id != exclude_id)
+    return clause
+
+
+def block_overlap_clause(barber_id: int, start: datetime, end: datetime, tz: ZoneInfo):
+    """
+    Bloqueios ativos do barbeiro que atingem [start, end): de dia inteiro em
+    algum dos dias locais do intervalo, ou parciais que se sobrepõem a ele.
+    O filtro por block_date vale para os dois tipos e usa o índice parcial.
+    """
+    first_day = to_local(start, tz).date()
+    last_day = to_local(end - timedelta(microseconds=1), tz).date()
+    return and_(
+        BarberBlock.barber_id == barber_id,
+        BarberBlock.is_active == true(),
+        BarberBlock.deleted_at.is_(None),
+        BarberBlock.block_date >= first_day,
+        BarberBlock.block_date <= last_day,
+        or_(
+            BarberBlock.all_day == true(),
+            and_(BarberBlock.start_time < end, BarberBlock.end_time > start),
+        ),
+    )
+
+
+def conflict_statement(barber_id: int, start: datetime, end: datetime, tz: ZoneInfo,
+                       exclude_id: Optional[int] = None):
+    """Primeiro agendamento ou bloqueio que conflita com o intervalo (uma query)"""
+    appointments = select(
+        literal("appointment").label("kind"),
+        Appointment.id.label("id"),
+        Appointment.start_time.label("start_time"),
+        Appointment.end_time.label("end_time"),
+        false().label("all_day"),
+        null().label("reason"),
+    ).where(overlap_clause(barber_id, start, end, exclude_id))
+    blocks = select(
+        literal("block"),
+        BarberBlock.id,
+        BarberBlock.start_time,
+        BarberBlock.end_time,
+        BarberBlock.all_day,
+        BarberBlock.reason,
+    ).where(block_overlap_clause(barber_id, start, end, tz))
+    return union_all(appointments, blocks).limit(1)
+
+
+def buffered_window(start: datetime, end: datetime, buffers: Buffers = NO_BUFFERS) -> Tuple[datetime, datetime]:
+    """Período que precisa estar livre: o atendimento mais preparação e limpeza"""
+    preparation, cleanup = buffers
+    return start - preparation, end + cleanup
+
+
+def lock_barber_schedule(db: Session, barber_id: int) -> None:
+    """Serializar reservas do barbeiro até o fim da transação atual"""
+    connection = db.connection()
+    if connection.dialect.name == "postgresql":
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(:namespace, :barber_id)"),
+            {"namespace": BOOKING_LOCK_NAMESPACE, "barber_id": barber_id},
+        )
+    elif connection.dialect.name == "sqlite":
+        # O pysqlite só abre transação antes de escrever; se nada foi escrito
+        # ainda, abrir já com o lock de escrita (espera pelo busy timeout)
+        if not connection.connection.driver_connection.in_transaction:
+            db.execute(text("BEGIN IMMEDIATE"))
+
+
+def find_conflict(db: Session, barber_id: int, start: datetime, end: datetime,
+                  exclude_id: Optional[int] = None) -> Optional[ScheduleConflict]:
+    """Agendamento ativo ou bloqueio que ocupa o intervalo (ou None se estiver livre)"""
+    tz = get_shop_timezone(db)
+    row = db.execute(conflict_statement(barber_id, start, end, tz, exclude_id)).first()
+    if row is None:
+        closed = closure_conflict(db, barber_shop_id(db, barber_id), start, end, tz)
+        if closed is not None:
+            day, closure = closed
+            day_start, day_end = day_bounds(day, tz)
+            return ScheduleConflict(
+                kind="closure",
+                id=closure.closure_id,
+                start_time=day_start,
+                end_time=day_end,
+                all_day=True,
+                reason=closure.name,
+            )
+        occurrence = rule_conflict(db, barber_id, start, end, tz)
+        if occurrence is None:
+            return None
+        block_start, block_end = occurrence.bounds(tz)
+        return ScheduleConflict(
+            kind="block_rule",
+            id=occurrence.rule_id,
+            start_time=block_start,
+            end_time=block_end,
+            all_day=occurrence.all_day,
+            reason=occurrence.reason,
+        )
+    return ScheduleConflict(
+        kind=row.kind,
+        id=row.id,
+        start_time=row.start_time,
+        end_time=row.end_time,
+        all_day=bool(row.all_day),
+        reason=row.reason,
+    )
+
+
+def book_appointment(db: Session, appointment: Appointment, buffers: Buffers = NO_BUFFERS) -> Appointment:
+    """
+    Gravar um agendamento novo se o horário (com os buffers) estiver livre.
+    Lock, verificação e INSERT na mesma transação; colisão de código gera
+    outro código e repete o ciclo (o lock é refeito, pois o rollback o solta).
+    """
+    start, end = buffered_window(appointment.start_time, appointment.end_time, buffers)
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        lock_barber_schedule(db, appointment.barber_id)
+        conflict = find_conflict(db, appointment.barber_id, start, end)
+        if conflict is not None:
+            db.rollback()
+            raise BookingConflict(conflict)
+
+        if not appointment.appointment_number:
+            appointment.appointment_number = generate_appointment_code()
+        db.add(appointment)
+        try:
+            db.commit()
+            return appointment
+        except IntegrityError as exc:
+            db.rollback()
+            if not is_code_collision(exc) or attempt == MAX_ATTEMPTS:
+                raise
+            logger.warning(f"⚠️ Código de agendamento {appointment.appointment_number} já existe, gerando outro")
+            appointment.appointment_number = None
+
+
+def move_appointment(db: Session, appointment: Appointment, new_start: datetime,
+                     buffers: Buffers = NO_BUFFERS) -> None:
+    """
+    Mudar o horário de um agendamento mantendo a duração.
+    Deixa o lock do barbeiro na transação: o chamador faz o commit.
+    """
+    duration = appointment.end_time - appointment.start_time if appointment.end_time and appointment.start_time \
+        else timedelta(minutes=appointment.duration_minutes or 30)
+    new_end = new_start + duration
+    start, end = buffered_window(new_start, new_end, buffers)
+
+    lock_barber_schedule(db, appointment.barber_id)
+    conflict = find_conflict(db, appointment.barber_id, start, end, exclude_id=appointment.id)
+    if conflict is not None:
+        db.rollback()
+        raise BookingConflict(conflict)
+
+    appointment.appointment_date = new_start
+    appointment.start_time = new_start
+    appointment.end_time = new_end
+
+
+
+def reclaim_slot(db: Session, appointment: Appointment, buffers: Buffers = NO_BUFFERS) -> None:
+    """
+    Conferir se o horário de um agendamento fora da agenda (cancelado,
+    pausado, não compareceu...) continua livre antes de ele voltar a
+    ocupá-la: nesse meio tempo o horário pode ter sido reservado.
+    Deixa o lock do barbeiro na transação: o chamador faz o commit.
+    """
+    end = appointment.end_time or appointment.start_time + timedelta(minutes=appointment.duration_minutes or 30)
+    start, end = buffered_window(appointment.start_time, end, buffers)
+
+    lock_barber_schedule(db, appointment.barber_id)
+    conflict = find_conflict(db, appointment.barber_id, start, end, exclude_id=appointment.id)
+    if conflict is not None:
+        db.rollback()
+        raise BookingConflict(conflict)
+
+
+def change_status(db: Session, appointment: Appointment, new_status: AppointmentStatus,
+                  buffers: Buffers = NO_BUFFERS) -> None:
+    """Mudar o status; voltar a um status ativo passa por reclaim_slot"""
+    if new_status in ACTIVE_STATUSES and appointment.status not in ACTIVE_STATUSES:
+        reclaim_slot(db, appointment, buffers)
+    appointment.status = new_status
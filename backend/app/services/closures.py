@@ -0,0 +1,173 @@
+"""
+Calendário de fechamentos da barbearia (feriados e fechamentos avulsos).
+
+Um feriado ou uma reforma é uma linha de shop_closures para a barbearia
+inteira, não um BarberBlock por barbeiro. O calendário de cada ano vira um
+dicionário {data local: fechamento}, carregado com uma query e guardado em
+memória por (barbearia, ano), num LRU de até CLOSURE_CACHE_MAX_ENTRIES anos;
+"a barbearia fecha neste dia?" é uma consulta ao dicionário.
+
+Disponibilidade, validação de reservas, check-availability e o heatmap de
+ocupação passam por aqui. O evento SCHEDULES com entity_id da barbearia
+(publicado pelo router de fechamentos) descarta o calendário em cache.
+"""
+
+import logging
+import time as _time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_, or_, true
+from sqlalchemy.orm import Session
+
+from app.core.cache import LocalLRUCache
+from app.core.invalidation import InvalidationEvent, InvalidationKind, invalidation_bus
+from app.models.barber import Barber
+from app.models.barbershop import Barbershop
+from app.models.shop_closure import ShopClosure
+from app.utils.timezones import to_local
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+CLOSURE_KINDS = ("holiday", "closure")
+
+CLOSURE_CACHE_TTL_SECONDS = 300.0
+
+# Anos de calendário mantidos em memória (LRU por barbearia e ano)
+CLOSURE_CACHE_MAX_ENTRIES = 256
+
+# Fechamento anual (ex.: 24/12–26/12) não pode cobrir mais de um ano
+MAX_RECURRING_DAYS = 366
+
+
+@dataclass(frozen=True)
+class ClosedDay:
+    """Motivo do fechamento de uma data"""
+    closure_id: int
+    name: str
+    kind: str
+
+
+def _in_year(day: date, year: int) -> date:
+    """Mesmo dia/mês em outro ano (29/02 vira 28/02 nos anos não bissextos)"""
+    try:
+        return day.replace(year=year)
+    except ValueError:
+        return day.replace(year=year, day=28)
+
+
+def load_closed_days(db: Session, barbershop_id: int, year: int) -> Dict[date, ClosedDay]:
+    """Datas fechadas do ano (uma query; fechamentos anuais repetidos no ano)"""
+    first_day, last_day = date(year, 1, 1), date(year, 12, 31)
+    closures = db.query(ShopClosure).filter(and_(
+        ShopClosure.barbershop_id == barbershop_id,
+        ShopClosure.is_active == true(),
+        ShopClosure.deleted_at.is_(None),
+        ShopClosure.start_date <= last_day,
+        or_(ShopClosure.end_date >= first_day, ShopClosure.recurs_yearly == true()),
+    )).order_by(ShopClosure.start_date, ShopClosure.id).all()
+
+    days: Dict[date, ClosedDay] = {}
+    for closure in closures:
+        closed = ClosedDay(closure.id, closure.name, closure.kind)
+        length = closure.end_date - closure.start_date
+        if closure.recurs_yearly:
+            # Ocorrência que começa no ano anterior pode terminar neste (31/12–01/01)
+            spans = [
+                (_in_year(closure.start_date, y), _in_year(closure.start_date, y) + length)
+                for y in (year - 1, year) if y >= closure.start_date.year
+            ]
+        else:
+            spans = [(closure.start_date, closure.end_date)]
+        for start, end in spans:
+            day = max(start, first_day)
+            while day <= min(end, last_day):
+                days.setdefault(day, closed)
+                day += timedelta(days=1)
+    return days
+
+
+# === CACHE POR (BARBEARIA, ANO) ===
+
+_year_cache = LocalLRUCache(CLOSURE_CACHE_MAX_ENTRIES)
+
+
+def _shop_tag(barbershop_id: int) -> str:
+    return f"barbershop:{barbershop_id}"
+
+
+def closed_days(db: Session, barbershop_id: int, year: int) -> Dict[date, ClosedDay]:
+    cached = _year_cache.get((barbershop_id, year))
+    if cached is not None:
+        return cached
+
+    days = load_closed_days(db, barbershop_id, year)
+    _year_cache.set((barbershop_id, year), days, _time.time() + CLOSURE_CACHE_TTL_SECONDS,
+                    (_shop_tag(barbershop_id),))
+    return days
+
+
+def closure_on(db: Session, barbershop_id: Optional[int], day: date) -> Optional[ClosedDay]:
+    """Fechamento da barbearia na data (ou None se abre)"""
+    if barbershop_id is None:
+        return None
+    return closed_days(db, barbershop_id, day.year).get(day)
+
+
+def closures_between(db: Session, barbershop_id: Optional[int], first_day: date,
+                     last_day: date) -> Dict[date, ClosedDay]:
+    """Datas fechadas entre as duas datas (inclusivas)"""
+    if barbershop_id is None:
+        return {}
+    found: Dict[date, ClosedDay] = {}
+    for year in range(first_day.year, last_day.year + 1):
+        found.update(
+            (day, closed) for day, closed in closed_days(db, barbershop_id, year).items()
+            if first_day <= day <= last_day
+        )
+    return found
+
+
+def closure_conflict(db: Session, barbershop_id: Optional[int], start: datetime, end: datetime,
+                     tz: ZoneInfo) -> Optional[Tuple[date, ClosedDay]]:
+    """Primeiro dia local de [start, end) em que a barbearia está fechada"""
+    day = to_local(start, tz).date()
+    last_day = to_local(end - timedelta(microseconds=1), tz).date()
+    while day <= last_day:
+        closed = closure_on(db, barbershop_id, day)
+        if closed is not None:
+            return day, closed
+        day += timedelta(days=1)
+    return None
+
+
+def barber_shop_id(db: Session, barber_id: int) -> Optional[int]:
+    """Barbearia do barbeiro (sem query se o barbeiro já está na sessão)"""
+    barber = db.get(Barber, barber_id)
+    return barber.barbershop_id if barber else None
+
+
+def default_barbershop_id(db: Session) -> Optional[int]:
+    """A primeira barbearia (mesma escolha de get_shop_timezone sem id)"""
+    row = db.query(Barbershop.id).order_by(Barbershop.id).first()
+    return row[0] if row else None
+
+
+def clear_closure_cache(barbershop_id: Optional[int] = None) -> None:
+    if barbershop_id is None:
+        _year_cache.clear()
+        return
+    _year_cache.invalidate_tags((_shop_tag(barbershop_id),))
+
+
+def _on_schedule_event(event: InvalidationEvent) -> None:
+    # Alteração só de um barbeiro não muda o calendário da barbearia
+    if event.barber_id is None:
+        clear_closure_cache(event.entity_id)
+
+
+invalidation_bus.subscribe(_on_schedule_event, InvalidationKind.SCHEDULES)
+invalidation_bus.on_reconnect(clear_closure_cache)
@@ -0,0 +1,272 @@
+"""
+Expediente semanal compilado (barbeiro ∩ barbearia).
+
+Barber.working_hours e Barbershop.opening_hours são JSON com "HH:MM" por dia
+da semana. Em vez de interpretar o JSON a cada cálculo de agenda, cada dia
+vira uma máscara de bits com resolução de minuto (bit m = minuto m do dia
+local, 1440 bits num int do Python):
+
+    - intervalo de almoço: máscara & ~intervalo
+    - expediente efetivo: máscara do barbeiro & máscara da barbearia
+    - bloqueios do dia: máscara & ~bloqueios
+    - "trabalha às 14:35?": (máscara >> 875) & 1
+
+O expediente compilado de cada barbeiro fica em memória (LRU de até
+SCHEDULE_CACHE_MAX_ENTRIES) por SCHEDULE_TTL_SECONDS e é descartado pelo evento SCHEDULES do barramento de
+invalidação, publicado no commit de qualquer alteração de working_hours ou
+opening_hours.
+"""
+
+import logging
+import math
+import time as _time
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_, event, true
+from sqlalchemy.orm import Session, attributes
+
+from app.core.cache import LocalLRUCache
+from app.core.config import settings
+from app.core.invalidation import InvalidationEvent, InvalidationKind, invalidation_bus, publish_invalidation
+from app.models.barber import Barber
+from app.models.barber_block import BarberBlock
+from app.models.barbershop import Barbershop
+from app.services.block_rules import rule_occurrences
+from app.services.closures import closures_between
+from app.utils.timezones import from_local, to_local
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+FULL_DAY = (1 << MINUTES_PER_DAY) - 1
+
+# Expediente usado quando o barbeiro não configurou working_hours
+DEFAULT_DAY_HOURS = {"start": settings.opening_time, "end": settings.closing_time}
+
+# Rede de segurança para alterações feitas fora do ORM (SQL direto)
+SCHEDULE_TTL_SECONDS = 300.0
+
+# Expedientes compilados mantidos em memória (LRU, por barbeiro e por barbearia)
+SCHEDULE_CACHE_MAX_ENTRIES = 1024
+
+Interval = Tuple[datetime, datetime]
+MinuteRun = Tuple[int, int]
+
+
+# === MÁSCARAS DE MINUTOS ===
+
+def minute_mask(start_minute: int, end_minute: int) -> int:
+    """Bits dos minutos [start_minute, end_minute) do dia"""
+    start_minute = max(start_minute, 0)
+    end_minute = min(end_minute, MINUTES_PER_DAY)
+    if start_minute >= end_minute:
+        return 0
+    return ((1 << (end_minute - start_minute)) - 1) << start_minute
+
+
+def mask_runs(mask: int) -> List[MinuteRun]:
+    """Trechos contínuos de bits ligados, em ordem: [(início, fim), ...]"""
+    runs: List[MinuteRun] = []
+    while mask:
+        start = (mask & -mask).bit_length() - 1
+        rest = ~(mask >> start)
+        length = (rest & -rest).bit_length() - 1
+        runs.append((start, start + length))
+        mask &= ~(((1 << length) - 1) << start)
+    return runs
+
+
+def _minute_of(value: str) -> int:
+    parsed = time.fromisoformat(value)
+    return parsed.hour * 60 + parsed.minute
+
+
+def day_hours_mask(hours: Optional[dict], start_key: str = "start", end_key: str = "end") -> int:
+    """Máscara de um dia do JSON de horários, já sem o intervalo (break_start/break_end)"""
+    if not hours or not hours.get(start_key) or not hours.get(end_key):
+        return 0
+    mask = minute_mask(_minute_of(hours[start_key]), _minute_of(hours[end_key]))
+    if hours.get("break_start") and hours.get("break_end"):
+        mask &= ~minute_mask(_minute_of(hours["break_start"]), _minute_of(hours["break_end"]))
+    return mask
+
+
+@dataclass(frozen=True)
+class WeeklySchedule:
+    """Uma máscara de minutos por dia da semana (0=segunda), no horário local"""
+    days: Tuple[int, ...]
+    runs: Tuple[Tuple[MinuteRun, ...], ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "runs", tuple(tuple(mask_runs(mask)) for mask in self.days))
+
+    @classmethod
+    def from_hours(cls, hours: Optional[dict], start_key: str = "start", end_key: str = "end") -> "WeeklySchedule":
+        """JSON {"0": {...}, ..., "6": {...}}; dia ausente = fechado"""
+        hours = hours or {}
+        return cls(tuple(day_hours_mask(hours.get(str(weekday)), start_key, end_key) for weekday in range(7)))
+
+    @classmethod
+    def always_open(cls) -> "WeeklySchedule":
+        return cls((FULL_DAY,) * 7)
+
+    def __and__(self, other: "WeeklySchedule") -> "WeeklySchedule":
+        return WeeklySchedule(tuple(a & b for a, b in zip(self.days, other.days)))
+
+    def is_working(self, at: datetime, tz: ZoneInfo) -> bool:
+        """O instante cai dentro do expediente? (tempo constante)"""
+        local = to_local(at, tz)
+        return bool((self.days[local.weekday()] >> (local.hour * 60 + local.minute)) & 1)
+
+    def intervals(self, day: date, tz: ZoneInfo, blocked: int = 0) -> List[Interval]:
+        """Expediente do dia local em UTC, menos os minutos de `blocked`"""
+        runs = self.runs[day.weekday()] if not blocked else mask_runs(self.days[day.weekday()] & ~blocked)
+        midnight = datetime.combine(day, time())
+        return [
+            (from_local(midnight + timedelta(minutes=start), tz), from_local(midnight + timedelta(minutes=end), tz))
+            for start, end in runs
+        ]
+
+
+def compile_barber_hours(working_hours: Optional[dict]) -> WeeklySchedule:
+    """Expediente do barbeiro; sem working_hours = DEFAULT_DAY_HOURS todos os dias"""
+    if not working_hours:
+        return WeeklySchedule((day_hours_mask(DEFAULT_DAY_HOURS),) * 7)
+    return WeeklySchedule.from_hours(working_hours)
+
+
+def compile_shop_hours(opening_hours: Optional[dict]) -> WeeklySchedule:
+    """Funcionamento da barbearia; sem opening_hours não restringe nada"""
+    if not opening_hours:
+        return WeeklySchedule.always_open()
+    return WeeklySchedule.from_hours(opening_hours, start_key="open", end_key="close")
+
+
+# === CACHE ===
+
+_barber_schedules = LocalLRUCache(SCHEDULE_CACHE_MAX_ENTRIES)
+_shop_schedules = LocalLRUCache(SCHEDULE_CACHE_MAX_ENTRIES)
+
+
+def get_shop_schedule(db: Session, barbershop_id: Optional[int]) -> WeeklySchedule:
+    cached = _shop_schedules.get(barbershop_id)
+    if cached is not None:
+        return cached
+
+    opening_hours = None
+    if barbershop_id is not None:
+        row = db.query(Barbershop.opening_hours).filter(Barbershop.id == barbershop_id).first()
+        opening_hours = row[0] if row else None
+    schedule = compile_shop_hours(opening_hours)
+
+    _shop_schedules.set(barbershop_id, schedule, _time.time() + SCHEDULE_TTL_SECONDS)
+    return schedule
+
+
+def get_barber_schedule(db: Session, barber: Barber) -> WeeklySchedule:
+    """Expediente efetivo do barbeiro (working_hours ∩ opening_hours), compilado uma vez"""
+    cached = _barber_schedules.get(barber.id)
+    if cached is not None:
+        return cached
+
+    schedule = compile_barber_hours(barber.working_hours) & get_shop_schedule(db, barber.barbershop_id)
+
+    _barber_schedules.set(barber.id, schedule, _time.time() + SCHEDULE_TTL_SECONDS)
+    return schedule
+
+
+def clear_schedule_cache(barber_id: Optional[int] = None) -> None:
+    """Descartar o expediente de um barbeiro (ou de todos, e das barbearias)"""
+    if barber_id is not None:
+        _barber_schedules.delete(barber_id)
+        return
+    _barber_schedules.clear()
+    _shop_schedules.clear()
+
+
+def is_barber_working(db: Session, barber: Barber, at: datetime, tz: ZoneInfo) -> bool:
+    """O barbeiro está no expediente em `at`? (sem considerar bloqueios e agendamentos)"""
+    return get_barber_schedule(db, barber).is_working(at, tz)
+
+
+# === BLOQUEIOS ===
+
+def _day_minute(value: datetime, day: date, tz: ZoneInfo, round_up: bool) -> int:
+    """Minuto do dia local `day` em que o instante cai (limitado a [0, 1440])"""
+    offset = (to_local(value, tz) - datetime.combine(day, time())).total_seconds() / 60
+    minute = math.ceil(offset) if round_up else math.floor(offset)
+    return min(max(minute, 0), MINUTES_PER_DAY)
+
+
+def load_block_masks(db: Session, barber_id: int, first_day: date, last_day: date,
+                     tz: ZoneInfo, barbershop_id: Optional[int] = None) -> Dict[date, int]:
+    """
+    Minutos bloqueados por dia local no período: bloqueios avulsos ativos,
+    ocorrências das regras recorrentes do barbeiro e dias em que a barbearia
+    (barbershop_id) está fechada
+    """
+    blocks = db.query(BarberBlock.block_date, BarberBlock.all_day, BarberBlock.start_time, BarberBlock.end_time) \
+        .filter(and_(
+            BarberBlock.barber_id == barber_id,
+            BarberBlock.is_active == true(),
+            BarberBlock.deleted_at.is_(None),
+            BarberBlock.block_date >= first_day,
+            BarberBlock.block_date <= last_day,
+        )).all()
+    blocks.extend(
+        (occurrence.block_date, occurrence.all_day, occurrence.start_time, occurrence.end_time)
+        for occurrence in rule_occurrences(db, barber_id, first_day, last_day, tz)
+    )
+
+    masks: Dict[date, int] = dict.fromkeys(closures_between(db, barbershop_id, first_day, last_day), FULL_DAY)
+    for block_date, all_day, start, end in blocks:
+        if all_day:
+            masks[block_date] = FULL_DAY
+            continue
+        if not start or not end:
+            continue
+        # Bloqueio parcial pode passar da meia-noite: marca cada dia que atinge
+        day = min(block_date, to_local(start, tz).date())
+        while day <= to_local(end, tz).date():
+            masks[day] = masks.get(day, 0) | minute_mask(
+                _day_minute(start, day, tz, round_up=False), _day_minute(end, day, tz, round_up=True)
+            )
+            day += timedelta(days=1)
+    return masks
+
+
+# === INVALIDAÇÃO ===
+
+def _on_schedule_event(event: InvalidationEvent) -> None:
+    clear_schedule_cache(event.barber_id)
+
+
+invalidation_bus.subscribe(_on_schedule_event, InvalidationKind.SCHEDULES)
+invalidation_bus.on_reconnect(clear_schedule_cache)
+
+_PENDING_KEY = "schedule_changes"
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_schedule_changes(session: Session, flush_context, instances) -> None:
+    """Anotar barbeiros/barbearias com horários alterados nesta transação"""
+    for obj in session.dirty:
+        if isinstance(obj, Barber) and attributes.get_history(obj, "working_hours").has_changes():
+            session.info.setdefault(_PENDING_KEY, set()).add((obj.id, None))
+        elif isinstance(obj, Barbershop) and attributes.get_history(obj, "opening_hours").has_changes():
+            session.info.setdefault(_PENDING_KEY, set()).add((None, obj.id))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_schedule_changes(session: Session) -> None:
+    for barber_id, barbershop_id in session.info.pop(_PENDING_KEY, ()):
+        publish_invalidation(InvalidationKind.SCHEDULES, barber_id=barber_id, entity_id=barbershop_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_schedule_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
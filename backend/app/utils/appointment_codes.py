@@ -0,0 +1,71 @@
+"""
+Códigos de agendamento (appointment_number).
+
+Formato: 8 símbolos Crockford base32 aleatórios (40 bits) + 1 símbolo de
+verificação (Luhn mod 32), ex.: "7K3QDXM2P". O alfabeto não tem I, L, O e U,
+então o código é fácil de ditar e digitar; na busca, letras minúsculas,
+hífens e espaços são aceitos e I/L/O são lidos como 1/1/0.
+
+A geração não consulta o banco: com 2^40 combinações a colisão é rara e o
+índice único de appointment_number é a garantia final (quem grava gera outro
+código quando o commit esbarra nele, ver app/services/booking.py).
+"""
+
+import secrets
+
+from sqlalchemy.exc import IntegrityError
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+PAYLOAD_LENGTH = 8
+CODE_LENGTH = PAYLOAD_LENGTH + 1
+MAX_ATTEMPTS = 5
+
+_VALUES = {symbol: value for value, symbol in enumerate(ALPHABET)}
+_ALIASES = str.maketrans({"I": "1", "L": "1", "O": "0", "-": None, " ": None})
+
+
+def _check_symbol(payload: str) -> str:
+    """Luhn mod 32: detecta qualquer troca de um símbolo e a maioria das transposições"""
+    total = 0
+    for position, symbol in enumerate(reversed(payload)):
+        value = _VALUES[symbol]
+        if position % 2 == 0:
+            value *= 2
+            value = value // 32 + value % 32
+        total += value
+    return ALPHABET[(32 - total % 32) % 32]
+
+
+def generate_appointment_code() -> str:
+    """Novo código aleatório com símbolo de verificação (sem ida ao banco)"""
+    payload = "".join(secrets.choice(ALPHABET) for _ in range(PAYLOAD_LENGTH))
+    return payload + _check_symbol(payload)
+
+
+def normalize_appointment_code(code: str) -> str:
+    """Forma canônica do código digitado (maiúsculas, sem separadores, I/L/O corrigidos)"""
+    return code.strip().upper().translate(_ALIASES)
+
+
+def is_valid_appointment_code(code: str) -> bool:
+    """Verifica formato e símbolo de verificação de um código já normalizado"""
+    if len(code) != CODE_LENGTH or any(symbol not in _VALUES for symbol in code):
+        return False
+    return _check_symbol(code[:-1]) == code[-1]
+
+
+def lookup_key(code: str) -> str:
+    """
+    Valor a buscar em appointment_number para o código informado.
+    Códigos no formato atual são normalizados; os antigos (8 caracteres
+    A-Z0-9, "AG<data><n>") são buscados como foram gravados, em maiúsculas.
+    """
+    normalized = normalize_appointment_code(code)
+    if is_valid_appointment_code(normalized):
+        return normalized
+    return code.strip().upper()
+
+
+def is_code_collision(exc: IntegrityError) -> bool:
+    """A violação de integridade veio do índice único de appointment_number?"""
+    return "appointment_number" in str(exc.orig)
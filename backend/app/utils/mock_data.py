@@ -0,0 +1,195 @@
+"""
+Dados mock dos endpoints de demonstração (serviços, barbeiros e vendas).
+
+Ficam fora dos routers para não serem montados na importação da aplicação:
+cada endpoint importa este módulo na primeira chamada.
+"""
+
+# Serviços (usados por /services e /appointments/create-simple)
+MOCK_SERVICES = [
+    {
+        "id": 1,
+        "name": "Corte Masculino",
+        "description": "Corte clássico masculino com máquina e tesoura",
+        "price": 45.00,
+        "duration_minutes": 30,
+        "category": "corte",
+        "is_active": True,
+        "barber_specialties": ["Carlos Santos", "Roberto Costa"],
+        "popularity": 95
+    },
+    {
+        "id": 2,
+        "name": "Corte Feminino",
+        "description": "Corte feminino personalizado com técnicas modernas",
+        "price": 60.00,
+        "duration_minutes": 45,
+        "category": "corte",
+        "is_active": True,
+        "barber_specialties": ["André Lima"],
+        "popularity": 88
+    },
+    {
+        "id": 3,
+        "name": "Barba Completa",
+        "description": "Aparar, modelar e finalizar a barba",
+        "price": 25.00,
+        "duration_minutes": 20,
+        "category": "barba",
+        "is_active": True,
+        "barber_specialties": ["Carlos Santos", "Roberto Costa"],
+        "popularity": 78
+    },
+    {
+        "id": 4,
+        "name": "Corte + Barba",
+        "description": "Pacote completo: corte de cabelo + barba",
+        "price": 65.00,
+        "duration_minutes": 50,
+        "category": "combo",
+        "is_active": True,
+        "barber_specialties": ["Carlos Santos", "Roberto Costa"],
+        "popularity": 92
+    },
+    {
+        "id": 5,
+        "name": "Degradê",
+        "description": "Corte degradê com transições suaves",
+        "price": 50.00,
+        "duration_minutes": 35,
+        "category": "corte",
+        "is_active": True,
+        "barber_specialties": ["Carlos Santos"],
+        "popularity": 85
+    },
+    {
+        "id": 6,
+        "name": "Luzes",
+        "description": "Aplicação de luzes e mechas",
+        "price": 120.00,
+        "duration_minutes": 90,
+        "category": "coloracao",
+        "is_active": True,
+        "barber_specialties": ["André Lima"],
+        "popularity": 65
+    },
+    {
+        "id": 7,
+        "name": "Escova Progressiva",
+        "description": "Tratamento alisante com escova progressiva",
+        "price": 150.00,
+        "duration_minutes": 120,
+        "category": "tratamento",
+        "is_active": True,
+        "barber_specialties": ["André Lima"],
+        "popularity": 45
+    },
+    {
+        "id": 8,
+        "name": "Relaxamento",
+        "description": "Tratamento relaxante para cabelo e couro cabeludo",
+        "price": 80.00,
+        "duration_minutes": 60,
+        "category": "tratamento",
+        "is_active": True,
+        "barber_specialties": ["Roberto Costa"],
+        "popularity": 55
+    }
+]
+
+# Barbeiros (usados por /barbers e /appointments/create-simple)
+MOCK_BARBERS = [
+    {
+        "id": 1,
+        "name": "Carlos Santos",
+        "specialties": ["Corte Masculino", "Barba Completa", "Degradê"],
+        "rating": 4.8,
+        "experience_years": 8,
+        "bio": "Especialista em cortes masculinos clássicos e modernos",
+        "avatar_url": None,
+        "is_active": True,
+        "work_schedule": {
+            "monday": {"start": "08:00", "end": "18:00"},
+            "tuesday": {"start": "08:00", "end": "18:00"},
+            "wednesday": {"start": "08:00", "end": "18:00"},
+            "thursday": {"start": "08:00", "end": "18:00"},
+            "friday": {"start": "08:00", "end": "18:00"},
+            "saturday": {"start": "08:00", "end": "16:00"},
+            "sunday": None
+        }
+    },
+    {
+        "id": 2,
+        "name": "André Lima",
+        "specialties": ["Corte Feminino", "Luzes", "Escova Progressiva"],
+        "rating": 4.9,
+        "experience_years": 12,
+        "bio": "Expert em cortes femininos e técnicas de coloração",
+        "avatar_url": None,
+        "is_active": True,
+        "work_schedule": {
+            "monday": {"start": "09:00", "end": "19:00"},
+            "tuesday": {"start": "09:00", "end": "19:00"},
+            "wednesday": {"start": "09:00", "end": "19:00"},
+            "thursday": {"start": "09:00", "end": "19:00"},
+            "friday": {"start": "09:00", "end": "19:00"},
+            "saturday": {"start": "08:00", "end": "17:00"},
+            "sunday": None
+        }
+    },
+    {
+        "id": 3,
+        "name": "Roberto Costa",
+        "specialties": ["Corte + Barba", "Relaxamento", "Tratamentos"],
+        "rating": 4.7,
+        "experience_years": 15,
+        "bio": "Veterano com experiência em todos os tipos de serviços",
+        "avatar_url": None,
+        "is_active": True,
+        "work_schedule": {
+            "monday": {"start": "08:00", "end": "17:00"},
+            "tuesday": {"start": "08:00", "end": "17:00"},
+            "wednesday": {"start": "08:00", "end": "17:00"},
+            "thursday": {"start": "08:00", "end": "17:00"},
+            "friday": {"start": "08:00", "end": "17:00"},
+            "saturday": {"start": "08:00", "end": "15:00"},
+            "sunday": None
+        }
+    }
+]
+
+# Vendas (lista em memória: /sales cria, atualiza e cancela nela)
+mock_sales = [
+    {
+        "id": "1",
+        "cliente_nome": "João Silva",
+        "barbeiro_nome": "Carlos Santos", 
+        "itens": [
+            {"tipo": "servico", "nome": "Corte Masculino", "preco": 45.0, "quantidade": 1},
+            {"tipo": "servico", "nome": "Barba Completa", "preco": 25.0, "quantidade": 1},
+            {"tipo": "produto", "nome": "Pomada Modeladora", "preco": 35.0, "quantidade": 1}
+        ],
+        "valor_bruto": 105.0,
+        "desconto": 5.0,
+        "valor_final": 100.0,
+        "forma_pagamento": "Cartão de Crédito",
+        "status": "concluida",
+        "data_criacao": "2025-01-11T14:30:00",
+        "observacoes": "Cliente satisfeito"
+    },
+    {
+        "id": "2", 
+        "cliente_nome": "Maria Santos",
+        "barbeiro_nome": "André Lima",
+        "itens": [
+            {"tipo": "servico", "nome": "Corte Feminino", "preco": 60.0, "quantidade": 1}
+        ],
+        "valor_bruto": 60.0,
+        "desconto": 0.0,
+        "valor_final": 60.0,
+        "forma_pagamento": "PIX",
+        "status": "concluida", 
+        "data_criacao": "2025-01-11T15:00:00",
+        "observacoes": ""
+    }
+]
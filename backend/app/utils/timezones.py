@@ -0,0 +1,123 @@
+"""
+Datas locais da barbearia -> intervalos de timestamps em UTC.
+
+Os horários dos agendamentos são gravados como instantes (o frontend envia
+ISO 8601 em UTC; valores sem fuso são tratados como UTC). "Hoje", "dia 10" ou
+"de 01/03 a 31/03" são datas no fuso da barbearia (Barbershop.timezone), então
+filtrar com func.date(coluna) erra a virada do dia (usa o fuso da sessão do
+banco) e ainda impede o uso do índice da coluna.
+
+Aqui uma data ou período local vira o intervalo semiaberto [início, fim) em
+UTC, e o filtro fica `coluna >= início AND coluna < fim`: busca por faixa no
+índice, com a meia-noite certa (inclusive em dias com mudança de horário).
+"""
+
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+DEFAULT_TIMEZONE = "America/Sao_Paulo"
+
+# Fuso da barbearia raramente muda: evita uma query por requisição
+TIMEZONE_TTL_SECONDS = 300.0
+
+_timezone_cache: Dict[Optional[int], Tuple[float, ZoneInfo]] = {}
+_timezone_lock = threading.Lock()
+
+
+def resolve_timezone(name: Optional[str]) -> ZoneInfo:
+    """ZoneInfo do nome informado (fuso padrão se vazio ou desconhecido)"""
+    try:
+        return ZoneInfo(name or DEFAULT_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo(DEFAULT_TIMEZONE)
+
+
+def get_shop_timezone(db: Session, barbershop_id: Optional[int] = None) -> ZoneInfo:
+    """
+    Fuso da barbearia (a primeira, se o id não for informado).
+    Guardado em memória por TIMEZONE_TTL_SECONDS.
+    """
+    now = time.monotonic()
+    with _timezone_lock:
+        cached = _timezone_cache.get(barbershop_id)
+        if cached and cached[0] > now:
+            return cached[1]
+
+    from app.models.barbershop import Barbershop
+
+    query = db.query(Barbershop.timezone)
+    if barbershop_id is not None:
+        query = query.filter(Barbershop.id == barbershop_id)
+    row = query.order_by(Barbershop.id).first()
+    tz = resolve_timezone(row[0] if row else None)
+
+    with _timezone_lock:
+        _timezone_cache[barbershop_id] = (now + TIMEZONE_TTL_SECONDS, tz)
+    return tz
+
+
+def clear_timezone_cache() -> None:
+    with _timezone_lock:
+        _timezone_cache.clear()
+
+
+def local_today(tz: ZoneInfo) -> date:
+    """Data de hoje no fuso da barbearia"""
+    return datetime.now(tz).date()
+
+
+def as_utc(value: datetime) -> datetime:
+    """Instante gravado com fuso UTC explícito (o SQLite devolve sem fuso)"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def to_local(value: datetime, tz: ZoneInfo) -> datetime:
+    """Instante gravado -> data/hora local da barbearia (sem fuso, para agrupar e exibir)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(tz).replace(tzinfo=None)
+
+
+def from_local(value: datetime, tz: ZoneInfo) -> datetime:
+    """Data/hora local da barbearia (sem fuso) -> instante em UTC"""
+    return value.replace(tzinfo=tz).astimezone(timezone.utc)
+
+
+def local_midnight_utc(day: date, tz: ZoneInfo) -> datetime:
+    """Início do dia local em UTC"""
+    return datetime.combine(day, datetime.min.time(), tzinfo=tz).astimezone(timezone.utc)
+
+
+def day_bounds(day: date, tz: ZoneInfo) -> Tuple[datetime, datetime]:
+    """[00:00 do dia, 00:00 do dia seguinte) em UTC"""
+    return local_midnight_utc(day, tz), local_midnight_utc(day + timedelta(days=1), tz)
+
+
+def date_range_bounds(start_date: Optional[date], end_date: Optional[date],
+                      tz: ZoneInfo) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Período local com as duas datas inclusivas -> [início, fim) em UTC.
+    Uma ponta None fica aberta.
+    """
+    start = local_midnight_utc(start_date, tz) if start_date else None
+    end = local_midnight_utc(end_date + timedelta(days=1), tz) if end_date else None
+    return start, end
+
+
+def date_range_clause(column, start_date: Optional[date], end_date: Optional[date], tz: ZoneInfo):
+    """Filtro `column >= início AND column < fim` para o período local (datas inclusivas)"""
+    start, end = date_range_bounds(start_date, end_date, tz)
+    conditions = []
+    if start is not None:
+        conditions.append(column >= start)
+    if end is not None:
+        conditions.append(column < end)
+    return and_(*conditions)
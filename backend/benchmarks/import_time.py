@@ -0,0 +1,163 @@
+"""
+Orçamento de tempo de importação da aplicação (cold start).
+
+Em instâncias que escalam para zero (Render), cada requisição depois de um
+período ocioso paga o boot do worker inteiro. Este harness importa `app.main`
+em processos Python novos com `-X importtime` e sai com erro quando:
+
+    - a mediana do tempo de importação passa do orçamento (--budget-ms)
+    - algum módulo que deveria ser carregado sob demanda aparece no boot
+      (routers, passlib, dados mock, integrações opcionais)
+
+O segundo critério não depende da máquina: vale rodar no CI mesmo quando o
+tempo absoluto oscila.
+
+Uso (a partir de backend/):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 10 --budget-ms 900 --top 20
+    python -m benchmarks.import_time --eager        # LAZY_ROUTERS=false, para comparar
+    python -m benchmarks.import_time --output benchmarks/results/import_time.json
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Orçamento padrão da mediana (ms); ajustável por --budget-ms ou IMPORT_BUDGET_MS
+DEFAULT_BUDGET_MS = 900.0
+
+# Módulos que não podem ser importados no boot (prefixos)
+LAZY_MODULES = (
+    "app.api.",            # routers: incluídos na primeira requisição ao prefixo
+    "app.utils.mock_data",  # dados mock: só nos endpoints de demonstração
+    "passlib",             # hash de senha: primeiro login/cadastro
+    "jwt",                 # decodificado na primeira requisição com token
+    "redis",               # cliente criado no primeiro get_redis()
+    "google.auth",
+    "google.oauth2",
+    "openai",
+    "twilio",
+    "stripe",
+    "opentelemetry",       # tracing: só com TRACING_ENABLED=true
+)
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """Linhas do -X importtime como (módulo, self_us, cumulativo_us, profundidade)"""
+    rows = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+    return rows
+
+
+def measure_once(env: Dict[str, str]) -> List[Tuple[str, int, int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao importar app.main:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def heaviest_imports(rows: List[Tuple[str, int, int, int]], top: int) -> List[dict]:
+    """
+    Importações feitas diretamente por módulos do app, por tempo cumulativo.
+    O -X importtime lista os filhos antes do pai: o pai de uma linha é a
+    próxima linha com profundidade menor.
+    """
+    entries = []
+    for index, (module, self_us, cumulative_us, depth) in enumerate(rows):
+        parent = next((rows[j][0] for j in range(index + 1, len(rows)) if rows[j][3] == depth - 1), None)
+        if parent and parent.startswith("app"):
+            entries.append({"module": module, "imported_by": parent,
+                            "cumulative_ms": round(cumulative_us / 1000, 1), "self_ms": round(self_us / 1000, 1)})
+    entries.sort(key=lambda entry: entry["cumulative_ms"], reverse=True)
+    return entries[:top]
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Medir o tempo de importação de app.main contra um orçamento")
+    parser.add_argument("--runs", type=int, default=5, help="Processos medidos (a mediana é comparada)")
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.environ.get("IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS)))
+    parser.add_argument("--top", type=int, default=15, help="Importações mais pesadas no relatório")
+    parser.add_argument("--eager", action="store_true", help="Importar todos os routers no boot (LAZY_ROUTERS=false)")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--output", type=Path, help="Salvar o relatório em JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+
+    env = dict(os.environ)
+    env["DATABASE_URL"] = args.database_url
+    env["LAZY_ROUTERS"] = "false" if args.eager else "true"
+    env.pop("PYTHONTRACEMALLOC", None)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BACKEND_DIR), env.get("PYTHONPATH")]))
+
+    print(f"⏱️ Importação de app.main | {args.runs} processo(s) | routers {'no boot' if args.eager else 'sob demanda'}")
+    runs = []
+    for _ in range(args.runs):
+        rows = measure_once(env)
+        total_us = next(cumulative for module, _, cumulative, _ in rows if module == "app.main")
+        runs.append((total_us / 1000, rows))
+
+    timings = sorted(total for total, _ in runs)
+    median_ms = statistics.median(timings)
+    median_rows = min(runs, key=lambda run: abs(run[0] - median_ms))[1]
+
+    loaded = {module for module, _, _, _ in median_rows}
+    eager_modules = sorted(module for module in loaded if module.startswith(LAZY_MODULES))
+    heaviest = heaviest_imports(median_rows, args.top)
+
+    print(f"  mediana: {median_ms:.0f}ms | min: {timings[0]:.0f}ms | max: {timings[-1]:.0f}ms "
+          f"| orçamento: {args.budget_ms:.0f}ms")
+    print(f"\n  {'importação':<40} {'por':<28} {'cumul.':>9} {'próprio':>9}")
+    for entry in heaviest:
+        print(f"  {entry['module']:<40} {entry['imported_by']:<28} "
+              f"{entry['cumulative_ms']:>7.1f}ms {entry['self_ms']:>7.1f}ms")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps({
+            "eager": args.eager,
+            "budget_ms": args.budget_ms,
+            "median_ms": round(median_ms, 1),
+            "runs_ms": [round(total, 1) for total in timings],
+            "heaviest_imports": heaviest,
+            "eager_modules": eager_modules,
+        }, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Relatório salvo em {args.output}")
+
+    problems = []
+    if median_ms > args.budget_ms:
+        problems.append(f"importação levou {median_ms:.0f}ms (orçamento {args.budget_ms:.0f}ms)")
+    if eager_modules and not args.eager:
+        problems.append(f"módulos que deveriam ser sob demanda foram importados no boot: {', '.join(eager_modules)}")
+
+    if problems:
+        print(f"\n❌ {len(problems)} problema(s):")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+
+    print("\n✅ Importação dentro do orçamento")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
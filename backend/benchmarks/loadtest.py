@@ -0,0 +1,337 @@
+"""
+Teste de carga ponta a ponta com cenários de um dia de pico (sábado).
+
+Usuários virtuais (tarefas asyncio) sorteiam cenários por peso e disparam
+requisições contra o app em processo (httpx.ASGITransport) ou contra um
+servidor rodando (--base-url). O mix cobre os routers de appointments, auth,
+analytics e clients ao mesmo tempo:
+
+    browse_anonymous     navegação sem login (disponibilidade pública, catálogo)
+    client_availability  cliente logado consultando horários reais
+    login_burst          rajada de logins (bcrypt)
+    book_hot_slots       vários clientes disputando os mesmos horários
+    barber_status        barbeiros confirmando/iniciando/concluindo atendimentos
+    admin_dashboard      admin atualizando o painel
+
+Relatório por cenário: vazão, latência (p50/p95/p99/máx), taxa de erro, taxa
+de conflito (horário já ocupado) e total de queries (header X-DB-Queries).
+
+Uso (a partir de backend/, com o banco gerado por benchmarks.seed):
+    python -m benchmarks.loadtest --database-url sqlite:///./bench.db --users 50 --duration 60
+    python -m benchmarks.loadtest --base-url http://localhost:8000 --users 200 --duration 300
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.run import percentile
+from benchmarks.seed import ADMIN_EMAIL, ADMIN_PASSWORD
+
+LOADTEST_PASSWORD = "loadtest123"
+
+# Peso padrão de cada cenário no mix (proporção de iterações)
+DEFAULT_MIX = {
+    "browse_anonymous": 35,
+    "client_availability": 25,
+    "login_burst": 10,
+    "book_hot_slots": 15,
+    "barber_status": 10,
+    "admin_dashboard": 5,
+}
+
+# Sequência de status que o barbeiro aplica a um agendamento
+STATUS_FLOW = ["CONFIRMED", "IN_PROGRESS", "COMPLETED"]
+
+
+@dataclass
+class ScenarioStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    requests: int = 0
+    errors: int = 0
+    conflicts: int = 0
+    db_queries: int = 0
+    statuses: Dict[str, int] = field(default_factory=dict)
+
+    def report(self, elapsed_seconds: float) -> dict:
+        ordered = sorted(self.latencies_ms)
+        return {
+            "requests": self.requests,
+            "throughput_rps": round(self.requests / elapsed_seconds, 2) if elapsed_seconds else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(ordered, 50), 2),
+                "p95": round(percentile(ordered, 95), 2),
+                "p99": round(percentile(ordered, 99), 2),
+                "max": round(ordered[-1], 2) if ordered else 0.0,
+            },
+            "error_rate": round(self.errors / self.requests, 4) if self.requests else 0.0,
+            "conflict_rate": round(self.conflicts / self.requests, 4) if self.requests else 0.0,
+            "db_queries": self.db_queries,
+            "statuses": self.statuses,
+        }
+
+
+class LoadTest:
+    """Estado compartilhado entre os usuários virtuais"""
+
+    def __init__(self, client, args: argparse.Namespace):
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.stats: Dict[str, ScenarioStats] = {name: ScenarioStats() for name in DEFAULT_MIX}
+        self.client_tokens: List[str] = []
+        self.client_credentials: List[str] = []
+        self.barber_tokens: Dict[int, str] = {}
+        self.admin_token: Optional[str] = None
+        # Agendamentos criados durante o teste, para os barbeiros atualizarem
+        self.booked: List[dict] = []
+        self.hot_slots = self._build_hot_slots()
+
+    def _build_hot_slots(self) -> List[str]:
+        """Sábado de pico: manhã inteira nos barbeiros mais disputados"""
+        reference = self.args.reference_date
+        saturday = reference + timedelta(days=(5 - reference.weekday()) % 7 or 7)
+        return [
+            datetime.combine(saturday, datetime.min.time()).replace(hour=9 + slot // 2, minute=(slot % 2) * 30)
+            .strftime("%Y-%m-%dT%H:%M:00")
+            for slot in range(self.args.hot_slots)
+        ]
+
+    # === REQUISIÇÕES ===
+
+    async def request(self, scenario: str, method: str, path: str, token: Optional[str] = None, **kwargs):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        stats = self.stats[scenario]
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, headers=headers, **kwargs)
+        except Exception:
+            stats.requests += 1
+            stats.errors += 1
+            stats.statuses["exception"] = stats.statuses.get("exception", 0) + 1
+            return None
+
+        stats.latencies_ms.append((time.perf_counter() - started) * 1000)
+        stats.requests += 1
+        code = str(response.status_code)
+        stats.statuses[code] = stats.statuses.get(code, 0) + 1
+        if response.status_code >= 500:
+            stats.errors += 1
+        if response.status_code == 409 or (response.status_code == 400 and "not available" in response.text):
+            stats.conflicts += 1
+        stats.db_queries += int(response.headers.get("x-db-queries", 0))
+        return response
+
+    async def login(self, email: str, password: str) -> Optional[str]:
+        response = await self.client.post("/api/v1/auth/login", json={"email": email, "password": password})
+        if response.status_code != 200:
+            return None
+        return response.json()["access_token"]
+
+    # === PREPARAÇÃO ===
+
+    async def setup(self) -> None:
+        """Criar/logar clientes do teste, barbeiros disputados e o admin"""
+        self.admin_token = await self.login(ADMIN_EMAIL, ADMIN_PASSWORD)
+        if not self.admin_token:
+            raise SystemExit("❌ Login do admin falhou. O banco foi gerado com benchmarks.seed?")
+
+        for index in range(self.args.clients):
+            email = f"loadtest{index}@bench.com"
+            await self.client.post("/api/v1/auth/register", json={
+                "email": email, "password": LOADTEST_PASSWORD, "full_name": f"Cliente Carga {index}",
+            })
+            token = await self.login(email, LOADTEST_PASSWORD)
+            if token:
+                self.client_tokens.append(token)
+                self.client_credentials.append(email)
+
+        for barber_id in self.args.barber_ids:
+            token = await self.login(f"barbeiro{barber_id}@bench.com", ADMIN_PASSWORD)
+            if token:
+                self.barber_tokens[barber_id] = token
+
+        if not self.client_tokens:
+            raise SystemExit("❌ Nenhum cliente de teste conseguiu logar")
+        print(f"👥 {len(self.client_tokens)} clientes, {len(self.barber_tokens)} barbeiros, "
+              f"{len(self.hot_slots)} horários disputados")
+
+    # === CENÁRIOS ===
+
+    async def browse_anonymous(self, rng: random.Random) -> None:
+        barber_id = rng.choice(self.args.barber_ids)
+        day = self.args.reference_date + timedelta(days=rng.randint(0, 14))
+        await self.request("browse_anonymous", "GET", "/api/v1/appointments/availability-public",
+                           params={"barber_id": barber_id, "date": day.isoformat()})
+        path = rng.choice(["/api/v1/barbers/", "/api/v1/services/"])
+        await self.request("browse_anonymous", "GET", path)
+
+    async def client_availability(self, rng: random.Random) -> None:
+        day = self.args.reference_date + timedelta(days=rng.randint(0, 14))
+        await self.request("client_availability", "GET", "/api/v1/appointments/availability",
+                           token=rng.choice(self.client_tokens),
+                           params={"barber_id": rng.choice(self.args.barber_ids), "date": day.isoformat()})
+
+    async def login_burst(self, rng: random.Random) -> None:
+        await self.request("login_burst", "POST", "/api/v1/auth/login", json={
+            "email": rng.choice(self.client_credentials), "password": LOADTEST_PASSWORD,
+        })
+
+    async def book_hot_slots(self, rng: random.Random) -> None:
+        barber_id = rng.choice(self.args.barber_ids)
+        response = await self.request("book_hot_slots", "POST", "/api/v1/appointments/",
+                                      token=rng.choice(self.client_tokens), json={
+                                          "barber_id": barber_id,
+                                          "service_ids": [rng.choice(self.args.service_ids)],
+                                          "appointment_date": rng.choice(self.hot_slots),
+                                      })
+        if response is not None and response.status_code == 201:
+            self.booked.append({"id": response.json()["id"], "barber_id": barber_id, "step": 0})
+
+    async def barber_status(self, rng: random.Random) -> None:
+        pending = [item for item in self.booked if item["step"] < len(STATUS_FLOW)]
+        if not pending:
+            return
+        item = rng.choice(pending)
+        token = self.barber_tokens.get(item["barber_id"], self.admin_token)
+        new_status = STATUS_FLOW[item["step"]]
+        item["step"] += 1
+        await self.request("barber_status", "PUT", f"/api/v1/appointments/{item['id']}/status-simple",
+                           token=token, json={"status": new_status})
+
+    async def admin_dashboard(self, rng: random.Random) -> None:
+        path = rng.choice([
+            "/api/v1/analytics/dashboard",
+            "/api/v1/analytics/revenue",
+            "/api/v1/clients/stats/overview",
+        ])
+        await self.request("admin_dashboard", "GET", path, token=self.admin_token)
+
+    # === EXECUÇÃO ===
+
+    async def virtual_user(self, user_index: int, deadline: float, mix: Dict[str, int]) -> None:
+        rng = random.Random(f"{self.args.seed}:{user_index}")
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        # Rampa: usuários entram espalhados no período de ramp-up
+        await asyncio.sleep(self.args.ramp_up * user_index / max(self.args.users, 1))
+        while time.perf_counter() < deadline:
+            scenario = rng.choices(names, weights=weights)[0]
+            await getattr(self, scenario)(rng)
+            if self.args.think_time:
+                await asyncio.sleep(rng.uniform(0, self.args.think_time))
+
+    async def run(self, mix: Dict[str, int]) -> dict:
+        started = time.perf_counter()
+        deadline = started + self.args.duration
+        await asyncio.gather(*(self.virtual_user(index, deadline, mix) for index in range(self.args.users)))
+        elapsed = time.perf_counter() - started
+
+        scenarios = {name: stats.report(elapsed) for name, stats in self.stats.items() if stats.requests}
+        total_requests = sum(stats.requests for stats in self.stats.values())
+        return {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "target": self.args.base_url or "in-process",
+            "users": self.args.users,
+            "duration_seconds": round(elapsed, 2),
+            "mix": mix,
+            "total_requests": total_requests,
+            "throughput_rps": round(total_requests / elapsed, 2) if elapsed else 0.0,
+            "booked_appointments": len(self.booked),
+            "scenarios": scenarios,
+        }
+
+
+def parse_int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def parse_mix(value: Optional[str]) -> Dict[str, int]:
+    """'browse_anonymous=50,book_hot_slots=50' -> pesos (cenários omitidos ficam com 0)"""
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in value.split(","):
+        name, weight = item.split("=")
+        if name not in DEFAULT_MIX:
+            raise SystemExit(f"❌ Cenário desconhecido: {name}")
+        mix[name] = int(weight)
+    return mix
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Teste de carga com cenários de dia de pico")
+    parser.add_argument("--base-url", help="Servidor alvo (padrão: app em processo)")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"),
+                        help="Banco do app em processo")
+    parser.add_argument("--users", type=int, default=20, help="Usuários virtuais simultâneos")
+    parser.add_argument("--duration", type=float, default=30.0, help="Duração em segundos")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Segundos para todos os usuários entrarem")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Pausa máxima entre ações (s)")
+    parser.add_argument("--clients", type=int, default=20, help="Clientes de teste registrados")
+    parser.add_argument("--barber-ids", type=parse_int_list, default=[1, 2, 3], help="Barbeiros disputados")
+    parser.add_argument("--service-ids", type=parse_int_list, default=[1, 2])
+    parser.add_argument("--hot-slots", type=int, default=6, help="Quantidade de horários disputados no sábado")
+    parser.add_argument("--mix", help="Pesos dos cenários, ex.: browse_anonymous=50,book_hot_slots=50")
+    parser.add_argument("--reference-date", type=date.fromisoformat, default=date(2025, 1, 1))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Arquivo JSON com o relatório")
+    return parser.parse_args(argv)
+
+
+async def main_async(args: argparse.Namespace) -> dict:
+    import httpx
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=30.0)
+    else:
+        from app.main import app
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        client = httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None)
+
+    async with client:
+        loadtest = LoadTest(client, args)
+        await loadtest.setup()
+        return await loadtest.run(parse_mix(args.mix))
+
+
+def print_report(report: dict) -> None:
+    print(f"\n📈 {report['total_requests']} requisições em {report['duration_seconds']}s "
+          f"({report['throughput_rps']} req/s) | {report['booked_appointments']} agendamentos criados")
+    print(f"  {'cenário':<20} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'erros':>7} {'conflitos':>9} {'queries':>8}")
+    for name, result in report["scenarios"].items():
+        latency = result["latency_ms"]
+        print(f"  {name:<20} {result['throughput_rps']:>8} {latency['p50']:>8}ms {latency['p95']:>8}ms "
+              f"{latency['p99']:>8}ms {result['error_rate']:>7.1%} {result['conflict_rate']:>9.1%} "
+              f"{result['db_queries']:>8}")
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+
+    if not args.base_url:
+        os.environ["DATABASE_URL"] = args.database_url
+        os.environ.setdefault("ENVIRONMENT", "development")  # headers X-DB-Queries
+
+    print(f"🔥 Teste de carga | alvo: {args.base_url or 'app em processo'} | "
+          f"{args.users} usuários por {args.duration:.0f}s")
+    report = asyncio.run(main_async(args))
+    print_report(report)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"💾 Relatório salvo em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
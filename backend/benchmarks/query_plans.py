@@ -0,0 +1,545 @@
+"""
+Verificação de planos de execução das queries quentes.
+
+O catálogo abaixo reproduz os filtros dos routers mais acessados
+(appointments, analytics, clients, commissions, barber_blocks) e documenta
+quais índices cada query usa. O harness roda EXPLAIN em um banco gerado por
+benchmarks.seed e acusa:
+
+    - scan completo (Seq Scan / SCAN) em tabela grande que não esteja
+      registrado como débito conhecido na query
+    - índice documentado que não existe no banco
+    - custo do plano (PostgreSQL) acima do baseline além do limite
+
+Com --time N cada query também é executada N vezes e o relatório traz a
+mediana em ms (no SQLite é a única medida comparável entre versões, já que o
+EXPLAIN QUERY PLAN não informa custo).
+
+Ao mudar o filtro de um router, atualize a query correspondente aqui; ao criar
+ou remover índices, atualize `indexes` e `known_scans`.
+
+Uso (a partir de backend/):
+    python -m benchmarks.query_plans --database-url sqlite:///./bench.db
+    python -m benchmarks.query_plans --database-url postgresql://localhost/barbershop_bench --save-baseline plans.json
+    python -m benchmarks.query_plans --database-url postgresql://localhost/barbershop_bench --baseline plans.json --cost-threshold 20
+    python -m benchmarks.query_plans --database-url sqlite:///./bench.db --time 20 --save-baseline plans.json
+    python -m benchmarks.query_plans --list   # catálogo e índices, sem banco
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+
+@dataclass
+class HotQuery:
+    """Query quente de um router e os índices dos quais ela depende"""
+    name: str
+    source: str  # router/endpoint de origem
+    build: Callable[[dict], object]  # contexto -> statement SQLAlchemy
+    indexes: Tuple[str, ...] = ()
+    known_scans: Tuple[str, ...] = ()  # tabelas com scan completo já conhecido (débito)
+    note: str = ""
+
+
+def _appointments_availability(ctx: dict):
+    from sqlalchemy import and_, select
+    from app.models import Appointment
+    from app.models.appointment import AppointmentStatus
+    from app.utils.timezones import day_bounds
+
+    day_start, day_end = day_bounds(ctx["day"], ctx["tz"])
+    return select(Appointment).where(and_(
+        Appointment.barber_id == ctx["barber_id"],
+        Appointment.appointment_date >= day_start,
+        Appointment.appointment_date < day_end,
+        Appointment.status != AppointmentStatus.PAUSED,
+        Appointment.status != AppointmentStatus.CANCELLED,
+        Appointment.status != AppointmentStatus.COMPLETED,
+        Appointment.deleted_at.is_(None),
+    ))
+
+
+def _appointments_conflicts(ctx: dict):
+    from app.services.booking import conflict_statement
+    from app.utils.timezones import from_local
+
+    start = from_local(datetime.combine(ctx["day"], datetime.min.time()).replace(hour=10), ctx["tz"])
+    end = start + timedelta(minutes=30)
+    return conflict_statement(ctx["barber_id"], start, end, ctx["tz"])
+
+
+def _appointments_list_client(ctx: dict):
+    from sqlalchemy import select
+    from app.models import Appointment
+
+    return (
+        select(Appointment)
+        .where(Appointment.client_id == ctx["client_id"])
+        .order_by(Appointment.appointment_date.desc())
+    )
+
+
+def _client_return_metrics(ctx: dict):
+    from sqlalchemy import and_, select
+    from app.models import Appointment
+    from app.models.appointment import AppointmentStatus
+
+    return (
+        select(Appointment.appointment_date)
+        .where(and_(
+            Appointment.client_id == ctx["client_id"],
+            Appointment.status == AppointmentStatus.COMPLETED,
+            Appointment.deleted_at.is_(None),
+        ))
+        .order_by(Appointment.appointment_date.desc())
+    )
+
+
+def _appointments_list_barber(ctx: dict):
+    from sqlalchemy import select
+    from app.models import Appointment
+
+    return (
+        select(Appointment)
+        .where(
+            Appointment.barber_id == ctx["barber_id"],
+            Appointment.appointment_date >= ctx["start"],
+            Appointment.appointment_date <= ctx["end"],
+        )
+        .offset(0).limit(50)
+    )
+
+
+def _analytics_completed_period(ctx: dict):
+    from sqlalchemy import and_, select
+    from app.models import Appointment
+    from app.models.appointment import AppointmentStatus
+    from app.utils.timezones import date_range_clause
+
+    return select(Appointment).where(and_(
+        Appointment.status == AppointmentStatus.COMPLETED,
+        date_range_clause(Appointment.appointment_date, ctx["start"], ctx["end"], ctx["tz"]),
+    ))
+
+
+def _analytics_barber_period(ctx: dict):
+    from sqlalchemy import and_, select
+    from app.models import Appointment
+    from app.models.appointment import AppointmentStatus
+    from app.utils.timezones import date_range_clause
+
+    return select(Appointment).where(and_(
+        Appointment.barber_id == ctx["barber_id"],
+        Appointment.status == AppointmentStatus.COMPLETED,
+        date_range_clause(Appointment.appointment_date, ctx["start"], ctx["end"], ctx["tz"]),
+    ))
+
+
+def _analytics_occupancy(ctx: dict):
+    from sqlalchemy import and_, select
+    from app.models import Appointment
+    from app.models.appointment import AppointmentStatus
+    from app.utils.timezones import date_range_clause
+
+    return select(Appointment).where(and_(
+        Appointment.status.in_([
+            AppointmentStatus.COMPLETED, AppointmentStatus.CONFIRMED, AppointmentStatus.IN_PROGRESS,
+        ]),
+        date_range_clause(Appointment.appointment_date, ctx["start"], ctx["end"], ctx["tz"]),
+    ))
+
+
+def _analytics_today(ctx: dict):
+    from sqlalchemy import func, select
+    from app.models import Appointment
+    from app.utils.timezones import day_bounds
+
+    day_start, day_end = day_bounds(ctx["day"], ctx["tz"])
+    return select(func.count(Appointment.id)).where(
+        Appointment.appointment_date >= day_start,
+        Appointment.appointment_date < day_end,
+    )
+
+
+def _clients_search(ctx: dict):
+    from sqlalchemy import or_, select
+    from app.models import Client
+
+    term = f"%{ctx['search']}%"
+    return (
+        select(Client)
+        .where(or_(
+            Client.name.ilike(term),
+            Client.email.ilike(term),
+            Client.phone.ilike(term),
+            Client.cpf.ilike(term),
+        ))
+        .order_by(Client.created_at.desc())
+        .offset(0).limit(20)
+    )
+
+
+def _clients_list(ctx: dict):
+    from sqlalchemy import select
+    from app.models import Client
+
+    return select(Client).order_by(Client.created_at.desc()).offset(0).limit(100)
+
+
+def _commissions_barber_period(ctx: dict):
+    from sqlalchemy import and_, select
+    from app.models import Commission
+
+    return select(Commission).where(and_(
+        Commission.barber_id == ctx["barber_id"],
+        Commission.date >= ctx["start"],
+        Commission.date <= ctx["end"],
+    ))
+
+
+def _commissions_period(ctx: dict):
+    from sqlalchemy import and_, select
+    from app.models import Commission
+
+    return select(Commission).where(and_(Commission.date >= ctx["start"], Commission.date <= ctx["end"]))
+
+
+def _commissions_by_appointment(ctx: dict):
+    from sqlalchemy import select
+    from app.models import Commission
+
+    return select(Commission).where(Commission.appointment_id == ctx["appointment_id"]).limit(1)
+
+
+def _barber_blocks_day(ctx: dict):
+    from sqlalchemy import and_, select
+    from app.models import BarberBlock
+
+    return select(BarberBlock).where(and_(
+        BarberBlock.barber_id == ctx["barber_id"],
+        BarberBlock.block_date == ctx["day"],
+        BarberBlock.is_active == True,  # noqa: E712
+        BarberBlock.deleted_at.is_(None),
+    ))
+
+
+# === CATÁLOGO ===
+
+CATALOG: List[HotQuery] = [
+    HotQuery(
+        "appointments_availability", "GET /appointments/availability", _appointments_availability,
+        indexes=("ix_appointments_barber_date",),
+    ),
+    HotQuery(
+        "appointments_conflicts", "POST /appointments/ (services/booking.py)", _appointments_conflicts,
+        indexes=("ix_appointments_barber_active_end", "ix_barber_blocks_barber_active_date"),
+        note="UNION ALL de agendamentos e bloqueios; índices parciais exigem os status ativos escritos "
+             "no SQL (literal_execute)",
+    ),
+    HotQuery(
+        "appointments_list_client", "GET /appointments/ (cliente)", _appointments_list_client,
+        indexes=("ix_appointments_client_date",),
+        note="histórico com todos os status: por isso o índice não é parcial (completed)",
+    ),
+    HotQuery(
+        "client_return_metrics", "GET /clients/{id}/return-metrics", _client_return_metrics,
+        indexes=("ix_appointments_client_date",),
+        note="só concluídos, filtrados entre as linhas do cliente; DESC pela varredura reversa",
+    ),
+    HotQuery(
+        "appointments_list_barber", "GET /appointments/ (barbeiro)", _appointments_list_barber,
+        indexes=("ix_appointments_barber_date",),
+    ),
+    HotQuery(
+        "analytics_completed_period", "GET /analytics/revenue, /services-ranking", _analytics_completed_period,
+        indexes=("ix_appointments_status_date",),
+    ),
+    HotQuery(
+        "analytics_barber_period", "GET /analytics/barbers-performance", _analytics_barber_period,
+        indexes=("ix_appointments_barber_date", "ix_appointments_status_date"),
+        note="executada uma vez por barbeiro (N+1)",
+    ),
+    HotQuery(
+        "analytics_occupancy", "GET /analytics/occupancy-heatmap", _analytics_occupancy,
+        indexes=("ix_appointments_status_date",),
+    ),
+    HotQuery(
+        "analytics_today", "GET /analytics/dashboard", _analytics_today,
+        indexes=("ix_appointments_appointment_date",),
+    ),
+    HotQuery(
+        "clients_search", "GET /clients/?search=", _clients_search,
+        known_scans=("clients",),
+        note="ILIKE com curinga à esquerda não usa B-tree (PostgreSQL precisa de pg_trgm)",
+    ),
+    HotQuery(
+        "clients_list", "GET /clients/", _clients_list,
+        known_scans=("clients",),
+        note="ordenação por created_at sem índice",
+    ),
+    HotQuery(
+        "commissions_barber_period", "GET /commissions/barber/{id}/summary", _commissions_barber_period,
+        indexes=("ix_commissions_barber_id", "ix_commissions_date"),
+    ),
+    HotQuery(
+        "commissions_period", "GET /commissions/summary", _commissions_period,
+        indexes=("ix_commissions_date",),
+    ),
+    HotQuery(
+        "commissions_by_appointment", "POST /commissions/auto-generate", _commissions_by_appointment,
+        indexes=("uq_commissions_appointment_id",),
+    ),
+    HotQuery(
+        "barber_blocks_day", "GET /barber-blocks/check-availability", _barber_blocks_day,
+        indexes=("ix_barber_blocks_barber_active_date",),
+    ),
+]
+
+
+# === EXPLAIN ===
+
+def compile_statement(statement, dialect) -> str:
+    """SQL com os parâmetros embutidos (EXPLAIN não recebe binds em todos os drivers)"""
+    return str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+
+def explain_sqlite(connection, sql: str) -> dict:
+    """
+    EXPLAIN QUERY PLAN do SQLite.
+    "SCAN <tabela>" percorre a tabela (ou um índice) inteira; "SEARCH" é busca
+    por índice. O SQLite não informa custo.
+    """
+    from sqlalchemy import text
+
+    rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    details = [row[-1] for row in rows]
+    scans = []
+    used_indexes = []
+    for detail in details:
+        words = detail.split()
+        if len(words) >= 2 and words[0] == "SCAN":
+            scans.append(words[1])
+        if "INDEX" in words:
+            used_indexes.append(words[words.index("INDEX") + 1])
+    return {"cost": None, "seq_scans": sorted(set(scans)), "indexes_used": sorted(set(used_indexes)), "plan": details}
+
+
+def explain_postgresql(connection, sql: str) -> dict:
+    """EXPLAIN (FORMAT JSON) do PostgreSQL, sem executar a query"""
+    from sqlalchemy import text
+
+    raw = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+
+    scans = []
+    used_indexes = []
+
+    def walk(node: dict) -> None:
+        if node.get("Node Type") == "Seq Scan":
+            scans.append(node.get("Relation Name"))
+        if node.get("Index Name"):
+            used_indexes.append(node["Index Name"])
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan)
+    return {
+        "cost": plan.get("Total Cost"),
+        "seq_scans": sorted(set(scans)),
+        "indexes_used": sorted(set(used_indexes)),
+        "plan": plan,
+    }
+
+
+def time_query(connection, sql: str, runs: int) -> float:
+    """Mediana (ms) de `runs` execuções da query, buscando todas as linhas"""
+    from sqlalchemy import text
+
+    statement = text(sql)
+    connection.execute(statement).fetchall()  # aquecer cache de páginas
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        connection.execute(statement).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def build_context(connection, reference_date: date) -> dict:
+    """Valores reais do banco para os parâmetros das queries"""
+    from sqlalchemy import func, select
+    from app.models import Appointment, Barber, Barbershop, Client
+    from app.utils.timezones import resolve_timezone
+
+    barber_id = connection.execute(select(func.min(Barber.id))).scalar()
+    client_id = connection.execute(select(func.min(Client.id))).scalar()
+    appointment_id = connection.execute(select(func.max(Appointment.id))).scalar()
+    if barber_id is None:
+        raise SystemExit("❌ Banco sem dados. Rode antes: python -m benchmarks.seed")
+    return {
+        "barber_id": barber_id,
+        "client_id": client_id,
+        "appointment_id": appointment_id,
+        "tz": resolve_timezone(connection.execute(select(Barbershop.timezone).limit(1)).scalar()),
+        "day": reference_date,
+        "start": reference_date - timedelta(days=30),
+        "end": reference_date,
+        "search": "Silva",
+    }
+
+
+def table_sizes(connection, tables: List[str]) -> Dict[str, int]:
+    from sqlalchemy import text
+
+    return {table: connection.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar() for table in tables}
+
+
+def check_plans(args: argparse.Namespace) -> Tuple[dict, List[str]]:
+    from sqlalchemy import create_engine, inspect
+
+    engine = create_engine(args.database_url)
+    dialect = engine.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        raise SystemExit(f"❌ Dialeto não suportado: {dialect}")
+    explain = explain_sqlite if dialect == "sqlite" else explain_postgresql
+
+    inspector = inspect(engine)
+    existing_indexes = {
+        index["name"]
+        for table in inspector.get_table_names()
+        for index in inspector.get_indexes(table)
+    }
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["queries"] if args.baseline else {}
+    selected = set(args.queries.split(",")) if args.queries else None
+    problems: List[str] = []
+    results = {}
+
+    with engine.connect() as connection:
+        context = build_context(connection, args.reference_date)
+        sizes = table_sizes(connection, ["appointments", "clients", "commissions", "barber_blocks"])
+        large_tables = {table for table, rows in sizes.items() if rows >= args.large_table_rows}
+
+        for query in CATALOG:
+            if selected and query.name not in selected:
+                continue
+
+            sql = compile_statement(query.build(context), engine.dialect)
+            result = explain(connection, sql)
+            flags = []
+
+            for table in result["seq_scans"]:
+                if table not in large_tables:
+                    continue
+                if table in query.known_scans and not args.strict:
+                    flags.append(f"scan conhecido em {table}")
+                else:
+                    problems.append(f"{query.name}: scan completo em {table} ({sizes[table]} linhas)")
+                    flags.append(f"SCAN em {table}")
+
+            for index in query.indexes:
+                if index not in existing_indexes:
+                    problems.append(f"{query.name}: índice documentado {index} não existe")
+                    flags.append(f"sem {index}")
+
+            elapsed_ms = time_query(connection, sql, args.time) if args.time else None
+
+            previous = baseline.get(query.name, {}).get("cost")
+            if previous and result["cost"] is not None:
+                delta = (result["cost"] - previous) / previous * 100
+                if delta > args.cost_threshold:
+                    problems.append(f"{query.name}: custo {previous:.1f} -> {result['cost']:.1f} ({delta:+.1f}%)")
+                    flags.append(f"custo {delta:+.1f}%")
+
+            results[query.name] = {
+                "source": query.source,
+                "cost": result["cost"],
+                "median_ms": round(elapsed_ms, 3) if elapsed_ms is not None else None,
+                "seq_scans": result["seq_scans"],
+                "indexes_used": result["indexes_used"],
+                "plan": result["plan"] if args.verbose else None,
+            }
+            cost = f"{result['cost']:.1f}" if result["cost"] is not None else "-"
+            timing = f"  {elapsed_ms:>8.2f}ms" if elapsed_ms is not None else ""
+            status_icon = "❌" if any(not flag.startswith("scan conhecido") for flag in flags) else (
+                "⚠️" if flags else "✅")
+            print(f"  {status_icon} {query.name:<30} custo={cost:>10}{timing}  índices={','.join(result['indexes_used']) or '-'}"
+                  f"{'  [' + '; '.join(flags) + ']' if flags else ''}")
+
+    engine.dispose()
+    report = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "database": dialect,
+        "table_sizes": sizes,
+        "queries": results,
+    }
+    return report, problems
+
+
+def print_catalog() -> None:
+    """Catálogo como documentação: query, origem, índices e débitos conhecidos"""
+    for query in CATALOG:
+        print(f"{query.name}  ({query.source})")
+        print(f"    índices: {', '.join(query.indexes) or '-'}")
+        if query.known_scans:
+            print(f"    scan conhecido: {', '.join(query.known_scans)} — {query.note}")
+        elif query.note:
+            print(f"    {query.note}")
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Verificar planos de execução das queries quentes")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--queries", help="Lista separada por vírgula (padrão: todas)")
+    parser.add_argument("--reference-date", type=date.fromisoformat, default=date(2025, 1, 1),
+                        help="Mesma data usada no seed")
+    parser.add_argument("--large-table-rows", type=int, default=10000,
+                        help="Tabelas a partir deste tamanho não podem ter scan completo")
+    parser.add_argument("--strict", action="store_true", help="Tratar scans conhecidos como erro")
+    parser.add_argument("--baseline", type=Path, help="JSON salvo com --save-baseline para comparar custos")
+    parser.add_argument("--cost-threshold", type=float, default=20.0, metavar="PCT",
+                        help="Aumento de custo tolerado em relação ao baseline (PostgreSQL)")
+    parser.add_argument("--save-baseline", type=Path, help="Salvar custos/planos atuais em JSON")
+    parser.add_argument("--time", type=int, default=0, metavar="N",
+                        help="Executar cada query N vezes e informar a mediana em ms")
+    parser.add_argument("--verbose", action="store_true", help="Incluir o plano completo no JSON")
+    parser.add_argument("--list", action="store_true", help="Mostrar o catálogo e sair")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+
+    if args.list:
+        print_catalog()
+        return 0
+
+    os.environ["DATABASE_URL"] = args.database_url
+    print(f"🔍 Planos de execução | banco: {args.database_url}")
+    report, problems = check_plans(args)
+
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.save_baseline.write_text(json.dumps(report, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+        print(f"💾 Baseline salvo em {args.save_baseline}")
+
+    if problems:
+        print(f"\n❌ {len(problems)} problema(s):")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+
+    print("\n✅ Nenhuma regressão de plano")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
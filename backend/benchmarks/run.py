@@ -0,0 +1,285 @@
+"""
+Benchmarks em processo dos endpoints mais usados.
+
+Chama a aplicação diretamente via httpx.ASGITransport (sem rede, sem uvicorn),
+mede latência (p50/p90/p95/p99) e número de queries por requisição (header
+X-DB-Queries) e grava tudo em JSON para comparar versões. Respostas fora de
+2xx ficam fora dos percentis, marcam o cenário com falhas e fazem a execução
+sair com erro.
+
+Uso (a partir de backend/, depois de rodar benchmarks.seed):
+    python -m benchmarks.run --database-url sqlite:///./bench.db
+    python -m benchmarks.run --database-url sqlite:///./bench.db --compare benchmarks/results/baseline.json
+    python -m benchmarks.run --scenarios availability,analytics_revenue --iterations 200
+
+Por padrão o cache de respostas fica desligado para medir o custo real das
+consultas; use --with-cache para medir o comportamento com cache.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.seed import ADMIN_EMAIL, ADMIN_PASSWORD
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+@dataclass
+class Scenario:
+    """Um endpoint a ser medido; `build` gera (método, path, params) a cada iteração"""
+    name: str
+    build: Callable[[random.Random, dict], tuple]
+    iterations: Optional[int] = None  # sobrescreve --iterations (cenários caros ou que escrevem)
+
+
+def _random_day(rng: random.Random, context: dict) -> date:
+    return context["reference_date"] + timedelta(days=rng.randint(-60, 30))
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("availability", lambda rng, ctx: (
+        "GET", "/api/v1/appointments/availability",
+        {"barber_id": rng.choice(ctx["barber_ids"]), "date": _random_day(rng, ctx).isoformat()},
+    )),
+    Scenario("appointments_list", lambda rng, ctx: (
+        "GET", "/api/v1/appointments/",
+        {"limit": 50, "skip": rng.randint(0, 500), "barber_id": rng.choice(ctx["barber_ids"])},
+    )),
+    Scenario("clients_list", lambda rng, ctx: (
+        "GET", "/api/v1/clients/", {"limit": 100, "skip": rng.randint(0, 1000)},
+    )),
+    Scenario("clients_search", lambda rng, ctx: (
+        "GET", "/api/v1/clients/", {"limit": 20, "search": rng.choice(["Silva", "Ana", "119000"])},
+    )),
+    Scenario("analytics_revenue", lambda rng, ctx: (
+        "GET", "/api/v1/analytics/revenue", {"period": rng.choice(["daily", "weekly", "monthly"])},
+    )),
+    Scenario("analytics_barbers_performance", lambda rng, ctx: (
+        "GET", "/api/v1/analytics/barbers-performance", {},
+    )),
+    Scenario("analytics_occupancy_heatmap", lambda rng, ctx: (
+        "GET", "/api/v1/analytics/occupancy-heatmap", {},
+    )),
+    Scenario("retention_stats", lambda rng, ctx: (
+        "GET", "/api/v1/clients/retention/stats", {},
+    ), iterations=3),
+    Scenario("commissions_summary", lambda rng, ctx: (
+        "GET", "/api/v1/commissions/summary", {},
+    )),
+    # Escreve no banco: a primeira execução gera as comissões faltantes
+    Scenario("commissions_auto_generate", lambda rng, ctx: (
+        "POST", "/api/v1/commissions/auto-generate", {},
+    ), iterations=3),
+]
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rodar benchmarks em processo")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", help="Lista separada por vírgula (padrão: todos)")
+    parser.add_argument("--reference-date", type=date.fromisoformat, default=date(2025, 1, 1),
+                        help="Mesma data usada no seed")
+    parser.add_argument("--label", help="Rótulo da execução (padrão: commit atual)")
+    parser.add_argument("--output", type=Path, help="Arquivo JSON de saída")
+    parser.add_argument("--compare", type=Path, help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--fail-on-regression", type=float, metavar="PCT",
+                        help="Sair com erro se algum p95 piorar mais que PCT%% em relação ao --compare")
+    parser.add_argument("--with-cache", action="store_true", help="Manter o cache de respostas ligado")
+    return parser.parse_args(argv)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentil por interpolação linear (values já ordenados)"""
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarize(latencies_ms: List[float], queries: List[int], statuses: Dict[str, int]) -> dict:
+    """Percentis só das respostas 2xx; as demais contam como falhas"""
+    ordered = sorted(latencies_ms)
+    failures = sum(count for code, count in statuses.items() if not code.startswith("2"))
+    return {
+        "requests": len(ordered) + failures,
+        "failures": failures,
+        "statuses": statuses,
+        "latency_ms": {
+            "mean": round(statistics.fmean(ordered), 3) if ordered else 0.0,
+            "p50": round(percentile(ordered, 50), 3),
+            "p90": round(percentile(ordered, 90), 3),
+            "p95": round(percentile(ordered, 95), 3),
+            "p99": round(percentile(ordered, 99), 3),
+            "max": round(ordered[-1], 3) if ordered else 0.0,
+        },
+        "queries": {
+            "median": statistics.median(queries) if queries else None,
+            "max": max(queries) if queries else None,
+        },
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+async def run_benchmarks(args: argparse.Namespace) -> dict:
+    import httpx
+    from sqlalchemy import func
+
+    from app.core.database import SessionLocal, engine
+    from app.main import app
+    from app.models import Appointment, Barber, Client
+
+    db = SessionLocal()
+    try:
+        barber_ids = [row[0] for row in db.query(Barber.id).all()]
+        dataset = {
+            "barbers": len(barber_ids),
+            "clients": db.query(func.count(Client.id)).scalar(),
+            "appointments": db.query(func.count(Appointment.id)).scalar(),
+        }
+    finally:
+        db.close()
+
+    if not barber_ids:
+        raise SystemExit("❌ Banco sem dados. Rode antes: python -m benchmarks.seed")
+
+    context = {"barber_ids": barber_ids, "reference_date": args.reference_date}
+    selected = set(args.scenarios.split(",")) if args.scenarios else None
+    scenarios = [scenario for scenario in SCENARIOS if not selected or scenario.name in selected]
+
+    # Erros do app viram respostas 500 registradas no resultado, sem abortar a execução
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        response = await client.post("/api/v1/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+        response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+        for scenario in scenarios:
+            rng = random.Random(f"{args.seed}:{scenario.name}")
+            iterations = scenario.iterations or args.iterations
+            # Cenários com iterações fixas são caros: um único aquecimento basta
+            warmup = args.warmup if scenario.iterations is None else min(args.warmup, 1)
+            latencies: List[float] = []
+            queries: List[int] = []
+            statuses: Dict[str, int] = {}
+
+            for index in range(warmup + iterations):
+                method, path, params = scenario.build(rng, context)
+                started = time.perf_counter()
+                response = await client.request(method, path, params=params)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if index < warmup:
+                    continue
+
+                statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+                # Latência de erro (500 logo no início do handler) não mede o endpoint
+                if not response.is_success:
+                    continue
+                latencies.append(elapsed_ms)
+                if "x-db-queries" in response.headers:
+                    queries.append(int(response.headers["x-db-queries"]))
+
+            results[scenario.name] = summarize(latencies, queries, statuses)
+            latency = results[scenario.name]["latency_ms"]
+            flag = "❌" if results[scenario.name]["failures"] else "  "
+            print(f"{flag}{scenario.name:<32} p50={latency['p50']:>9.2f}ms  p95={latency['p95']:>9.2f}ms  "
+                  f"queries={results[scenario.name]['queries']['median']}  status={statuses}")
+
+    return {
+        "label": args.label or git_revision(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": engine.dialect.name,
+            "cache_enabled": args.with_cache,
+        },
+        "dataset": dataset,
+        "iterations": args.iterations,
+        "scenarios": results,
+    }
+
+
+def compare(current: dict, baseline: dict) -> List[str]:
+    """Imprimir diferenças de p95/queries e retornar cenários que pioraram"""
+    regressions = []
+    print(f"\n📊 Comparação com '{baseline.get('label')}' ({baseline.get('timestamp')})")
+    for name, result in current["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            print(f"  {name:<32} (novo)")
+            continue
+        if result.get("failures") or previous.get("failures"):
+            print(f"  {name:<32} (com falhas, sem comparação de latência)")
+            continue
+        old_p95 = previous["latency_ms"]["p95"]
+        new_p95 = result["latency_ms"]["p95"]
+        delta = ((new_p95 - old_p95) / old_p95 * 100) if old_p95 else 0.0
+        old_queries = previous["queries"]["median"]
+        new_queries = result["queries"]["median"]
+        print(f"  {name:<32} p95 {old_p95:>9.2f} -> {new_p95:>9.2f}ms ({delta:+.1f}%)  "
+              f"queries {old_queries} -> {new_queries}")
+        regressions.append((name, delta))
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+
+    # Configurar o app antes de importá-lo
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("ENVIRONMENT", "development")  # headers X-DB-Queries
+    if not args.with_cache:
+        os.environ["CACHE_ENABLED"] = "false"
+
+    print(f"🏁 Benchmarks | banco: {args.database_url} | iterações: {args.iterations}")
+    result = asyncio.run(run_benchmarks(args))
+
+    output = args.output or RESULTS_DIR / f"{result['label']}-{datetime.utcnow():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"💾 Resultados salvos em {output}")
+
+    failed = [name for name, scenario in result["scenarios"].items() if scenario["failures"]]
+    if failed:
+        print(f"❌ Respostas não-2xx em: {', '.join(failed)} (fora dos percentis)")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(result, baseline)
+        if args.fail_on_regression is not None:
+            regressed = [name for name, delta in regressions if delta > args.fail_on_regression]
+            if regressed:
+                print(f"❌ Regressão acima de {args.fail_on_regression}% em: {', '.join(regressed)}")
+                return 1
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""
+Gerador de dados sintéticos para benchmarks.
+
+Carrega volumes realistas (barbearias, barbeiros, clientes, agendamentos com
+serviços, comissões e bloqueios) em SQLite ou PostgreSQL local, de forma
+reproduzível: a mesma `--seed` gera exatamente os mesmos dados.
+
+Uso (a partir de backend/):
+    python -m benchmarks.seed --database-url sqlite:///./bench.db --scale small
+    python -m benchmarks.seed --database-url postgresql://localhost/bench --scale full
+
+Escalas:
+    small   -> 2 barbearias, 10 barbeiros, 2 mil clientes, 20 mil agendamentos
+    medium  -> 5 barbearias, 40 barbeiros, 20 mil clientes, 200 mil agendamentos
+    full    -> 20 barbearias, 160 barbeiros, 100 mil clientes, 1 milhão de agendamentos
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List
+
+SCALES: Dict[str, Dict[str, int]] = {
+    "small": {"shops": 2, "barbers_per_shop": 5, "clients": 2_000, "appointments": 20_000},
+    "medium": {"shops": 5, "barbers_per_shop": 8, "clients": 20_000, "appointments": 200_000},
+    "full": {"shops": 20, "barbers_per_shop": 8, "clients": 100_000, "appointments": 1_000_000},
+}
+
+# Credenciais do admin criado pelo seed (usadas pelo runner de benchmarks)
+ADMIN_EMAIL = "bench-admin@barbearia.com"
+ADMIN_PASSWORD = "bench123"
+
+# Janela de agendamentos: 1 ano para trás e 30 dias para frente
+HISTORY_DAYS = 365
+FUTURE_DAYS = 30
+
+# Grade de horários (30 min, 8h às 18h)
+OPENING_HOUR = 8
+SLOTS_PER_DAY = 20
+SLOT_MINUTES = 30
+
+BATCH_SIZE = 5_000
+
+FIRST_NAMES = [
+    "Ana", "Bruno", "Carlos", "Daniel", "Eduardo", "Fernanda", "Gabriel", "Helena",
+    "Igor", "Juliana", "Lucas", "Marcos", "Natália", "Otávio", "Paula", "Rafael",
+    "Sofia", "Thiago", "Vinícius", "Yasmin",
+]
+LAST_NAMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Rodrigues",
+    "Almeida", "Nascimento", "Carvalho", "Gomes", "Martins", "Araújo", "Ribeiro",
+]
+SERVICES = [
+    ("Corte Masculino", "corte", 45.00, 30),
+    ("Barba", "barba", 35.00, 30),
+    ("Corte + Barba", "combo", 70.00, 60),
+    ("Sobrancelha", "estetica", 20.00, 30),
+    ("Pigmentação", "estetica", 60.00, 60),
+    ("Hidratação", "tratamento", 40.00, 30),
+]
+BLOCK_REASONS = ["Férias", "Consulta médica", "Curso", "Folga", "Compromisso pessoal"]
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Gerar dados sintéticos para benchmarks")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--shops", type=int, help="Sobrescreve o número de barbearias da escala")
+    parser.add_argument("--barbers-per-shop", type=int)
+    parser.add_argument("--clients", type=int)
+    parser.add_argument("--appointments", type=int)
+    parser.add_argument("--reference-date", type=date.fromisoformat, default=date(2025, 1, 1),
+                        help="Data 'hoje' dos dados gerados (fixa para reprodutibilidade)")
+    parser.add_argument("--drop", action="store_true", help="Apagar e recriar as tabelas antes de carregar")
+    return parser.parse_args(argv)
+
+
+def chunked(rows: Iterable[dict], size: int = BATCH_SIZE) -> Iterable[List[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def insert_rows(conn, table, rows: Iterable[dict]) -> int:
+    total = 0
+    for batch in chunked(rows):
+        conn.execute(table.insert(), batch)
+        total += len(batch)
+    return total
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+
+    # DATABASE_URL precisa estar definido antes de importar o app
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from sqlalchemy import text
+
+    from app.core.database import Base, engine
+    from app.models import (
+        Appointment, Barber, BarberBlock, Barbershop, Client, Commission, Service, User,
+    )
+    from app.models.appointment import AppointmentStatus, appointment_services
+    from app.models.client import ClientStatus
+    from app.models.commission import CommissionType
+    from app.models.user import UserRole, UserStatus
+    from passlib.context import CryptContext
+
+    volumes = dict(SCALES[args.scale])
+    for name in ("shops", "barbers_per_shop", "clients", "appointments"):
+        if getattr(args, name) is not None:
+            volumes[name] = getattr(args, name)
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    today = datetime.combine(args.reference_date, datetime.min.time())
+    first_day = today - timedelta(days=HISTORY_DAYS)
+    total_days = HISTORY_DAYS + FUTURE_DAYS
+
+    print(f"🌱 Seed {args.seed} | escala {args.scale} | {volumes}")
+    print(f"🔗 Banco: {args.database_url}")
+
+    if args.drop:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    is_sqlite = engine.dialect.name == "sqlite"
+    password_hash = CryptContext(schemes=["bcrypt"], deprecated="auto").hash(ADMIN_PASSWORD)
+
+    with engine.begin() as conn:
+        if is_sqlite:
+            conn.execute(text("PRAGMA synchronous=OFF"))
+            conn.execute(text("PRAGMA journal_mode=MEMORY"))
+
+        existing = conn.execute(text("SELECT COUNT(*) FROM appointments")).scalar()
+        if existing:
+            print(f"❌ Banco já possui {existing} agendamentos. Use --drop para recriar.")
+            return 1
+
+        # === USUÁRIOS, BARBEARIAS E BARBEIROS ===
+        user_id = 0
+        users = []
+
+        user_id += 1
+        admin_id = user_id
+        users.append({
+            "id": admin_id, "email": ADMIN_EMAIL, "hashed_password": password_hash,
+            "full_name": "Admin Benchmark", "role": UserRole.ADMIN, "status": UserStatus.ACTIVE,
+            "is_verified": True,
+        })
+
+        shops = []
+        barbers = []
+        barber_id = 0
+        for shop_index in range(1, volumes["shops"] + 1):
+            shops.append({
+                "id": shop_index, "name": f"Barbearia {shop_index}", "slug": f"barbearia-{shop_index}",
+                "owner_id": admin_id, "is_active": True, "timezone": "America/Sao_Paulo",
+            })
+            for _ in range(volumes["barbers_per_shop"]):
+                user_id += 1
+                barber_id += 1
+                name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+                users.append({
+                    "id": user_id, "email": f"barbeiro{barber_id}@bench.com", "hashed_password": password_hash,
+                    "full_name": name, "role": UserRole.BARBER, "status": UserStatus.ACTIVE, "is_verified": True,
+                })
+                barbers.append({
+                    "id": barber_id, "barbershop_id": shop_index, "user_id": user_id,
+                    "professional_name": name, "is_active": True, "accepts_appointments": True,
+                    "commission_rate": 0.6,
+                })
+
+        insert_rows(conn, User.__table__, users)
+        insert_rows(conn, Barbershop.__table__, shops)
+        insert_rows(conn, Barber.__table__, barbers)
+
+        # === SERVIÇOS ===
+        services = []
+        service_id = 0
+        services_by_shop: Dict[int, List[dict]] = {}
+        for shop in shops:
+            for name, category, price, duration in SERVICES:
+                service_id += 1
+                service = {
+                    "id": service_id, "barbershop_id": shop["id"], "name": name, "category": category,
+                    "price": price, "duration_minutes": duration, "is_active": True,
+                }
+                services.append(service)
+                services_by_shop.setdefault(shop["id"], []).append(service)
+        insert_rows(conn, Service.__table__, services)
+
+        # === CLIENTES ===
+        clients_by_shop: Dict[int, List[int]] = {shop["id"]: [] for shop in shops}
+        client_names: Dict[int, str] = {}
+
+        def client_rows():
+            for client_id in range(1, volumes["clients"] + 1):
+                shop_id = rng.randint(1, volumes["shops"])
+                clients_by_shop[shop_id].append(client_id)
+                name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+                client_names[client_id] = name
+                yield {
+                    "id": client_id, "barbershop_id": shop_id, "name": name,
+                    "email": f"cliente{client_id}@bench.com", "phone": f"119{client_id:08d}",
+                    "status": ClientStatus.ACTIVE, "is_vip": rng.random() < 0.05,
+                    "address_city": rng.choice(["São Paulo", "Campinas", "Santos", "Osasco"]),
+                }
+
+        print(f"👥 Clientes: {insert_rows(conn, Client.__table__, client_rows())}")
+
+        # === AGENDAMENTOS, SERVIÇOS DO AGENDAMENTO E COMISSÕES ===
+        # Cada barbeiro tem total_days * SLOTS_PER_DAY horários; preenchemos uma fração
+        # deles, sem sobreposição, até atingir o volume pedido
+        capacity = len(barbers) * total_days * SLOTS_PER_DAY
+        fill_ratio = min(1.0, volumes["appointments"] / capacity)
+        if volumes["appointments"] > capacity:
+            print(f"⚠️ Capacidade de horários ({capacity}) menor que o pedido; gerando {capacity}")
+
+        appointment_links = []
+        commissions = []
+        counters = {"appointments": 0, "links": 0, "commissions": 0}
+
+        def appointment_rows():
+            appointment_id = 0
+            for barber in barbers:
+                shop_clients = clients_by_shop[barber["barbershop_id"]] or [1]
+                shop_services = services_by_shop[barber["barbershop_id"]]
+                for day in range(total_days):
+                    day_start = first_day + timedelta(days=day)
+                    for slot in range(SLOTS_PER_DAY):
+                        if appointment_id >= volumes["appointments"] or rng.random() >= fill_ratio:
+                            continue
+                        appointment_id += 1
+                        start = day_start + timedelta(hours=OPENING_HOUR, minutes=slot * SLOT_MINUTES)
+                        chosen = rng.sample(shop_services, rng.choice((1, 1, 1, 2)))
+                        amount = sum(service["price"] for service in chosen)
+                        if start < today:
+                            status = rng.choices(
+                                [AppointmentStatus.COMPLETED, AppointmentStatus.CANCELLED, AppointmentStatus.NO_SHOW],
+                                weights=[85, 10, 5],
+                            )[0]
+                        else:
+                            status = rng.choice([AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED])
+                        client_id = rng.choice(shop_clients)
+
+                        for service in chosen:
+                            appointment_links.append({
+                                "appointment_id": appointment_id, "service_id": service["id"], "quantity": 1,
+                            })
+                        if status == AppointmentStatus.COMPLETED and rng.random() < 0.9:
+                            commissions.append({
+                                "barber_id": barber["id"], "appointment_id": appointment_id,
+                                "commission_type": CommissionType.SERVICE, "amount": round(amount * 0.6, 2),
+                                "percentage": 60.0, "date": start.date(),
+                            })
+
+                        yield {
+                            "id": appointment_id,
+                            "appointment_number": f"B{appointment_id:09d}",
+                            "barbershop_id": barber["barbershop_id"],
+                            "client_id": client_id,
+                            "barber_id": barber["id"],
+                            "appointment_date": start,
+                            "start_time": start,
+                            "end_time": start + timedelta(minutes=SLOT_MINUTES),
+                            "duration_minutes": SLOT_MINUTES,
+                            "status": status,
+                            "total_amount": amount,
+                            "final_amount": amount,
+                            "client_name": client_names.get(client_id, "Cliente"),
+                            "booking_source": rng.choice(["website", "phone", "walk_in", "instagram"]),
+                        }
+
+        for batch in chunked(appointment_rows()):
+            conn.execute(Appointment.__table__.insert(), batch)
+            counters["appointments"] += len(batch)
+            counters["links"] += insert_rows(conn, appointment_services, appointment_links)
+            counters["commissions"] += insert_rows(conn, Commission.__table__, commissions)
+            appointment_links.clear()
+            commissions.clear()
+            print(f"   ... {counters['appointments']} agendamentos", end="\r")
+
+        print()
+        print(f"📅 Agendamentos: {counters['appointments']} | serviços: {counters['links']} | "
+              f"comissões: {counters['commissions']}")
+
+        # === BLOQUEIOS ===
+        def block_rows():
+            for barber in barbers:
+                for _ in range(rng.randint(2, 8)):
+                    block_day = (first_day + timedelta(days=rng.randrange(total_days))).date()
+                    all_day = rng.random() < 0.5
+                    start = datetime.combine(block_day, datetime.min.time()) + timedelta(hours=rng.randint(8, 16))
+                    yield {
+                        "barber_id": barber["id"], "block_date": block_day, "all_day": all_day,
+                        "start_time": None if all_day else start,
+                        "end_time": None if all_day else start + timedelta(hours=1),
+                        "reason": rng.choice(BLOCK_REASONS), "is_active": True,
+                    }
+
+        print(f"🚫 Bloqueios: {insert_rows(conn, BarberBlock.__table__, block_rows())}")
+
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            conn.execute(text("ANALYZE"))
+            # Sequências precisam acompanhar os ids explícitos
+            for table in ("users", "barbershops", "barbers", "services", "clients", "appointments"):
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"
+                ))
+    else:
+        with engine.connect() as conn:
+            conn.execute(text("ANALYZE"))
+
+    print(f"✅ Seed concluído em {time.perf_counter() - started:.1f}s")
+    print(f"🔑 Admin: {ADMIN_EMAIL} / {ADMIN_PASSWORD}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,9 +7,10 @@ echo "🔨 Iniciando build do backend..."
 echo "📦 Instalando dependências..."
 pip install -r requirements.txt
 
-# Executar migrações (se houver)
-# echo "🗄️ Executando migrações..."
-# alembic upgrade head
+# Executar migrações e criar dados essenciais (admin + barbearia padrão)
+# Os workers sobem sem tocar no schema (DB_INIT_ON_STARTUP é false por padrão)
+echo "🗄️ Executando migrações..."
+python -m app.bootstrap || exit 1
 
 echo "✅ Build concluído com sucesso!"
 
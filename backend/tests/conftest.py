@@ -0,0 +1,47 @@
+"""
+Fixtures dos testes do backend.
+
+O app lê DATABASE_URL na importação, então o banco de teste (SQLite
+temporário, populado pelo gerador de benchmarks) é configurado aqui, antes
+de qualquer `import app`.
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+_DB_DIR = tempfile.mkdtemp(prefix="barber-tests-")
+DATABASE_URL = f"sqlite:///{_DB_DIR}/test.db"
+
+os.environ["DATABASE_URL"] = DATABASE_URL
+os.environ["ENVIRONMENT"] = "development"  # headers X-DB-Queries
+os.environ["CACHE_ENABLED"] = "false"  # contagem de queries sem cache
+
+# Volume pequeno: o bastante para um N+1 aparecer na contagem
+SEED_ARGS = ["--database-url", DATABASE_URL, "--scale", "small",
+             "--clients", "300", "--appointments", "3000"]
+
+
+@pytest.fixture(scope="session")
+def seeded_db():
+    from benchmarks import seed
+
+    seed.main(SEED_ARGS)
+    yield DATABASE_URL
+    shutil.rmtree(_DB_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client(seeded_db):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from benchmarks.seed import ADMIN_EMAIL, ADMIN_PASSWORD
+
+    with TestClient(app) as test_client:
+        response = test_client.post("/api/v1/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+        assert response.status_code == 200, response.text
+        test_client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        yield test_client
@@ -0,0 +1,48 @@
+"""Cache de respostas: tenant explícito e locks de carga síncrona"""
+
+import threading
+
+import pytest
+
+from app.core.cache import ResponseCache, cached, shared_tenant
+
+
+def test_cached_requires_tenant_without_barbershop_id():
+    with pytest.raises(TypeError):
+        @cached("teste:sem-tenant")
+        def sem_tenant(start_date=None):
+            return {}
+
+    @cached("teste:compartilhado", tenant=shared_tenant)
+    def compartilhado(start_date=None):
+        return {}
+
+    @cached("teste:por-barbearia")
+    def por_barbearia(barbershop_id: int):
+        return {}
+
+
+def test_sync_locks_released_after_load():
+    cache = ResponseCache()
+    started = threading.Barrier(4)
+
+    def loader():
+        return {"ok": True}
+
+    def load(index):
+        started.wait()
+        cache.get_or_load_sync(f"chave:{index % 2}", loader, ttl=60, stale_ttl=0)
+
+    threads = [threading.Thread(target=load, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    def failing_loader():
+        raise RuntimeError("falha")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load_sync("chave:erro", failing_loader, ttl=60, stale_ttl=0)
+
+    assert cache._sync_locks == {}
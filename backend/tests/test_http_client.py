@@ -0,0 +1,143 @@
+"""
+Cliente HTTP compartilhado: limite de conexões por host e fluxo do Google
+OAuth, com httpx.MockTransport no lugar da rede.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.core import http_client
+from app.core.config import settings
+from app.core.http_client import HostLimitedTransport
+
+
+@pytest.fixture
+def anyio_backend():
+    # Os semáforos por host são asyncio.Semaphore
+    return "asyncio"
+
+
+class _StreamedBody(httpx.AsyncByteStream):
+    """Corpo lido da rede: fica aberto até o cliente consumir e fechar"""
+
+    def __init__(self, *chunks: bytes):
+        self._chunks = chunks
+        self.closed = False
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            yield chunk
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def _limited_client(handler, max_per_host: int) -> httpx.AsyncClient:
+    transport = HostLimitedTransport(httpx.MockTransport(handler), max_per_host)
+    return httpx.AsyncClient(transport=transport)
+
+
+@pytest.mark.anyio
+async def test_host_semaphore_caps_concurrency():
+    in_flight = {"a.test": 0, "b.test": 0}
+    peak = {"a.test": 0, "b.test": 0}
+
+    async def handler(request):
+        host = request.url.host
+        in_flight[host] += 1
+        peak[host] = max(peak[host], in_flight[host])
+        await asyncio.sleep(0.02)
+        in_flight[host] -= 1
+        return httpx.Response(200, stream=_StreamedBody(b"o", b"k"))
+
+    async with _limited_client(handler, max_per_host=2) as client:
+        responses = await asyncio.gather(
+            *(client.get("http://a.test/") for _ in range(6)),
+            *(client.get("http://b.test/") for _ in range(2)),
+        )
+
+    assert all(response.status_code == 200 for response in responses)
+    assert peak == {"a.test": 2, "b.test": 2}
+
+
+@pytest.mark.anyio
+async def test_slot_held_until_stream_closes():
+    bodies = []
+
+    async def handler(request):
+        bodies.append(_StreamedBody(b"cor", b"po"))
+        return httpx.Response(200, stream=bodies[-1])
+
+    async with _limited_client(handler, max_per_host=1) as client:
+        request = client.build_request("GET", "http://a.test/")
+        streaming = await client.send(request, stream=True)
+
+        # Corpo ainda aberto: a única vaga do host está ocupada
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.get("http://a.test/"), timeout=0.1)
+
+        await streaming.aclose()
+        response = await asyncio.wait_for(client.get("http://a.test/"), timeout=1)
+        assert response.status_code == 200
+        assert response.text == "corpo"
+        assert all(body.closed for body in bodies)
+
+
+@pytest.mark.anyio
+async def test_slot_released_for_buffered_response():
+    """Respostas com corpo já em memória não seguram a vaga"""
+
+    async def handler(request):
+        return httpx.Response(200, content=b"corpo")
+
+    async with _limited_client(handler, max_per_host=1) as client:
+        for _ in range(3):
+            response = await asyncio.wait_for(client.get("http://a.test/"), timeout=1)
+            assert response.status_code == 200
+
+
+@pytest.mark.anyio
+async def test_slot_released_on_error():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.host)
+        if len(calls) == 1:
+            raise httpx.ConnectError("recusada", request=request)
+        return httpx.Response(200, text="ok")
+
+    async with _limited_client(handler, max_per_host=1) as client:
+        with pytest.raises(httpx.ConnectError):
+            await client.get("http://a.test/")
+        response = await asyncio.wait_for(client.get("http://a.test/"), timeout=1)
+
+    assert response.status_code == 200
+    assert len(calls) == 2
+
+
+def test_google_oauth_uses_shared_client(client, monkeypatch):
+    """POST /auth/google troca o código e busca o usuário pelo cliente compartilhado"""
+    calls = []
+
+    def handler(request):
+        calls.append((request.method, str(request.url.copy_with(query=None))))
+        if str(request.url) == settings.google_token_url:
+            assert b"code=codigo-teste" in request.content
+            return httpx.Response(200, json={"access_token": "google-token"})
+        assert request.headers["Authorization"] == "Bearer google-token"
+        return httpx.Response(200, json={
+            "id": "g-123", "email": "oauth-teste@gmail.com", "name": "Cliente OAuth", "verified_email": True,
+        })
+
+    monkeypatch.setattr(settings, "google_client_id", "client-id-teste")
+    monkeypatch.setattr(settings, "google_client_secret", "segredo")
+    monkeypatch.setattr(settings, "frontend_url", "http://frontend.test")
+    monkeypatch.setattr(http_client, "_client", http_client.build_http_client(httpx.MockTransport(handler)))
+
+    response = client.post("/api/v1/auth/google", json={"code": "codigo-teste"})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["user"]["email"] == "oauth-teste@gmail.com"
+    assert calls == [("POST", settings.google_token_url), ("GET", settings.google_userinfo_url)]
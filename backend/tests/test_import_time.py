@@ -0,0 +1,41 @@
+"""
+Orçamento de cold start: `import app.main` em processos novos com
+`-X importtime` (os critérios de benchmarks/import_time.py).
+
+O teste compara o processo mais rápido: ruído da máquina só soma tempo, então
+passar do orçamento até no melhor caso é regressão de verdade (o harness, com
+mais execuções, compara a mediana). Mede até MAX_RUNS processos e para no
+primeiro dentro do orçamento.
+"""
+
+import os
+
+from benchmarks.import_time import BACKEND_DIR, DEFAULT_BUDGET_MS, LAZY_MODULES, measure_once
+
+MAX_RUNS = 10
+
+
+def _import_env():
+    env = dict(os.environ)
+    env["LAZY_ROUTERS"] = "true"
+    env.pop("PYTHONTRACEMALLOC", None)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BACKEND_DIR), env.get("PYTHONPATH")]))
+    return env
+
+
+def test_cold_import_within_budget():
+    budget_ms = float(os.environ.get("IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS))
+    env = _import_env()
+    first_run = None
+    fastest_ms = float("inf")
+    for _ in range(MAX_RUNS):
+        rows = measure_once(env)
+        first_run = first_run or rows
+        fastest_ms = min(fastest_ms, next(cumulative for module, _, cumulative, _ in rows if module == "app.main") / 1000)
+        if fastest_ms <= budget_ms:
+            break
+    assert fastest_ms <= budget_ms, f"importação de app.main levou {fastest_ms:.0f}ms (orçamento {budget_ms:.0f}ms)"
+
+    loaded = {module for module, _, _, _ in first_run}
+    eager = sorted(module for module in loaded if module.startswith(LAZY_MODULES))
+    assert not eager, f"módulos que deveriam ser sob demanda foram importados no boot: {', '.join(eager)}"
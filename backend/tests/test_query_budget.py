@@ -0,0 +1,48 @@
+"""
+Orçamento de queries dos endpoints de listagem.
+
+Um N+1 (uma query por linha) estoura o orçamento e faz o teste falhar; a
+contagem vem do header X-DB-Queries da instrumentação de SQL.
+"""
+
+from app.core.sql_instrumentation import assert_query_budget, query_budget
+
+
+def test_clients_list_budget(client):
+    response = client.get("/api/v1/clients/", params={"limit": 100})
+    assert response.status_code == 200
+    assert len(response.json()) > 0
+    assert_query_budget(response, 10)
+
+
+def test_retention_stats_budget(client):
+    response = client.get("/api/v1/clients/retention/stats")
+    assert response.status_code == 200
+    assert response.json()["total_clients"] > 0
+    assert_query_budget(response, 10)
+
+
+def test_clients_at_risk_budget(client):
+    response = client.get("/api/v1/clients/at-risk/list")
+    assert response.status_code == 200
+    assert_query_budget(response, 10)
+
+
+def test_query_budget_catches_n_plus_one(seeded_db):
+    from app.api.clients import calculate_client_return_metrics
+    from app.core.database import SessionLocal
+    from app.models.client import Client
+
+    db = SessionLocal()
+    try:
+        clients = db.query(Client).limit(20).all()
+        try:
+            with query_budget(10, max_repeats=5):
+                for c in clients:
+                    calculate_client_return_metrics(c, db)
+        except AssertionError as error:
+            assert "Orçamento de queries excedido" in str(error)
+        else:
+            raise AssertionError("query_budget não detectou uma query por cliente")
+    finally:
+        db.close()